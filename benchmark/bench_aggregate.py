@@ -0,0 +1,55 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from src.Analysis.Aggregate import aggregate, process_min_rows
+from src.Analysis.TransformData import reservas_aggregations
+from test.synthetic import synthetic_reservas
+
+
+def benchmark_aggregate(sizes=((25, 12), (100, 12), (100, 50)), repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares the aggregation engines by date and region scaling the number of reservoirs and years, with
+    1 to the number of CPUs processes for the process pool, and checks that all the engines give the same result.
+    The column pool tells whether the process engine used its pool or fell back to pandas.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup against pandas and comparison of each engine and size.
+    """
+    cpus = os.cpu_count() or 1
+    configurations = [('pandas', 1), ('arrow', 1)] + [('process', workers) for workers in sorted({2, 4, cpus})]
+    keys = ['Fecha', 'RegionHidrologica']
+
+    results = []
+    for reservoirs, years in sizes:
+        df = synthetic_reservas(reservoirs, years)
+        expected = aggregate(df, keys, reservas_aggregations, 'pandas')
+        for engine, workers in configurations:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = aggregate(df, keys, reservas_aggregations, engine, max_workers=workers)
+                times.append(time.perf_counter() - start)
+            results.append({
+                'reservoirs': reservoirs,
+                'years': years,
+                'rows': len(df),
+                'engine': engine,
+                'workers': workers,
+                # The process engine falls back to pandas with one CPU or less than process_min_rows rows
+                'pool': engine == 'process' and min(workers, cpus) > 1 and len(df) >= process_min_rows,
+                'seconds': min(times),
+                'same_result': np.allclose(output[list(reservas_aggregations)], expected[list(reservas_aggregations)])
+                               and output[keys].equals(expected[keys])
+            })
+
+    results = pd.DataFrame(results)
+    pandas_time = results[results['engine'] == 'pandas'].set_index(['reservoirs', 'years'])['seconds']
+    results['speedup'] = pandas_time.loc[list(zip(results['reservoirs'], results['years']))].to_numpy() / results['seconds']
+    results['cpus'] = cpus
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_aggregate().to_string(index=False))
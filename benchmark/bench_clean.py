@@ -0,0 +1,104 @@
+import time
+import tracemalloc
+import pandas as pd
+import pyarrow as pa
+from src.GetData.SIMEM import DataSIMEM, compact_frame
+from benchmark.bench_schema import raw_history
+
+
+def legacy_clean(data_sets: dict) -> dict:
+    """
+    Cleaning of DataSIMEM before the rules of cleaning_rules, kept as reference: a new frame by step and the
+    data sets replaced in place.
+    """
+    if 'BA1C55' in data_sets:
+        data_sets['BA1C55'] = data_sets['BA1C55'].drop(columns=['FechaPublicacion'])
+        data_sets['BA1C55'] = data_sets['BA1C55'][data_sets['BA1C55']['CodigoSerieHidrologica'] != 'Colombia']
+    if 'B0E933' in data_sets:
+        data_sets['B0E933'] = data_sets['B0E933'].drop(columns=['FechaPublicacion'])
+        data_sets['B0E933'] = data_sets['B0E933'][~data_sets['B0E933']['CodigoEmbalse'].str.contains('AGREGADO')]
+    if 'A0CF2A' in data_sets:
+        data_sets['A0CF2A'] = data_sets['A0CF2A'].drop(columns=['Fecha', 'FechaEjecucion'])
+        data_sets['A0CF2A'] = data_sets['A0CF2A'].drop_duplicates()
+    return data_sets
+
+
+def reservoir_history() -> dict:
+    """
+    Returns raw_history with the aggregated rows that SIMEM publishes and the cleaning removes: the national
+    total of the reservoirs (AGREGADO) and of the water contributions (Colombia) of each date.
+    """
+    data_sets = raw_history()
+    for data_id, code, columns in [('B0E933', 'CodigoEmbalse', ['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia']),
+                                   ('BA1C55', 'CodigoSerieHidrologica', ['AportesHidricosEnergia'])]:
+        data = data_sets[data_id]
+        total = data.groupby(['FechaPublicacion', 'Fecha'], as_index=False)[columns].sum()
+        total = total.assign(**{code: 'AGREGADO' if data_id == 'B0E933' else 'Colombia', 'RegionHidrologica': 'Colombia'})
+        data_sets[data_id] = pd.concat([data, total], ignore_index=True).sort_values('Fecha', kind='stable', ignore_index=True)
+    return data_sets
+
+
+def measure(clean, data) -> dict:
+    """
+    Runs a cleaning measuring the seconds, the peak of the memory allocated during it and the memory retained by
+    the result (numpy and Python by tracemalloc and the Arrow strings by pyarrow).
+    """
+    arrow = pa.total_allocated_bytes()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = clean(data)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow = pa.total_allocated_bytes() - arrow
+    return {'result': result, 'seconds': seconds, 'peak_mb': (peak + max(arrow, 0)) / 1024 ** 2,
+            'retained_mb': (current + max(arrow, 0)) / 1024 ** 2}
+
+
+def benchmark_clean(repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares the legacy cleaning with the cleaning of DataSIMEM on the reservoir history, with the types as read
+    and with the compact schema. The cleaning of DataSIMEM is repeated on the same object to check that the raw
+    data stays untouched.
+
+    Returns:
+        pd.DataFrame: Best seconds, peak and retained memory in MB, rows removed, whether the result is the same as
+            the legacy cleaning and whether the cleaning can be repeated, by schema and implementation.
+    """
+    history = reservoir_history()
+    results = []
+    for schema, raw in [('raw', history), ('compact', {data_id: compact_frame(data, data_id) for data_id, data in history.items()})]:
+        # The input of each cleaning is created before the measure: a copy of the dict or a DataSIMEM with the data
+        implementations = [('legacy', lambda: dict(raw), legacy_clean),
+                           ('rules', lambda: DataSIMEM(data_sets=dict(raw)), lambda simem: simem._clean_data())]
+        for name, prepare, clean in implementations:
+            runs = [measure(clean, prepare()) for _ in range(repeat)]
+            cleaned = runs[-1]['result']
+            if name == 'legacy':
+                reference = cleaned
+                try:
+                    legacy_clean(cleaned)
+                    repeatable = True
+                except KeyError:
+                    repeatable = False
+            else:
+                simem = DataSIMEM(data_sets=dict(raw))
+                simem._clean_data()
+                repeatable = all(simem._clean_data()[data_id].equals(data) for data_id, data in cleaned.items()) and \
+                    all(simem.raw_data[data_id] is data for data_id, data in raw.items())
+            results.append({
+                'schema': schema,
+                'implementation': name,
+                'seconds': min(run['seconds'] for run in runs),
+                'peak_mb': min(run['peak_mb'] for run in runs),
+                'retained_mb': min(run['retained_mb'] for run in runs),
+                'removed_rows': sum(len(raw[data_id]) - len(data) for data_id, data in cleaned.items()),
+                'same_result': all(reference[data_id].equals(data) for data_id, data in cleaned.items()),
+                'repeatable': repeatable
+            })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_clean().to_string(index=False))
@@ -0,0 +1,59 @@
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from src.Analysis.LazyPlan import plan_outputs
+from src.Analysis.TransformData import JoinData
+from test.synthetic import write_data_sets
+
+
+def same_result(expected: pd.DataFrame, result: pd.DataFrame, rtol: float = 1e-12) -> bool:
+    """
+    Whether a result of the polars backend has the schema and values of the pandas one, the float values within rtol
+    (the parity of every stage is checked by test/Analysis/test_LazyPlan.py).
+    """
+    if not (list(expected.columns) == list(result.columns) and expected.dtypes.equals(result.dtypes)):
+        return False
+    floats = list(expected.select_dtypes('float').columns)
+    return (expected.drop(columns=floats).equals(result.drop(columns=floats)) and
+            np.allclose(expected[floats].to_numpy('float64'), result[floats].to_numpy('float64'), rtol=rtol, atol=0, equal_nan=True))
+
+
+def benchmark_engine(sizes=((25, 5), (100, 10), (200, 20)), repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares the time of the stages of the plan (enrich, not_agregate, regions and agregate, from the clean stage)
+    with the pandas and polars backends, scaling the number of reservoirs and years.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup against pandas and comparison of the agregate stage of each backend and size.
+    """
+    results = []
+    for reservoirs, years in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            arguments = list(write_data_sets(tmp, reservoirs, years).values())
+            outputs = {}
+            for backend in ['pandas', 'polars']:
+                join = JoinData(*arguments, backend=backend)
+                clean = join.get_stage('clean')
+                times = []
+                for _ in range(repeat):
+                    join._results = {'clean': clean}
+                    start = time.perf_counter()
+                    for stage in plan_outputs:
+                        join.get_stage(stage)
+                    times.append(time.perf_counter() - start)
+                outputs[backend] = join.get_stage('agregate')
+                results.append({'reservoirs': reservoirs, 'years': years, 'rows': len(join.get_stage('enrich')), 'backend': backend,
+                                'seconds': min(times), 'same_result': same_result(outputs['pandas'], outputs[backend])})
+
+    results = pd.DataFrame(results)
+    pandas_time = results[results['backend'] == 'pandas'].set_index(['reservoirs', 'years'])['seconds']
+    results['speedup'] = pandas_time.loc[list(zip(results['reservoirs'], results['years']))].to_numpy() / results['seconds']
+    results['cpus'] = os.cpu_count() or 1
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_engine().to_string(index=False))
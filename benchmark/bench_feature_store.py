@@ -0,0 +1,53 @@
+import os
+import time
+import tempfile
+import pandas as pd
+from src.ResourceManager.Storage import read_data, write_data
+from src.ResourceManager.FeatureStore import FeatureStore
+from test.synthetic import load_join_data
+
+
+def benchmark_feature_store(start: str = '2024-01-01', end: str = '2024-12-31', repeat: int = 5) -> pd.DataFrame:
+    """
+    Compares reading one year of the reservoir features by reloading the whole results file (Excel and Parquet)
+    and filtering, against a range read of the feature store (memory-mapped views and DataFrame).
+
+    Returns:
+        pd.DataFrame: Best time in seconds and rows of each strategy.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        join = load_join_data(tmp)
+        features = join.get_stage('enrich')
+        write_data(features, os.path.join(tmp, 'features.xlsx'))
+        write_data(features, os.path.join(tmp, 'features.parquet'))
+        store = join.save_feature_store(FeatureStore(os.path.join(tmp, 'Features')))
+
+        def reload(path: str):
+            def function() -> int:
+                data = read_data(path)
+                return len(data[(data['Fecha'] >= start) & (data['Fecha'] <= end)])
+            return function
+
+        strategies = [
+            ('xlsx_reload', reload(os.path.join(tmp, 'features.xlsx'))),
+            ('parquet_reload', reload(os.path.join(tmp, 'features.parquet'))),
+            ('store_views', lambda: len(store.read('reservas', start, end)['Fecha'])),
+            ('store_frame', lambda: len(store.read_frame('reservas', start, end)))
+        ]
+
+        results = []
+        for name, function in strategies:
+            times = []
+            for _ in range(repeat):
+                begin = time.perf_counter()
+                rows = function()
+                times.append(time.perf_counter() - begin)
+            results.append({'strategy': name, 'seconds': min(times), 'rows': rows})
+
+    results = pd.DataFrame(results)
+    results['speedup_vs_xlsx'] = results['seconds'].iloc[0] / results['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    print(benchmark_feature_store().to_string(index=False))
@@ -0,0 +1,63 @@
+import os
+import json
+import time
+import tempfile
+import pandas as pd
+from src.ResourceManager.Cache import ResponseCache
+from src.ResourceManager.Pipeline import DataPipeline, handle_timer, handle_request
+from test.synthetic import StubHttpClient, FastStubReadSIMEM
+
+
+def benchmark_function(years: int = 5) -> pd.DataFrame:
+    """
+    Runs the pipeline of the Azure Function with the stub harness (local ONI, PARATEC and SIMEM) in a temporary
+    Data folder: the first run (backfill), a cold start of a new worker over the saved data, a warm invocation of
+    the same worker, a new day of SIMEM data and an HTTP request of the transformation only.
+
+    Returns:
+        pd.DataFrame: Status, seconds, stages with changes, first year rewritten and rows of SIMEM of each invocation.
+    """
+    end_date = pd.Timestamp.today().date()
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, 'Data')
+        cache = ResponseCache(os.path.join(tmp, 'Cache'), ttl=0)
+
+        # Only the last years are backfilled, so the benchmark runs in seconds
+        start = pd.Timestamp(end_date.year - years + 1, 1, 1).date()
+        os.makedirs(os.path.join(data_path, 'Cleansed', 'SIMEM'))
+        with open(os.path.join(data_path, 'Cleansed', 'SIMEM', 'watermarks.json'), 'w') as file:
+            json.dump({data_id: str(start) for data_id in ['B0E933', 'BA1C55', 'A0CF2A']}, file)
+
+        # Creating a pipeline does no work, the second one is the worker of a cold start after the backfill
+        first, second = [DataPipeline(data_path, simem_reader=FastStubReadSIMEM, client=StubHttpClient(), cache=cache)
+                         for _ in range(2)]
+        invocations = [
+            ('backfill', lambda: handle_timer(pipeline=first)),
+            ('warm_same_day', lambda: handle_timer(pipeline=first)),
+            ('cold_start', lambda: handle_timer(pipeline=second)),
+            ('warm_same_day', lambda: handle_timer(pipeline=second)),
+            ('warm_next_day', lambda: second.run(end_date=end_date + pd.Timedelta(days=1))),
+            ('http_transform', lambda: json.loads(handle_request('transform', pipeline=second)[1])),
+            ('http_unknown_stage', lambda: json.loads(handle_request('oni,excel', pipeline=second)[1]))
+        ]
+
+        results = []
+        for name, function in invocations:
+            start = time.perf_counter()
+            report = function()
+            seconds = time.perf_counter() - start
+            stages = report.get('stages', {})
+            results.append({
+                'invocation': name,
+                'status': report['status'],
+                'seconds': seconds,
+                'changed': ','.join(stage for stage, result in stages.items() if result['changed']),
+                'since': stages.get('transform', {}).get('since'),
+                'simem_rows': stages.get('simem', {}).get('rows')
+            })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_function().to_string(index=False))
@@ -0,0 +1,62 @@
+import sys
+import subprocess
+import pandas as pd
+
+# Budget of the cold import time (seconds, without the start of the interpreter) of the modules of the data
+# pipeline and of the Azure Function, and what each one represents
+import_budgets = {
+    'import src.ResourceManager.Storage': 0.8,
+    'import src.GetData.ONI, src.GetData.PARATEC, src.GetData.SIMEM': 1.0,
+    'import src.Analysis.TransformData': 1.0,
+    'from src.GetData.funciones import tidy_corr_matrix, identificar_outliers, checkVIF': 1.0,
+    'from src.GetData.funciones import eval_model': 1.0,
+    'import function_app': 1.5
+}
+
+# Statement run in a new interpreter, prints the seconds of the import or the missing dependency
+_timer = '''
+import time
+start = time.perf_counter()
+try:
+    exec({statement!r})
+    print(time.perf_counter() - start)
+except ImportError as e:
+    print('ImportError: ' + str(e.name))
+'''
+
+
+def cold_import(statement: str) -> str:
+    """
+    Runs an import in a new interpreter (cold start) and returns the seconds of the import or the missing dependency.
+    """
+    output = subprocess.run([sys.executable, '-c', _timer.format(statement=statement)], capture_output=True, text=True, check=True)
+    return output.stdout.strip().splitlines()[-1]
+
+
+def benchmark_imports(repeat: int = 3) -> pd.DataFrame:
+    """
+    Measures the cold import time of the modules of the data pipeline and the Azure Function against their budget.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, budget and whether the import is within the budget (None when a
+            dependency of the module is not installed).
+    """
+    results = []
+    for statement, budget in import_budgets.items():
+        outputs = [cold_import(statement) for _ in range(repeat)]
+        missing = next((output for output in outputs if output.startswith('ImportError')), None)
+        seconds = None if missing else min(float(output) for output in outputs)
+        results.append({
+            'statement': statement,
+            'seconds': seconds,
+            'budget': budget,
+            'within_budget': None if missing else seconds <= budget,
+            'missing': missing.split(': ')[-1] if missing else None
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_colwidth', 90)
+    print(benchmark_imports().to_string(index=False))
@@ -0,0 +1,64 @@
+import time
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score, root_mean_squared_error
+from src.Analysis.Metrics import regression_metrics, metrics_table, metric_names
+
+
+# Same computation as sktime's mean_absolute_scaled_error, used by the previous eval_model, kept as reference
+def mean_absolute_scaled_error(y_true, y_pred, y_train, sp: int = 1) -> float:
+    y_train = np.asarray(y_train, dtype='float64')
+    scale = max(mean_absolute_error(y_train[sp:], y_train[:-sp]), np.finfo('float64').eps)
+    return float(mean_absolute_error(y_true, y_pred) / scale)
+
+
+# Metrics of the previous eval_model, one call (and one validation of the arrays) per metric
+def eval_metrics(y_true, y_pred, sp: int = 1) -> dict:
+    return {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': root_mean_squared_error(y_true, y_pred),
+        'r2': r2_score(y_true, y_pred),
+        'mase': mean_absolute_scaled_error(y_true, y_pred, y_train=y_true, sp=sp)
+    }
+
+
+def benchmark_metrics(sizes=((1, 10_000), (1, 1_000_000), (50, 10_000), (50, 200_000)), sp: int = 7, repeat: int = 5) -> pd.DataFrame:
+    """
+    Compares the metrics of the previous eval_model (sklearn functions and MASE of sktime, one model at a time)
+    against the single-pass metrics engine, one model at a time and with the predictions of all the models stacked.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup and comparison of each strategy and size.
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for models, rows in sizes:
+        y_true = np.cumsum(rng.normal(size=rows))
+        y_pred = y_true + rng.normal(scale=np.linspace(0.1, 2, models)[:, np.newaxis], size=(models, rows))
+        predictions = {f'model_{i}': y_pred[i] for i in range(models)}
+        expected = np.array([[eval_metrics(y_true, y_pred[i], sp)[name] for name in metric_names] for i in range(models)])
+
+        strategies = [
+            ('sklearn_sktime', lambda: np.array([[eval_metrics(y_true, y_pred[i], sp)[name] for name in metric_names] for i in range(models)])),
+            ('single_pass', lambda: np.array([[regression_metrics(y_true, y_pred[i], sp=sp)[name] for name in metric_names] for i in range(models)])),
+            ('stacked', lambda: np.column_stack([regression_metrics(y_true, y_pred, sp=sp)[name] for name in metric_names])),
+            ('tidy_table', lambda: metrics_table(y_true, predictions, sp=sp)['value'].to_numpy().reshape(models, len(metric_names)))
+        ]
+        for name, function in strategies:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = function()
+                times.append(time.perf_counter() - start)
+            results.append({'models': models, 'rows': rows, 'strategy': name, 'seconds': min(times),
+                            'same_result': bool(np.allclose(output, expected, rtol=1e-9))})
+
+    results = pd.DataFrame(results)
+    base = results[results['strategy'] == 'sklearn_sktime'].set_index(['models', 'rows'])['seconds']
+    results['speedup'] = base.loc[list(zip(results['models'], results['rows']))].to_numpy() / results['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_metrics().to_string(index=False))
@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import pandas as pd
+from src.Analysis.Outliers import outlier_mask, iqr_bounds, QuantileSketch
+from src.Analysis.TransformData import reservas_aggregations
+from test.synthetic import synthetic_reservas
+
+
+# Previous implementation of funciones.identificar_outliers, kept as reference for the benchmark
+def identificar_outliers(df, numCols):
+    outliers_indices = []
+    for var in numCols:
+        Q1 = df[var].quantile(0.25)
+        Q3 = df[var].quantile(0.75)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+        outliers = df[(df[var] < lower_bound) | (df[var] > upper_bound)].index.tolist()
+        outliers_indices.extend(outliers)
+    return outliers_indices
+
+
+def synthetic_outliers(reservoirs: int, years: int, share: float = 0.01, seed: int = 0) -> pd.DataFrame:
+    """
+    Reservoir data with heavy-tailed values and a share of extreme values, so every column has outliers.
+    """
+    rng = np.random.default_rng(seed)
+    df = synthetic_reservas(reservoirs, years, seed)
+    for column in reservas_aggregations:
+        values = rng.lognormal(17, 0.5, len(df))
+        extreme = rng.random(len(df)) < share
+        values[extreme] *= rng.choice([0.01, 20], extreme.sum())
+        df[column] = values
+    return df
+
+
+def benchmark_outliers(sizes=((25, 12), (100, 50)), repeat: int = 3, parts: int = 10) -> pd.DataFrame:
+    """
+    Compares the previous column by column outlier detection against the vectorized mask (global and by region)
+    and against the streaming quantile sketch fitted by parts, and checks the rows found against the previous
+    function (unique indices) or against the exact grouped mask.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup, outlier rows and agreement of each strategy and size.
+    """
+    columns = list(reservas_aggregations)
+    results = []
+    for reservoirs, years in sizes:
+        df = synthetic_outliers(reservoirs, years)
+        expected = pd.Index(identificar_outliers(df, columns)).unique().sort_values()
+        expected_by = outlier_mask(df, columns, by='RegionHidrologica')
+
+        def streaming(by: str = None):
+            def function():
+                sketch = QuantileSketch(columns, by=by)
+                for chunk in np.array_split(np.arange(len(df)), parts):
+                    sketch.partial_fit(df.iloc[chunk])
+                return outlier_mask(df, columns, by=by, bounds=sketch.bounds())
+            return function
+
+        strategies = [
+            ('loop', lambda: identificar_outliers(df, columns), lambda output: pd.Index(output).unique().sort_values().equals(expected)),
+            ('vectorized', lambda: outlier_mask(df, columns), lambda output: df.index[output.to_numpy()].equals(expected)),
+            ('vectorized_region', lambda: outlier_mask(df, columns, by='RegionHidrologica'), lambda output: output.equals(expected_by)),
+            ('bitmap', lambda: outlier_mask(df, columns, per_column=True), lambda output: df.index[output.any(axis=1).to_numpy()].equals(expected)),
+            ('sketch', streaming(), lambda output: (output.to_numpy() == np.isin(df.index, expected)).mean()),
+            ('sketch_region', streaming('RegionHidrologica'), lambda output: (output == expected_by).mean())
+        ]
+        for name, function, check in strategies:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = function()
+                times.append(time.perf_counter() - start)
+            results.append({
+                'reservoirs': reservoirs,
+                'years': years,
+                'rows': len(df),
+                'strategy': name,
+                'seconds': min(times),
+                'outlier_rows': len(output) if name == 'loop' else int(np.asarray(output).any(axis=-1).sum() if output.ndim > 1 else output.sum()),
+                'agreement': float(check(output))
+            })
+
+    results = pd.DataFrame(results)
+    loop_time = results[results['strategy'] == 'loop'].set_index(['reservoirs', 'years'])['seconds']
+    results['speedup'] = loop_time.loc[list(zip(results['reservoirs'], results['years']))].to_numpy() / results['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_outliers().to_string(index=False))
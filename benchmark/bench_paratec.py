@@ -0,0 +1,106 @@
+import os
+import time
+import datetime
+import tempfile
+import numpy as np
+import pandas as pd
+from src.ResourceManager.Storage import read_data, write_data, append_data
+from src.ResourceManager.Profiler import data_size
+from src.GetData.PARATEC import read_history, diff_snapshot, snapshot_as_of, history_file, history_key
+from src.Analysis.TransformData import JoinData
+from test.synthetic import load_join_data
+
+
+def daily_snapshots(days: int = 365, changes: int = 1, seed: int = 0) -> dict:
+    """
+    Returns daily snapshots of PARATEC built from the snapshot of the repository, moving the coordinates of a
+    few reservoirs each week (as the corrections published by PARATEC), with one reservoir added at mid year.
+
+    Args:
+        days (int, optional): Number of daily snapshots. Defaults to 365.
+        changes (int, optional): Reservoirs moved each week. Defaults to 1.
+        seed (int, optional): Seed of the changes. Defaults to 0.
+
+    Returns:
+        dict: Snapshot (reservoir, latitude, longitude) by date.
+    """
+    rng = np.random.default_rng(seed)
+    data = read_data('Data/Cleansed/PARATEC/PARATEC_2025-05-17.xlsx')
+    start = datetime.date(2024, 1, 1)
+    snapshots = {}
+    for day in range(days):
+        if day and day % 7 == 0:
+            moved = rng.choice(len(data), size=changes, replace=False)
+            data = data.copy()
+            data.loc[moved, 'latitude'] += rng.normal(0, 0.01, size=changes)
+        if day == days // 2:
+            data = pd.concat([data, pd.DataFrame({'reservoir': ['NUEVO'], 'latitude': [5.0], 'longitude': [-75.0]})], ignore_index=True)
+        snapshots[start + datetime.timedelta(days=day)] = data
+    return snapshots
+
+
+def benchmark_paratec(days: int = 365) -> pd.DataFrame:
+    """
+    Compares the storage of a year of daily PARATEC snapshots (one dated file per day) against the history with
+    the changed reservoirs only, and the join of the coordinates of JoinData with the snapshot of the repository
+    against the history of that snapshot (one version by reservoir) and the history of the year.
+
+    Returns:
+        pd.DataFrame: Rows, bytes, seconds and check of each case.
+    """
+    snapshots = daily_snapshots(days)
+    dates = list(snapshots)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Storage: a dated file per day as before, the history appends only the versions that changed
+        os.makedirs(os.path.join(tmp, 'snapshots'))
+        start = time.perf_counter()
+        for as_of, data in snapshots.items():
+            write_data(data, os.path.join(tmp, 'snapshots', f'PARATEC_{as_of}.parquet'), schema='PARATEC')
+        results.append({'case': 'daily_snapshots', 'rows': sum(len(data) for data in snapshots.values()),
+                        'bytes': data_size(os.path.join(tmp, 'snapshots')), 'seconds': time.perf_counter() - start, 'check': None})
+
+        history_path = os.path.join(tmp, history_file)
+        start = time.perf_counter()
+        for as_of, data in snapshots.items():
+            versions = diff_snapshot(read_history(history_path), data, as_of)
+            if not versions.empty:
+                append_data(versions, history_path, history_key, schema='PARATEC_historico')
+        seconds = time.perf_counter() - start
+        history = read_history(history_path)
+        check = all(snapshot_as_of(history, as_of).sort_values('reservoir', ignore_index=True).equals(
+            snapshots[as_of].astype({'reservoir': 'string'}).sort_values('reservoir', ignore_index=True)) for as_of in dates)
+        results.append({'case': 'history', 'rows': len(history), 'bytes': data_size(history_path), 'seconds': seconds, 'check': check})
+
+        # Join: the snapshot, its history (a plain join) and the history of the year (a join by date)
+        load_join_data(tmp)
+        paths = [os.path.join(tmp, f'{name}.parquet') for name in ['oni', 'paratec', 'reservas', 'aportes', 'embalses']]
+        single_path = os.path.join(tmp, 'single.parquet')
+        write_data(diff_snapshot(read_history(single_path), read_data(paths[1]), dates[0]), single_path, schema='PARATEC_historico')
+        reference = None
+        for case, paratec_path in [('join_snapshot', paths[1]), ('join_single_version', single_path), ('join_history', history_path)]:
+            join = JoinData(paths[0], paratec_path, *paths[2:])
+            clean = join.get_stage('clean')
+            start = time.perf_counter()
+            df = join._join_reservas(clean)
+            seconds = time.perf_counter() - start
+            if reference is None:
+                reference = df
+            if case == 'join_history':
+                # Each row has the coordinates of the snapshot of its date (the first or last one out of the year)
+                expected = pd.concat([data.assign(Fecha=pd.Timestamp(as_of), CodigoEmbalse=join.index.lookup(data['reservoir']))
+                                      for as_of, data in snapshots.items()]).dropna(subset=['CodigoEmbalse'])
+                expected = expected.drop_duplicates(subset=['Fecha', 'CodigoEmbalse'])[['Fecha', 'CodigoEmbalse', 'latitude']]
+                fechas = df['Fecha'].clip(pd.Timestamp(dates[0]), pd.Timestamp(dates[-1]))
+                expected = pd.DataFrame({'Fecha': fechas, 'CodigoEmbalse': df['CodigoEmbalse'].astype(str)}).merge(
+                    expected.astype({'CodigoEmbalse': str}), how='left', on=['Fecha', 'CodigoEmbalse'])
+                check = np.array_equal(df['latitude'].to_numpy(), expected['latitude'].to_numpy(), equal_nan=True)
+            else:
+                check = df.equals(reference)
+            results.append({'case': case, 'rows': len(df), 'bytes': data_size(paratec_path), 'seconds': seconds, 'check': check})
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_paratec().to_string(index=False))
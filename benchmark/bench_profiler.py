@@ -0,0 +1,55 @@
+import os
+import time
+import tempfile
+import pandas as pd
+from src.ResourceManager import Profiler
+from src.Analysis.TransformData import JoinData
+from test.synthetic import load_join_data
+
+
+def run_transform(tmp: str) -> None:
+    """
+    Runs all the stages of JoinData over the Parquet copies of load_join_data and saves the four results.
+    """
+    join = JoinData(*[os.path.join(tmp, f'{name}.parquet') for name in ['oni', 'paratec', 'reservas', 'aportes', 'embalses']])
+    for stale in [False, True]:
+        join.save_data_not_agregate(stale=stale, results_path=tmp)
+        join.save_data_agregate(stale=stale, results_path=tmp)
+
+
+def benchmark_profiler(repeat: int = 5) -> pd.DataFrame:
+    """
+    Measures the overhead of the tracer on the transformation (disabled, spans only and spans with the cProfile
+    hook on every root span) and prints the summary of the spans of the last run (with cProfile).
+
+    Returns:
+        pd.DataFrame: Best time in seconds, overhead against the disabled tracer and number of spans of each mode.
+    """
+    modes = [('disabled', {'enabled': False}), ('spans', {'enabled': True}), ('spans_cprofile', {'enabled': True, 'profile': 'all'})]
+    with tempfile.TemporaryDirectory() as tmp:
+        load_join_data(tmp)
+        for folder in ['Standardized', 'NotStandardized']:
+            os.makedirs(os.path.join(tmp, folder))
+        # The modes are interleaved in each repetition, so the drift of the machine affects all of them
+        times = {name: [] for name, _ in modes}
+        spans = {}
+        for _ in range(repeat):
+            for name, settings in modes:
+                Profiler._tracer = Profiler.Tracer(profile_path=os.path.join(tmp, 'Traces'), **settings)
+                start = time.perf_counter()
+                run_transform(tmp)
+                times[name].append(time.perf_counter() - start)
+                spans[name] = len(Profiler.get_tracer().spans)
+        print(Profiler.get_tracer().summary().to_string(index=False))
+        print('Traza:', Profiler.get_tracer().save(os.path.join(tmp, 'Traces')))
+        results = [{'mode': name, 'seconds': min(times[name]), 'spans': spans[name]} for name, _ in modes]
+        Profiler._tracer = None
+
+    results = pd.DataFrame(results)
+    results['overhead'] = results['seconds'] / results['seconds'].iloc[0] - 1
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_profiler().to_string(index=False))
@@ -0,0 +1,70 @@
+import time
+import pandas as pd
+from src.ResourceManager.Storage import read_data
+from src.GetData.SIMEM import DataSIMEM, compact_frame, memory_report
+from test.synthetic import synthetic_aportes
+
+
+def raw_history() -> dict:
+    """
+    Returns the full history of the three SIMEM data sets as ReadSIMEM returns them (dates as text and energies
+    as float64): the reservoir history and the reservoir list of the repository, and synthetic water contributions
+    for the same dates when AportesHidricos is not available.
+    """
+    reservas = read_data('Data/Cleansed/SIMEM/ReservasHidraulicasEnergía.xlsx')
+    energies = ['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia']
+    reservas = reservas.astype({column: 'float64' for column in energies})
+    reservas.insert(0, 'FechaPublicacion', reservas['Fecha'].astype(str))
+    reservas['Fecha'] = reservas['Fecha'].astype(str)
+
+    aportes = synthetic_aportes(reservas)
+    aportes['Fecha'] = aportes['Fecha'].dt.strftime('%Y-%m-%d')
+    aportes.insert(0, 'FechaPublicacion', aportes['Fecha'])
+
+    embalses = read_data('Data/Raw/SIMEM/ListadoEmbalses.xlsx').astype(str)
+    return {'B0E933': reservas, 'A0CF2A': embalses, 'BA1C55': aportes}
+
+
+def clean_bytes(data_sets: dict) -> int:
+    """
+    Memory of the data sets after the cleaning of DataSIMEM.
+    """
+    simem = DataSIMEM(data_sets=dict(data_sets))
+    return int(memory_report(simem._clean_data())['bytes'].sum())
+
+
+def benchmark_schema(repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares the memory of the SIMEM data sets as they are read against the compact schema, with the exact
+    downcast of the energies (the default) and always downcasting them to float32, before and after the cleaning.
+
+    Returns:
+        pd.DataFrame: Rows, memory in MB, reduction against the raw types, seconds of the cast and the maximum
+            difference of the energies of each data set and schema.
+    """
+    raw = raw_history()
+    results = []
+    for name, exact in [('raw', None), ('compact_exact', True), ('compact_float32', False)]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data_sets = raw if exact is None else {data_id: compact_frame(data, data_id, exact=exact) for data_id, data in raw.items()}
+            times.append(time.perf_counter() - start)
+        report = memory_report(data_sets).groupby('data_id', sort=False)['bytes'].sum()
+        for data_id, data in data_sets.items():
+            floats = raw[data_id].select_dtypes('float64').columns
+            error = (data[floats].astype('float64') - raw[data_id][floats]).abs().max().max() if len(floats) else 0.0
+            results.append({'schema': name, 'data_id': data_id, 'rows': len(data), 'mb': report[data_id] / 1024 ** 2,
+                            'seconds': min(times), 'max_error': float(error)})
+        results.append({'schema': name, 'data_id': 'clean', 'rows': None, 'mb': clean_bytes(data_sets) / 1024 ** 2,
+                        'seconds': None, 'max_error': None})
+
+    results = pd.DataFrame(results)
+    base = results[results['schema'] == 'raw'].set_index('data_id')['mb']
+    results['reduction'] = 1 - results['mb'] / base.loc[results['data_id']].to_numpy()
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_schema().to_string(index=False))
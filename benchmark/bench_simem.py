@@ -0,0 +1,34 @@
+import time
+import pandas as pd
+from datetime import date
+from src.GetData.SIMEM import DataSIMEM
+from test.synthetic import StubReadSIMEM
+
+
+def benchmark_simem(start_date: date = date(2013, 1, 1), end_date: date = date(2025, 5, 1)) -> pd.DataFrame:
+    """
+    Compares the time to retrieve all the SIMEM data sets with one sequential request per data set
+    against date chunks retrieved concurrently, using the local stub of ReadSIMEM.
+
+    Returns:
+        pd.DataFrame: Time in seconds and rows retrieved by configuration.
+    """
+    configurations = [
+        {'max_workers': 1, 'chunk_freq': None},
+        {'max_workers': 4, 'chunk_freq': None},
+        {'max_workers': 4, 'chunk_freq': 'YS'},
+        {'max_workers': 8, 'chunk_freq': 'YS'},
+        {'max_workers': 16, 'chunk_freq': 'QS'}
+    ]
+    results = []
+    for configuration in configurations:
+        simem = DataSIMEM(reader=StubReadSIMEM, **configuration)
+        start = time.perf_counter()
+        data_sets = simem.get_simem_data(start_date, end_date)
+        elapsed = time.perf_counter() - start
+        results.append({**configuration, 'seconds': elapsed, 'rows': sum(len(data) for data in data_sets.values())})
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    print(benchmark_simem().to_string(index=False))
@@ -0,0 +1,75 @@
+import os
+import time
+import zipfile
+import tempfile
+import pandas as pd
+from src.ResourceManager.Storage import read_data, write_data
+
+
+def _folder_size(path: str) -> int:
+    """
+    Returns the size in bytes of a file or of all the files of a folder.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path) for file in files)
+
+
+def benchmark_storage(data_path: str = 'Data') -> pd.DataFrame:
+    """
+    Compares the read/write time and the file size of the Excel files of Data/ against Parquet.
+
+    Args:
+        data_path (str, optional): Path of the Data folder. Defaults to 'Data'.
+
+    Returns:
+        pd.DataFrame: One row per Excel file with the times in seconds and the sizes in bytes.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for root, _, files in os.walk(data_path):
+            for file in files:
+                name, extension = os.path.splitext(file)
+                xlsx_path = os.path.join(root, file)
+                # Raw PARATEC payloads were saved as JSON with the .xlsx extension
+                if extension != '.xlsx' or not zipfile.is_zipfile(xlsx_path):
+                    continue
+
+                start = time.perf_counter()
+                data = read_data(xlsx_path)
+                xlsx_read = time.perf_counter() - start
+
+                start = time.perf_counter()
+                write_data(data, os.path.join(tmp, file))
+                xlsx_write = time.perf_counter() - start
+
+                parquet_path = os.path.join(tmp, name + '.parquet')
+                partition_on = 'Fecha' if 'Fecha' in data.columns else None
+                start = time.perf_counter()
+                write_data(data, parquet_path, partition_on=partition_on)
+                parquet_write = time.perf_counter() - start
+
+                start = time.perf_counter()
+                read_data(parquet_path)
+                parquet_read = time.perf_counter() - start
+
+                results.append({
+                    'file': xlsx_path,
+                    'rows': len(data),
+                    'xlsx_read_s': xlsx_read,
+                    'parquet_read_s': parquet_read,
+                    'xlsx_write_s': xlsx_write,
+                    'parquet_write_s': parquet_write,
+                    'xlsx_bytes': os.path.getsize(xlsx_path),
+                    'parquet_bytes': _folder_size(parquet_path)
+                })
+
+    results = pd.DataFrame(results)
+    results['read_speedup'] = results['xlsx_read_s'] / results['parquet_read_s']
+    results['size_ratio'] = results['parquet_bytes'] / results['xlsx_bytes']
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_storage('Data').to_string(index=False))
@@ -0,0 +1,88 @@
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from src.Analysis.Sweep import run_sweep, sweep_scores
+from benchmark.bench_metrics import mean_absolute_scaled_error
+from benchmark.bench_vif import synthetic_features
+
+
+# Previous implementation of funciones.search_param, kept as reference for the benchmark
+def search_param(base_model, X_train, y_train, X_test, y_test, base_params, search_param, search_range):
+    r2_train = []
+    r2_test = []
+    mase_train = []
+    mase_test = []
+    for param in search_range:
+        model_params = base_params
+        model_params[search_param] = param
+        current_model = base_model.set_params(**model_params)
+        current_model.fit(X_train, y_train)
+        r2_train.append(r2_score(y_train, current_model.predict(X_train)))
+        r2_test.append(r2_score(y_test, current_model.predict(X_test)))
+        mase_train.append(mean_absolute_scaled_error(y_train, current_model.predict(X_train), y_train=y_train))
+        mase_test.append(mean_absolute_scaled_error(y_test, current_model.predict(X_test), y_train=y_test))
+    return {"train": r2_train, "test": r2_test}, {"train": mase_train, "test": mase_test}
+
+
+def benchmark_sweep(days: int = 365 * 5, depths=tuple(range(2, 14)), repeat: int = 1) -> pd.DataFrame:
+    """
+    Compares the sequential search_param against the sweep runner with 1 to the number of CPUs processes, a sweep
+    resumed from its saved results and a sweep with early stopping, on a random forest over features like
+    EmbalsesAgregados, and checks that the metrics are the same.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup, candidates fitted and comparison of each strategy.
+    """
+    X = synthetic_features(days)
+    y = (X['VolumenUtilDiarioEnergia'] * 2 + X['AportesHidricosEnergia'] ** 2 + np.random.default_rng(1).normal(size=len(X))).to_numpy()
+    X = X.drop(columns='VolumenUtilDiarioEnergia').to_numpy()
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+
+    base_params = {'n_estimators': 30, 'random_state': 0, 'n_jobs': 1}
+    expected = search_param(RandomForestRegressor(), X_train, y_train, X_test, y_test, dict(base_params), 'max_depth', depths)
+    cpus = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def sweep(workers: int, name: str = None, patience: int = None):
+            def function():
+                path = None if name is None else os.path.join(tmp, f'{name}.jsonl')
+                return run_sweep(RandomForestRegressor(), X_train, y_train, X_test, y_test, {'max_depth': list(depths)},
+                                 base_params=base_params, max_workers=workers, results_path=path, patience=patience)
+            return function
+
+        # The resumed sweep starts from the results saved by a full run
+        sweep(1, 'resumed')()
+        strategies = [('search_param', 1, lambda: search_param(RandomForestRegressor(), X_train, y_train, X_test, y_test,
+                                                                  dict(base_params), 'max_depth', depths))]
+        strategies += [('sweep', workers, sweep(workers)) for workers in sorted({1, 2, cpus})]
+        strategies += [('sweep_resumed', 1, sweep(1, 'resumed')), ('sweep_patience_2', 1, sweep(1, patience=2))]
+
+        results = []
+        for name, workers, function in strategies:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = function()
+                times.append(time.perf_counter() - start)
+            scores = output if name == 'search_param' else sweep_scores(output)
+            fitted = len(depths) if name == 'search_param' else int((output['evaluated'] & ~output['cached']).sum())
+            evaluated = ~np.isnan(scores[0]['test'])
+            same = all(np.allclose(np.asarray(scores[i][split_name])[evaluated], np.asarray(expected[i][split_name])[evaluated])
+                       for i in range(2) for split_name in ['train', 'test'])
+            results.append({'strategy': name, 'workers': workers, 'seconds': min(times), 'fitted': fitted,
+                            'evaluated': int(evaluated.sum()), 'same_result': same})
+
+    results = pd.DataFrame(results)
+    results['speedup'] = results['seconds'].iloc[0] / results['seconds']
+    results['cpus'] = cpus
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_sweep().to_string(index=False))
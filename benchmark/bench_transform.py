@@ -0,0 +1,170 @@
+import time
+import tempfile
+import tracemalloc
+import unicodedata
+import numpy as np
+import pandas as pd
+from src.Analysis.TransformData import JoinData
+from test.synthetic import load_join_data
+
+
+# Row-wise normalization of the names used by the previous implementation
+def strip_accents(s):
+    """
+    Remove accents from a given string.
+
+    Args:
+    s (str): The input string with accents.
+
+    Returns:
+    str: The input string without accents.
+    """
+    return ''.join(c for c in unicodedata.normalize('NFD', s)
+                   if unicodedata.category(c) != 'Mn')
+
+
+def legacy_merge_data_agregate(join: JoinData) -> pd.DataFrame:
+    """
+    Previous implementation of JoinData._merge_data_agregate, based on string dates and the ONI data expanded
+    to daily data, kept as reference.
+    """
+    df_paratec = join.df_paratec.assign(reservoir=join.df_paratec['reservoir'].str.replace(' ', '').apply(lambda x: strip_accents(x)))
+    df_embalses = join.df_simem_embalses.assign(NombreEmbalse=join.df_simem_embalses['NombreEmbalse'].str.replace(' ', '').apply(lambda x: strip_accents(x)))
+    df_reservas = join.df_simem_reservas.copy()
+    df_oni = join.df_oni.copy()
+    df_aportes = join.df_simem_aportes.copy()
+    df_reservas['RegionHidrologica'] = df_reservas['RegionHidrologica'].astype(str)
+    df_aportes['RegionHidrologica'] = df_aportes['RegionHidrologica'].astype(str)
+    df_oni = df_oni.set_index('Date').resample('D').ffill().reset_index()
+
+    df_merged = df_paratec.merge(df_embalses, how='left', left_on='reservoir', right_on='NombreEmbalse')
+    df_merged = df_merged[['reservoir','latitude','longitude','CodigoEmbalse']].merge(df_embalses, how='left', left_on='reservoir', right_on='CodigoEmbalse')
+    df_merged['CodigoEmbalse'] = df_merged['CodigoEmbalse_x'].combine_first(df_merged['CodigoEmbalse_y'])
+    df_merged = df_merged[['latitude','longitude','CodigoEmbalse']]
+    df_reservas['Fecha'] = df_reservas['Fecha'].astype(str)
+    df_oni['Date'] = df_oni['Date'].astype(str)
+    df_merge = df_reservas.merge(df_oni, how='left', left_on='Fecha', right_on='Date')
+    df_merge = df_merge[df_merge['Date'].notnull()].drop(columns=['Date'])
+    df_merge = df_merge.merge(df_merged, how='left', left_on='CodigoEmbalse', right_on='CodigoEmbalse')
+    df_merge = df_merge[['Fecha','VolumenUtilDiarioEnergia','CapacidadUtilEnergia','VolumenTotalEnergia',
+                         'VertimientosEnergia','RegionHidrologica','SST','ANOM','latitude','longitude']].copy()
+    df_merge['Fecha'] = pd.to_datetime(df_merge['Fecha'])
+    df_merge['Dia'] = df_merge['Fecha'].dt.day
+    df_merge['Mes'] = df_merge['Fecha'].dt.month
+    df_merge['Año'] = df_merge['Fecha'].dt.year
+    df_merge = df_merge.drop(columns=['Fecha'])
+
+    df_merge['Fecha'] = df_merge['Dia'].astype(str) + '-' + df_merge['Mes'].astype(str) + '-' + df_merge['Año'].astype(str)
+    df_res = df_merge.groupby(['Fecha', 'RegionHidrologica']).agg({
+        'VolumenUtilDiarioEnergia': 'mean', 'CapacidadUtilEnergia': 'mean', 'VolumenTotalEnergia': 'max',
+        'VertimientosEnergia': 'sum', 'SST': 'mean', 'ANOM': 'mean'}).reset_index()
+    df_aportes['PromedioAcumuladoEnergia'] = df_aportes['PromedioAcumuladoEnergia'].ffill()
+    df_aportes['MediaHistoricaEnergia'] = df_aportes['MediaHistoricaEnergia'].bfill()
+    df_apo = df_aportes.groupby(['Fecha', 'RegionHidrologica']).agg({
+        'AportesHidricosEnergia': 'sum', 'PromedioAcumuladoEnergia': 'mean', 'MediaHistoricaEnergia': 'max'}).reset_index()
+    df_res['Fecha'] = df_res['Fecha'].astype(str)
+    df_apo['Fecha'] = df_apo['Fecha'].astype(str)
+    df = df_res.merge(df_apo, how='left', on=['Fecha', 'RegionHidrologica'])
+    df['PromedioAcumuladoEnergia'] = df['PromedioAcumuladoEnergia'].ffill()
+    df['MediaHistoricaEnergia'] = df['MediaHistoricaEnergia'].bfill()
+    df['Dia'] = df['Fecha'].apply(lambda x: int(x.split('-')[2]))
+    df['Mes'] = df['Fecha'].apply(lambda x: int(x.split('-')[1]))
+    df['Año'] = df['Fecha'].apply(lambda x: int(x.split('-')[0]))
+    df = df.drop(columns=['Fecha'])
+    return pd.get_dummies(df)
+
+
+def benchmark_transform(repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares the string based aggregation of the reservoir history against the datetime64 implementation
+    and checks that both give the same reservoir aggregates.
+
+    Returns:
+        pd.DataFrame: Best time in seconds of each implementation, speedup and comparison of the outputs.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        join = load_join_data(tmp)
+        clean = join.get_stage('clean')
+
+    def datetime64(join: JoinData) -> pd.DataFrame:
+        return join._merge_data_agregate(join._aggregate_regions(join._join_reservas(clean), clean))
+
+    timings = {}
+    outputs = {}
+    for name, function in [('legacy_string', legacy_merge_data_agregate), ('datetime64', datetime64)]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = function(join)
+            times.append(time.perf_counter() - start)
+        timings[name] = min(times)
+
+    # The previous implementation read Dia and Año from swapped positions
+    legacy = outputs['legacy_string'].rename(columns={'Dia': 'Año', 'Año': 'Dia'})
+    current = outputs['datetime64']
+    keys = ['Año', 'Mes', 'Dia'] + [column for column in current.columns if column.startswith('RegionHidrologica_')]
+    reservoir_columns = ['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia', 'SST', 'ANOM']
+    # The daily ONI data of the previous implementation ended in the first day of the last ONI month
+    legacy[keys] = legacy[keys].astype('int64')
+    current = current.astype({key: 'int64' for key in keys})
+    compared = legacy.merge(current, how='inner', on=keys, suffixes=('_legacy', ''))
+    same_values = len(compared) == len(legacy) and all(
+        np.allclose(compared[f'{column}_legacy'], compared[column], equal_nan=True) for column in reservoir_columns)
+
+    return pd.DataFrame([{
+        'rows_reservas': len(join.df_simem_reservas),
+        'rows_output': len(current),
+        'rows_legacy_output': len(legacy),
+        'legacy_string_s': timings['legacy_string'],
+        'datetime64_s': timings['datetime64'],
+        'speedup': timings['legacy_string'] / timings['datetime64'],
+        'identical_reservoir_aggregates': same_values,
+        # The string keys of the previous implementation ('D-M-Y' against 'Y-M-D') never matched the water contributions
+        'legacy_aportes_joined': int(legacy['AportesHidricosEnergia'].notnull().sum()),
+        'datetime64_aportes_joined': int(current['AportesHidricosEnergia'].notnull().sum())
+    }])
+
+
+def benchmark_oni_join(repeat: int = 3) -> pd.DataFrame:
+    """
+    Compares attaching the monthly ONI data to each reservoir day by expanding it to daily data and merging
+    against the lookup by month of JoinData._join_period, in time and peak memory.
+
+    Returns:
+        pd.DataFrame: Best time in seconds and peak memory in MiB of each strategy and if the outputs are equal.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        join = load_join_data(tmp)
+    reservas = join.df_simem_reservas
+
+    def daily_merge() -> pd.DataFrame:
+        df_oni = join.df_oni.set_index('Date').resample('D').ffill().reset_index()
+        return reservas.merge(df_oni, how='inner', left_on='Fecha', right_on='Date').drop(columns=['Date'])
+
+    def period_lookup() -> pd.DataFrame:
+        return JoinData._join_period(reservas, join.df_oni, 'Date', ['SST', 'ANOM'], 'M')
+
+    results = []
+    outputs = {}
+    for name, function in [('daily_merge', daily_merge), ('period_lookup', period_lookup)]:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = function()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append({'strategy': name, 'seconds': min(times), 'peak_mib': peak / 1024 ** 2, 'rows': len(outputs[name])})
+
+    # The daily data ends in the first day of the last ONI month, the lookup by month also covers the rest of that month
+    compared = outputs['daily_merge'].merge(outputs['period_lookup'], how='left', on=['Fecha', 'CodigoEmbalse'], suffixes=('', '_period'))
+    results = pd.DataFrame(results)
+    results['same_values'] = np.allclose(compared[['SST', 'ANOM']], compared[['SST_period', 'ANOM_period']])
+    return results
+
+
+if __name__ == '__main__':
+    print(benchmark_transform().T.to_string(header=False))
+    print(benchmark_oni_join().to_string(index=False))
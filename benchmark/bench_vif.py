@@ -0,0 +1,101 @@
+import time
+import numpy as np
+import pandas as pd
+from src.Analysis.Collinearity import vif, prune_vif
+from src.Analysis.TransformData import reservas_aggregations, aportes_aggregations
+from test.synthetic import regions
+
+
+# Per-column regressions of the previous checkVIF: OLS of each column on the others without intercept (uncentered R2),
+# kept as reference for the benchmark. Over centered columns it is the VIF with intercept, the default of vif
+def variance_inflation_factor(exog: np.ndarray, exog_idx: int) -> float:
+    x_i = exog[:, exog_idx]
+    x_noti = np.delete(exog, exog_idx, axis=1)
+    coefficients = np.linalg.lstsq(x_noti, x_i, rcond=None)[0]
+    ssr = np.sum((x_i - x_noti @ coefficients) ** 2)
+    return np.inf if ssr == 0 else float(x_i @ x_i / ssr)
+
+
+def prune_vif_recompute(X: pd.DataFrame, threshold: float) -> list:
+    """
+    Pruning that computes all the VIF again after each removal, as reference for the incremental update.
+    """
+    columns = list(X.columns)
+    while columns:
+        values = vif(X[columns])
+        if values.max() <= threshold:
+            break
+        columns.remove(values.idxmax())
+    return columns
+
+
+def synthetic_features(days: int, collinear: bool = False, seed: int = 0) -> pd.DataFrame:
+    """
+    Features like EmbalsesAgregados: correlated daily aggregates by region, ONI and the one-hot region, year and month.
+    With collinear a column is the sum of two others, so the correlation matrix is singular.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2000-01-01', periods=days, freq='D')
+    df = pd.DataFrame({'Fecha': np.repeat(dates.to_numpy(), len(regions)), 'RegionHidrologica': np.tile(regions, days)})
+    common = rng.normal(size=len(df))
+    for column in list(reservas_aggregations) + list(aportes_aggregations) + ['SST', 'ANOM']:
+        df[column] = common * rng.uniform(0.2, 2) + rng.normal(size=len(df))
+    if collinear:
+        df['VolumenTotalEnergia'] = df['VolumenUtilDiarioEnergia'] + df['CapacidadUtilEnergia']
+    df['Year'] = df['Fecha'].dt.year.astype('string')
+    df['Month'] = df['Fecha'].dt.month.astype('string')
+    return pd.get_dummies(df.drop(columns='Fecha'), columns=['RegionHidrologica', 'Year', 'Month'], drop_first=True, dtype='float64')
+
+
+def benchmark_vif(sizes=((365 * 5, False), (365 * 20, False), (365 * 20, True)), repeat: int = 3, threshold: float = 5.0) -> pd.DataFrame:
+    """
+    Compares the VIF with one regression per column against the single inversion of the correlation matrix, and the
+    pruning that recomputes the VIF after each removal against the incremental update of the inverse.
+
+    Returns:
+        pd.DataFrame: Best time in seconds, speedup and comparison with the reference of each method and size.
+    """
+    results = []
+    for days, collinear in sizes:
+        X = synthetic_features(days, collinear)
+        exog = X.to_numpy() - X.to_numpy().mean(axis=0)
+        expected = np.array([variance_inflation_factor(exog, i) for i in range(X.shape[1])])
+        expected_columns = prune_vif_recompute(X, threshold)
+
+        strategies = [
+            ('vif_per_column', lambda: np.array([variance_inflation_factor(exog, i) for i in range(X.shape[1])]), 'vif'),
+            ('vif_inverse', lambda: vif(X).to_numpy(), 'vif'),
+            ('prune_recompute', lambda: prune_vif_recompute(X, threshold), 'prune'),
+            ('prune_incremental', lambda: prune_vif(X, threshold)[0], 'prune')
+        ]
+        for name, function, kind in strategies:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                output = function()
+                times.append(time.perf_counter() - start)
+            if kind == 'vif':
+                # The regressions of the collinear columns leave only rounding errors, so their VIF is ~1e28 instead of inf
+                finite = expected < 1e12
+                same = bool(np.array_equal(finite, output < 1e12) and np.allclose(output[finite], expected[finite], rtol=1e-6))
+            else:
+                same = output == expected_columns
+            results.append({
+                'rows': len(X),
+                'features': X.shape[1],
+                'collinear': collinear,
+                'method': name,
+                'seconds': min(times),
+                'same_result': same
+            })
+
+    results = pd.DataFrame(results)
+    reference = results['method'].map({'vif_inverse': 'vif_per_column', 'prune_incremental': 'prune_recompute'}).fillna(results['method'])
+    base = results.set_index(['rows', 'collinear', 'method'])['seconds']
+    results['speedup'] = base.loc[list(zip(results['rows'], results['collinear'], reference))].to_numpy() / results['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    print(benchmark_vif().to_string(index=False))
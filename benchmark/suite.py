@@ -0,0 +1,366 @@
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Callable, Dict, List, Tuple
+from src.Analysis.TransformData import JoinData, StreamJoinData, reservas_aggregations
+from src.GetData.SIMEM import compact_frame, clean_frame
+from src.GetData.PARATEC import read_history, diff_snapshot, apply_versions
+from src.ResourceManager.Profiler import enable_tracing
+from test.synthetic import write_data_sets, simem_data, paratec_reservoirs, start_date
+
+# Scale of the synthetic data (reservoirs x years), repetitions of each case and stored baseline
+default_scale = (25, 5)
+default_repeat = 5
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Minimum duration of each timed sample, the fast cases are called several times by sample
+sample_seconds = 0.05
+
+# A case is slower than the baseline when its best time by call grows more than the tolerance, the cases faster
+# than min_seconds are not compared (their time is mostly noise)
+regression_tolerance = 0.3
+min_seconds = 0.001
+
+# Micro-benchmarks: name -> (group, setup). The setup receives the Context of the scale and returns the function
+# timed, that takes no arguments, or None when the case does not apply to the Context
+cases: Dict[str, Tuple[str, Callable]] = {}
+
+
+def case(name: str, group: str):
+    """
+    Registers the setup of a micro-benchmark in cases.
+    """
+    def register(setup: Callable) -> Callable:
+        cases[name] = (group, setup)
+        return setup
+    return register
+
+
+class Context:
+    """
+    Synthetic data of a scale shared by the cases: the cleansed files written once in a temporary folder and the
+    JoinData built over them with all its stages computed.
+
+    Attributes:
+        reservoirs (int): Number of reservoirs.
+        years (int): Number of years.
+        engine (str): Aggregation engine of JoinData.
+        backend (str): Backend of JoinData ('pandas' or 'polars').
+        path (str): Data folder of the synthetic data.
+        paths (Dict[str, str]): Paths of the data sets by argument of JoinData.
+    """
+
+    def __init__(self, path: str, reservoirs: int, years: int, engine: str = None, backend: str = None) -> None:
+        self.reservoirs = reservoirs
+        self.years = years
+        self.engine = engine
+        self.backend = backend
+        self.path = path
+        self.paths = write_data_sets(path, reservoirs, years)
+        self._join = None
+
+    @property
+    def join(self) -> JoinData:
+        if self._join is None:
+            self._join = self.new_join()
+            for stage in self._join.stages:
+                self._join.get_stage(stage)
+        return self._join
+
+    def new_join(self) -> JoinData:
+        return JoinData(*self.paths.values(), engine=self.engine, backend=self.backend)
+
+    def results_path(self) -> str:
+        path = tempfile.mkdtemp(dir=self.path)
+        for folder in ['Standardized', 'NotStandardized']:
+            os.makedirs(os.path.join(path, folder))
+        return path
+
+
+@case('join.read', 'JoinData')
+def _join_read(context: Context) -> Callable:
+    return context.new_join
+
+
+def _join_stage(stage: str) -> Callable:
+    # Each stage is timed alone, over the results of the stages it depends on (skipped when the backend has not the stage)
+    def setup(context: Context) -> Callable:
+        join = context.join
+        if stage not in join.stages:
+            return None
+        method, dependencies = join.stages[stage]
+        function = method if callable(method) else getattr(join, method)
+        arguments = [join.get_stage(dependency) for dependency in dependencies]
+        scaler = stage.replace('scaled_', '') if stage.startswith('scaled_') else None
+
+        def run():
+            if scaler:
+                # The scaler is fitted again in each run
+                join.scalers.pop(scaler, None)
+            return function(*arguments)
+        return run
+    return setup
+
+
+for _stage in {**JoinData.stages, **JoinData.plan_stages}:
+    case(f'join.{_stage}', 'JoinData')(_join_stage(_stage))
+
+
+@case('stream.not_agregate', 'StreamJoinData')
+def _stream_not_agregate(context: Context) -> Callable:
+    join = StreamJoinData(*context.paths.values(), engine=context.engine, backend=context.backend)
+    return lambda: join.save_data_not_agregate(stale=False, results_path=context.results_path())
+
+
+@case('stream.agregate', 'StreamJoinData')
+def _stream_agregate(context: Context) -> Callable:
+    join = StreamJoinData(*context.paths.values(), engine=context.engine, backend=context.backend)
+    return lambda: join.save_data_agregate(stale=False, results_path=context.results_path())
+
+
+@case('simem.compact', 'GetData')
+def _simem_compact(context: Context) -> Callable:
+    raw = simem_data('B0E933', start_date, datetime.date(start_date.year + context.years - 1, 12, 31), context.reservoirs)
+    return lambda: compact_frame(raw, 'B0E933')
+
+
+@case('simem.clean', 'GetData')
+def _simem_clean(context: Context) -> Callable:
+    raw = compact_frame(simem_data('B0E933', start_date, datetime.date(start_date.year + context.years - 1, 12, 31), context.reservoirs), 'B0E933')
+    return lambda: clean_frame(raw, 'B0E933')
+
+
+@case('paratec.diff', 'GetData')
+def _paratec_diff(context: Context) -> Callable:
+    # A history with a version by week of a moved reservoir, compared with a snapshot that moves half of them
+    data = paratec_reservoirs(context.reservoirs)
+    history = read_history('')
+    for week in range(52 * context.years):
+        data = data.assign(latitude=data['latitude'].where(data.index != week % len(data), data['latitude'] + 0.001))
+        history = apply_versions(history, diff_snapshot(history, data, start_date + datetime.timedelta(weeks=week)))
+    snapshot = data.assign(latitude=data['latitude'].where(data.index % 2 == 0, data['latitude'] + 0.001))
+    return lambda: diff_snapshot(history, snapshot, start_date + datetime.timedelta(weeks=52 * context.years))
+
+
+def _features(context: Context) -> pd.DataFrame:
+    return context.join.get_stage('agregate').astype('float64')
+
+
+@case('funciones.tidy_corr_matrix', 'funciones')
+def _tidy_corr_matrix(context: Context) -> Callable:
+    from src.GetData.funciones import tidy_corr_matrix
+    corr = _features(context).corr()
+    return lambda: tidy_corr_matrix(corr)
+
+
+@case('funciones.checkVIF', 'funciones')
+def _check_vif(context: Context) -> Callable:
+    from src.GetData.funciones import checkVIF
+    features = _features(context)[list(reservas_aggregations)]
+    return lambda: checkVIF(features)
+
+
+@case('funciones.podarVIF', 'funciones')
+def _podar_vif(context: Context) -> Callable:
+    from src.GetData.funciones import podarVIF
+    features = _features(context)
+    features = features.loc[:, features.std() > 0]
+    return lambda: podarVIF(features, umbral=5)
+
+
+@case('funciones.identificar_outliers', 'funciones')
+def _identificar_outliers(context: Context) -> Callable:
+    from src.GetData.funciones import identificar_outliers
+    data = context.join.get_stage('enrich')
+    return lambda: identificar_outliers(data, list(reservas_aggregations), by='RegionHidrologica')
+
+
+@case('funciones.eval_model', 'funciones')
+def _eval_model(context: Context) -> Callable:
+    from src.GetData.funciones import eval_model
+    features = _features(context)
+    X, y = features.drop(columns=['VolumenUtilDiarioEnergia']).to_numpy(), features['VolumenUtilDiarioEnergia'].to_numpy()
+
+    class LinearModel:
+        coef = np.linalg.lstsq(X, y, rcond=None)[0]
+
+        def predict(self, X):
+            return X @ self.coef
+    return lambda: eval_model(LinearModel(), X, y, sp=7)
+
+
+def measure(function: Callable, repeat: int = default_repeat, memory: bool = True) -> dict:
+    """
+    Times a function as timeit: each sample calls it as many times as fit in sample_seconds (estimated with a
+    warm-up call), and repeat samples are taken. A last call runs under tracemalloc for the peak of the memory allocated (numpy
+    and Python, plus the growth of the Arrow memory pool).
+
+    Returns:
+        dict: rows of the result (when it has a length), calls by sample, min, median and max seconds by call and peak_mb.
+    """
+    start = time.perf_counter()
+    result = function()
+    number = max(1, int(sample_seconds / max(time.perf_counter() - start, 1e-6)))
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    peak = None
+    if memory:
+        arrow = pa.total_allocated_bytes()
+        tracemalloc.start()
+        function()
+        peak = (tracemalloc.get_traced_memory()[1] + max(pa.total_allocated_bytes() - arrow, 0)) / 1024 ** 2
+        tracemalloc.stop()
+
+    rows = len(result) if isinstance(result, (pd.DataFrame, pd.Series, list)) else None
+    return {'rows': rows, 'number': number, 'min': min(times), 'median': float(np.median(times)), 'max': max(times), 'peak_mb': peak}
+
+
+def run_suite(scales: List[Tuple[int, int]] = (default_scale,), select: List[str] = None, repeat: int = default_repeat,
+              memory: bool = True, engine: str = None, backend: str = None) -> pd.DataFrame:
+    """
+    Runs the micro-benchmarks over the synthetic data of each scale.
+
+    Args:
+        scales (List[Tuple[int, int]], optional): Scales as (reservoirs, years). Defaults to (25, 5).
+        select (List[str], optional): Prefixes of the names of the cases to run. Defaults to None (all the cases).
+        repeat (int, optional): Timed runs of each case. Defaults to 5.
+        memory (bool, optional): Measure the peak memory of each case. Defaults to True.
+        engine (str, optional): Aggregation engine of JoinData. Defaults to None (the default engine).
+        backend (str, optional): Backend of JoinData. Defaults to None (the default backend).
+
+    Returns:
+        pd.DataFrame: One row by case and scale with the columns case, group, reservoirs, years, rows, number, min,
+            median, max (seconds by call) and peak_mb.
+    """
+    results = []
+    for reservoirs, years in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            context = Context(tmp, reservoirs, years, engine, backend)
+            for name, (group, setup) in cases.items():
+                if select and not any(name.startswith(prefix) for prefix in select):
+                    continue
+                function = setup(context)
+                if function is not None:
+                    results.append({'case': name, 'group': group, 'reservoirs': reservoirs, 'years': years,
+                                    **measure(function, repeat, memory)})
+    return pd.DataFrame(results)
+
+
+def environment() -> dict:
+    """
+    Returns the versions and the machine of a run, stored with the results.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit or None,
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__, 'pyarrow': pa.__version__,
+            'machine': platform.machine(), 'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def save_results(results: pd.DataFrame, path: str) -> str:
+    """
+    Saves the results of run_suite as JSON, with the environment of the run.
+    """
+    with open(path, 'w') as file:
+        json.dump({'environment': environment(), 'results': json.loads(results.to_json(orient='records'))}, file, indent=1)
+    return path
+
+
+def load_results(path: str) -> pd.DataFrame:
+    """
+    Reads results saved with save_results, None if the file does not exist.
+    """
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as file:
+        return pd.DataFrame(json.load(file)['results'])
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame, tolerance: float = regression_tolerance,
+            min_seconds: float = min_seconds) -> pd.DataFrame:
+    """
+    Compares the best time by call of each case with the baseline of the same scale.
+
+    Args:
+        results (pd.DataFrame): Results of run_suite.
+        baseline (pd.DataFrame): Stored results.
+        tolerance (float, optional): Relative growth of the time considered a regression. Defaults to 0.3.
+        min_seconds (float, optional): Cases faster than this in both runs are not compared. Defaults to 0.001.
+
+    Returns:
+        pd.DataFrame: Results with the baseline time, the ratio and the status of each case ('regression',
+            'improvement', 'ok', 'new' without baseline or 'fast' below min_seconds).
+    """
+    key = ['case', 'reservoirs', 'years']
+    compared = results.merge(baseline[key + ['min']].rename(columns={'min': 'baseline'}), how='left', on=key)
+    compared['ratio'] = compared['min'] / compared['baseline']
+    compared['status'] = np.select(
+        [compared['baseline'].isna(), compared[['min', 'baseline']].max(axis=1) < min_seconds,
+         compared['ratio'] > 1 + tolerance, compared['ratio'] < 1 / (1 + tolerance)],
+        ['new', 'fast', 'regression', 'improvement'], default='ok')
+    return compared
+
+
+def _scale(value: str) -> Tuple[int, int]:
+    reservoirs, years = value.lower().split('x')
+    return int(reservoirs), int(years)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the pipeline over synthetic data.')
+    parser.add_argument('--scale', type=_scale, action='append', help='Reservoirs x years, for example 25x5 (repeatable).')
+    parser.add_argument('--select', nargs='*', help='Prefixes of the cases to run, for example join. funciones.')
+    parser.add_argument('--repeat', type=int, default=default_repeat)
+    parser.add_argument('--engine', help='Aggregation engine of JoinData.')
+    parser.add_argument('--backend', help='Backend of JoinData (pandas or polars).')
+    parser.add_argument('--no-memory', action='store_true', help='Do not measure the peak memory.')
+    parser.add_argument('--output', help='JSON file for the results.')
+    parser.add_argument('--baseline', default=baseline_path, help='Stored results to compare with.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=regression_tolerance)
+    args = parser.parse_args(argv)
+
+    # The cases are measured with the tracing of the pipeline, as DataPipeline.run runs them
+    enable_tracing()
+    results = run_suite(args.scale or [default_scale], args.select, args.repeat, not args.no_memory, args.engine, args.backend)
+    if args.output:
+        save_results(results, args.output)
+    if args.save_baseline:
+        print('Línea base guardada en', save_results(results, args.baseline))
+
+    baseline = load_results(args.baseline)
+    if baseline is None or args.save_baseline:
+        print(results.to_string(index=False))
+        return 0
+    compared = compare(results, baseline, args.tolerance)
+    print(compared.to_string(index=False))
+    regressions = compared[compared['status'] == 'regression']
+    if not regressions.empty:
+        print(f"Casos más lentos que la línea base: {', '.join(regressions['case'])}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    sys.exit(main())
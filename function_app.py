@@ -1,6 +1,27 @@
+import logging
 import azure.functions as func
-from pydataxm.pydatasimem import ReadSIMEM
+from src.ResourceManager.Pipeline import pipeline_schedule, handle_timer, handle_request
 
-file = ReadSIMEM('BA1C55', str('2013-05-01'), str('2025-05-01'))
-data = file.main(filter=False)
-data.to_excel('Data\SIMEM\AportesHidricos.xlsx',index=False)
\ No newline at end of file
+# The pipeline is created on the first invocation and kept by the worker, importing this module does no work
+app = func.FunctionApp()
+
+
+@app.timer_trigger(schedule=pipeline_schedule, arg_name='timer', run_on_startup=False, use_monitor=False)
+def update_data(timer: func.TimerRequest) -> None:
+    """
+    Daily incremental load of ONI, PARATEC and SIMEM and update of the results.
+    """
+    report = handle_timer(timer.past_due)
+    logging.info('Pipeline: %s', report)
+    if report['status'] == 'error':
+        raise RuntimeError(report['error'])
+
+
+@app.route(route='pipeline', methods=['GET', 'POST'], auth_level=func.AuthLevel.FUNCTION)
+def run_pipeline(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Runs the pipeline on demand, the stages are given with the parameter stages (?stages=simem,transform).
+    """
+    status_code, body = handle_request(req.params.get('stages'))
+    logging.info('Pipeline: %s', body)
+    return func.HttpResponse(body, status_code=status_code, mimetype='application/json')
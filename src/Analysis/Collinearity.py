@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+# Default VIF threshold of the pruning (the usual thresholds are between 5 and 10)
+vif_threshold = 10.0
+
+
+def _correlation(X: pd.DataFrame, center: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the correlation matrix of the columns and the columns with zero variance (or zero norm).
+
+    With center it is the usual correlation, whose VIF are those of the regressions of each column on the others
+    with intercept. Without center it is the uncentered correlation (cosine similarity), whose VIF are those of the
+    regressions without intercept.
+    """
+    values = X.to_numpy(dtype='float64')
+    if center:
+        values = values - values.mean(axis=0)
+    gram = values.T @ values
+    scale = np.sqrt(np.diag(gram))
+    constant = scale == 0
+    scale[constant] = 1.0
+    return gram / np.outer(scale, scale), constant
+
+
+def _inverse(corr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the inverse of a correlation matrix and the columns that are linear combinations of the others.
+
+    When the matrix is singular (for example a complete set of dummies with a constant) the pseudo-inverse is used
+    and the columns of the collinear groups (the ones with weight in the null space) are returned.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    tolerance = max(eigenvalues.max(initial=0.0), 1.0) * len(corr) * np.finfo('float64').eps * 1e3
+    kept = eigenvalues > tolerance
+    inverse = (eigenvectors[:, kept] / eigenvalues[kept]) @ eigenvectors[:, kept].T
+    collinear = (np.abs(eigenvectors[:, ~kept]) > np.sqrt(tolerance)).any(axis=1)
+    return inverse, collinear
+
+
+def _vif(inverse: np.ndarray, excluded: np.ndarray) -> np.ndarray:
+    vif = np.diag(inverse).copy()
+    vif[excluded] = np.inf
+    return vif
+
+
+def vif(X: pd.DataFrame, center: bool = True) -> pd.Series:
+    """
+    Computes the Variance Inflation Factor of all the columns with a single inversion of their correlation matrix
+    (the VIF of a column is the diagonal element of the inverse), instead of one regression per column.
+
+    Args:
+        X (pd.DataFrame): Numeric features.
+        center (bool, optional): Use the centered correlation (regressions with intercept, as the default
+            standardize=True of statsmodels' variance_inflation_factor since 0.15). False gives the regressions without
+            intercept (standardize=False, the only form of the previous versions). Defaults to True.
+
+    Returns:
+        pd.Series: VIF of each column, inf for the columns that are linear combinations of the others.
+    """
+    corr, constant = _correlation(X, center)
+    inverse, collinear = _inverse(corr)
+    return pd.Series(_vif(inverse, collinear | constant), index=X.columns, name='VIF')
+
+
+def prune_vif(X: pd.DataFrame, threshold: float = vif_threshold, center: bool = True) -> Tuple[List[str], pd.DataFrame]:
+    """
+    Removes the column with the largest VIF until all the VIF are below the threshold.
+
+    The inverse of the correlation matrix is computed once and, after removing a column, updated with the
+    inverse of the submatrix (Schur complement) in O(p^2) instead of inverting it again. While there are collinear
+    columns (infinite VIF) the pseudo-inverse is recomputed after each removal.
+
+    Args:
+        X (pd.DataFrame): Numeric features.
+        threshold (float, optional): Maximum VIF of the columns kept. Defaults to 10.
+        center (bool, optional): Use the centered correlation (regressions with intercept). Defaults to True.
+
+    Returns:
+        Tuple[List[str], pd.DataFrame]: Columns kept and the columns removed in order with their VIF when removed.
+    """
+    columns = list(X.columns)
+    corr, constant = _correlation(X, center)
+    inverse, collinear = _inverse(corr)
+    excluded = collinear | constant
+
+    removed = []
+    while columns:
+        values = _vif(inverse, excluded)
+        worst = int(np.argmax(values))
+        if values[worst] <= threshold:
+            break
+        removed.append({'Features': columns[worst], 'VIF': values[worst]})
+
+        kept = np.arange(len(columns)) != worst
+        columns = [column for column, keep in zip(columns, kept) if keep]
+        corr, constant = corr[np.ix_(kept, kept)], constant[kept]
+        if excluded.any():
+            inverse, collinear = _inverse(corr)
+            excluded = collinear | constant
+        else:
+            # Inverse of the submatrix without the column: P[-k, -k] - P[-k, k] P[k, -k] / P[k, k]
+            column = inverse[kept, worst]
+            inverse = inverse[np.ix_(kept, kept)] - np.outer(column, column) / inverse[worst, worst]
+            excluded = excluded[kept]
+
+    return columns, pd.DataFrame(removed, columns=['Features', 'VIF'])
@@ -0,0 +1,171 @@
+import os
+import pandas as pd
+from typing import Dict, List
+
+# Default backend of the transformation of JoinData, can be changed with an environment variable
+default_backend = os.environ.get('TRANSFORM_BACKEND', 'pandas')
+
+# Available backends: 'pandas' runs each stage eagerly, 'polars' runs them as one lazy plan (requires polars)
+backends = ['pandas', 'polars']
+
+# Outputs of the lazy plan, the stages of JoinData that it replaces
+plan_outputs = ['enrich', 'not_agregate', 'regions', 'agregate']
+
+# Pandas dtype of the parts of the date of _split_date (pandas gives int32 to the three, polars Int8 to Dia and Mes)
+date_part_dtypes = {'Dia': 'int32', 'Mes': 'int32', 'Año': 'int32'}
+
+# Polars truncation of the pandas period frequencies of the covariates (the weeks start on Monday in both)
+period_units = {'D': '1d', 'W': '1w', 'M': '1mo', 'Q': '1q', 'Y': '1y'}
+
+
+def _import_polars():
+    """
+    Imports polars, which is only required by the polars backend.
+    """
+    try:
+        import polars
+    except ImportError:
+        raise ImportError("El motor polars requiere el paquete polars, instálelo con pip install polars", name='polars') from None
+    return polars
+
+
+def _from_pandas(pl, df: pd.DataFrame):
+    """
+    Converts a DataFrame to a LazyFrame, with the categoricals as Enum so they keep the order of their categories.
+    """
+    frame = pl.from_pandas(df.reset_index(drop=True))
+    categoricals = {column: pl.Enum(list(df[column].cat.categories.astype(str))) for column in df.select_dtypes('category').columns}
+    return frame.with_columns(**{column: pl.col(column).cast(dtype) for column, dtype in categoricals.items()}).lazy()
+
+
+def _join_period(pl, df, df_covariate, date: str, columns: List[str], freq: str, on: str = 'Fecha'):
+    """
+    Inner join of the covariate by the period of the date, with the last row of each period (as JoinData._join_period).
+    """
+    if freq not in period_units:
+        raise ValueError(f"La frecuencia {freq} no existe en el motor polars, las frecuencias disponibles son {list(period_units)}")
+    period = period_units[freq]
+    lookup = df_covariate.select(pl.col(date).dt.truncate(period).alias('_period'), *columns).unique('_period', keep='last', maintain_order=True)
+    return (df.drop(columns, strict=False).with_columns(pl.col(on).dt.truncate(period).alias('_period'))
+            .join(lookup, on='_period', how='inner', maintain_order='left').drop('_period'))
+
+
+def _join_coordinates(pl, df, df_coordenadas, dated: bool, on: str = 'Fecha'):
+    """
+    Left join of the coordinates valid on the date of each row (as JoinData._join_coordinates). The codes are
+    compared as strings, so categorical and string codes can be joined.
+    """
+    coordinates = df_coordenadas.with_columns(_code=pl.col('CodigoEmbalse').cast(pl.String)).drop('CodigoEmbalse')
+    df = df.with_columns(_code=pl.col('CodigoEmbalse').cast(pl.String))
+    if not dated:
+        # As the merge of pandas, the joined codes take the string type of the coordinates
+        return (df.join(coordinates.select('_code', 'latitude', 'longitude'), on='_code', how='left', maintain_order='left')
+                .with_columns(CodigoEmbalse=pl.col('_code')).drop('_code'))
+
+    valid = ((pl.col('valid_from').is_null() | (pl.col(on) >= pl.col('valid_from'))) &
+             (pl.col('valid_to').is_null() | (pl.col(on) < pl.col('valid_to'))))
+    df = df.with_row_index('_row')
+    rows = (df.select('_row', '_code', on).join(coordinates, on='_code', how='inner', maintain_order='left_right')
+            .filter(valid).unique('_row', keep='first', maintain_order=True).select('_row', 'latitude', 'longitude'))
+    return df.join(rows, on='_row', how='left', maintain_order='left').drop('_row', '_code')
+
+
+def _aggregation(pl, column: str, function: str, dtype):
+    """
+    Aggregation of a column. The means are the sum over the count as in pandas, whose sums are compensated (Kahan), so
+    the sums and means can differ from pandas in the last digit. The means of float columns keep their type (float32
+    as in pandas).
+    """
+    if function == 'mean':
+        mean = pl.col(column).sum() / pl.col(column).count()
+        return (mean.cast(dtype) if dtype.is_float() else mean).alias(column)
+    return getattr(pl.col(column), function)()
+
+
+def _aggregate(pl, df, keys: List[str], spec: Dict[str, str]):
+    """
+    Aggregates by the keys sorted by them, without the groups with missing keys (as Aggregate.aggregate).
+    """
+    schema = df.collect_schema()
+    return (df.filter(pl.all_horizontal(pl.col(keys).is_not_null()))
+            .group_by(keys).agg(_aggregation(pl, column, function, schema[column]) for column, function in spec.items()).sort(keys))
+
+
+def _split_date(pl, df):
+    """
+    Replaces the column Fecha with the columns Dia, Mes and Año (as JoinData._split_date).
+    """
+    fecha = pl.col('Fecha').dt
+    return df.with_columns(Dia=fecha.day(), Mes=fecha.month(), Año=fecha.year()).drop('Fecha')
+
+
+def _get_dummies(pl, df, schema):
+    """
+    One-hot encoding of the Enum columns with a column by category, at the end of the data (as pd.get_dummies).
+    """
+    categoricals = [(column, dtype.categories.to_list()) for column, dtype in schema.items() if isinstance(dtype, pl.Enum)]
+    dummies = [(pl.col(column) == category).fill_null(False).alias(f'{column}_{category}') for column, categories in categoricals for category in categories]
+    return df.with_columns(dummies).drop([column for column, _ in categoricals])
+
+
+def _pandas_dtypes(pl, schema) -> Dict[str, object]:
+    """
+    Pandas dtypes of the columns of an output whose to_pandas type differs from the pandas backend: the Enum are
+    unordered categoricals with the same categories and the parts of the date are int32 (see date_part_dtypes).
+    """
+    dtypes = {column: pd.CategoricalDtype(dtype.categories.to_list()) for column, dtype in schema.items() if isinstance(dtype, pl.Enum)}
+    return {**dtypes, **{column: dtype for column, dtype in date_part_dtypes.items() if column in schema}}
+
+
+def lazy_plan(clean: Dict[str, pd.DataFrame], covariates: Dict[str, dict], columns: List[str],
+              reservas_aggregations: Dict[str, str], aportes_aggregations: Dict[str, str], fills: Dict[str, str],
+              outputs: List[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Runs the enrich, not_agregate, regions and agregate stages of JoinData as one lazy plan of polars. The plan is
+    optimized as a whole (the shared enrich stage is computed once) and run in the thread pool of polars over Arrow
+    memory, then each output is converted to the pandas types of the pandas backend.
+
+    Args:
+        clean (Dict[str, pd.DataFrame]): Result of the clean stage (oni, coordenadas, reservas and aportes).
+        covariates (Dict[str, dict]): Coarse-grained covariates joined by period (see TransformData.covariates).
+        columns (List[str]): Columns of the enrich stage.
+        reservas_aggregations (Dict[str, str]): Aggregations of the reservoir data by date and region.
+        aportes_aggregations (Dict[str, str]): Aggregations of the water contributions data by date and region.
+        fills (Dict[str, str]): Fill ('ffill' or 'bfill') of the columns of the regions stage after the join.
+        outputs (List[str], optional): Outputs to compute. Defaults to all the outputs of plan_outputs.
+
+    Returns:
+        Dict[str, pd.DataFrame]: DataFrame of each output and unmatched, the codes of the reservoirs without coordinates.
+    """
+    pl = _import_polars()
+    outputs = outputs or plan_outputs
+    frames = {name: _from_pandas(pl, df) for name, df in clean.items()}
+    keys = ['Fecha', 'RegionHidrologica']
+
+    # Enrich: covariates by period and coordinates by reservoir (by date when PARATEC has several versions)
+    enrich = frames['reservas']
+    for name, covariate in covariates.items():
+        enrich = _join_period(pl, enrich, frames[name], **covariate)
+    dated = not clean['coordenadas'][['valid_from', 'valid_to']].isna().all(axis=None)
+    enrich = _join_coordinates(pl, enrich, frames['coordenadas'], dated).select(columns)
+
+    # Regions: aggregates by date and region joined, with the fills of the missing values
+    regions = _aggregate(pl, enrich, keys, reservas_aggregations).join(
+        _aggregate(pl, frames['aportes'], keys, aportes_aggregations), on=keys, how='left', maintain_order='left')
+    regions = regions.with_columns(**{column: pl.col(column).forward_fill() if fill == 'ffill' else pl.col(column).backward_fill()
+                                      for column, fill in fills.items()})
+
+    plans = {
+        'enrich': enrich,
+        'not_agregate': _split_date(pl, enrich.drop('CodigoEmbalse')),
+        'regions': regions,
+        'agregate': _get_dummies(pl, _split_date(pl, regions), regions.collect_schema()),
+        'unmatched': enrich.filter(pl.col('latitude').is_null()).select(pl.col('CodigoEmbalse').cast(pl.String)).drop_nulls().unique()
+    }
+    names = list(outputs) + ['unmatched']
+    results = dict(zip(names, pl.collect_all([plans[name] for name in names])))
+
+    # Arrow to pandas with the dtypes of the pandas backend, declared from the schema of each output (see _pandas_dtypes)
+    unmatched = results.pop('unmatched').to_pandas()
+    converted = {name: df.to_pandas().astype(_pandas_dtypes(pl, df.schema)) for name, df in results.items()}
+    return {**converted, 'unmatched': unmatched}
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+# Metrics computed by regression_metrics, in the order of the results
+metric_names = ['mae', 'rmse', 'r2', 'mase']
+
+# Default seasonal lag of the naive forecast of MASE (1 is the previous value, 7 the same day of the previous week)
+default_sp = 1
+
+
+def _naive_scale(y_train: np.ndarray, sp: int) -> np.ndarray:
+    """
+    Mean absolute error of the seasonal naive forecast of y_train (last axis), the scale of MASE.
+    As sktime, the scale is at least the machine epsilon to avoid dividing by zero.
+    """
+    if y_train.shape[-1] <= sp:
+        raise ValueError(f"La serie de entrenamiento debe tener más de {sp} valores para calcular el MASE")
+    scale = np.mean(np.abs(y_train[..., sp:] - y_train[..., :-sp]), axis=-1)
+    return np.maximum(scale, np.finfo('float64').eps)
+
+
+def regression_metrics(y_true, y_pred, y_train=None, sp: int = default_sp) -> Dict[str, np.ndarray]:
+    """
+    Computes MAE, RMSE, R² and MASE in a single pass over the errors.
+
+    The values are arrays whose last axis is the time, so several models or folds are evaluated at once by stacking
+    their predictions (shape models x n); y_true and y_train are broadcast against y_pred.
+
+    Args:
+        y_true (array-like): Real values, shape (n,) or stacked like y_pred.
+        y_pred (array-like): Predictions, shape (n,) or (..., n).
+        y_train (array-like, optional): Series of the scale of MASE, shape (m,) or stacked. Defaults to None (y_true).
+        sp (int, optional): Seasonal lag of the naive forecast of MASE. Defaults to 1.
+
+    Returns:
+        Dict[str, np.ndarray]: mae, rmse, r2 and mase, floats for one series or arrays with the leading shape of y_pred.
+    """
+    y_true = np.asarray(y_true, dtype='float64')
+    y_pred = np.asarray(y_pred, dtype='float64')
+    y_train = y_true if y_train is None else np.asarray(y_train, dtype='float64')
+    if y_true.shape[-1] != y_pred.shape[-1]:
+        raise ValueError(f"y_true y y_pred tienen diferente número de valores: {y_true.shape[-1]} y {y_pred.shape[-1]}")
+
+    errors = y_pred - y_true
+    absolute = np.mean(np.abs(errors), axis=-1)
+    squared = np.mean(errors * errors, axis=-1)
+    variance = np.var(y_true, axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(variance > 0, 1 - squared / variance, np.where(squared == 0, 1.0, 0.0))
+    metrics = {
+        'mae': absolute,
+        'rmse': np.sqrt(squared),
+        'r2': np.broadcast_to(r2, absolute.shape),
+        'mase': absolute / _naive_scale(y_train, sp)
+    }
+    return {name: value if np.ndim(value) else float(value) for name, value in metrics.items()}
+
+
+def metrics_table(y_true, predictions: Dict[str, object], y_train=None, sp: int = default_sp) -> pd.DataFrame:
+    """
+    Evaluates several models (or folds) at once and returns the results as a tidy table.
+
+    Args:
+        y_true (array-like): Real values, the same for all the models.
+        predictions (Dict[str, array-like]): Predictions of each model, all with the length of y_true.
+        y_train (array-like, optional): Series of the scale of MASE. Defaults to None (y_true).
+        sp (int, optional): Seasonal lag of the naive forecast of MASE. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: Columns model, metric and value, one row per model and metric.
+    """
+    names = list(predictions)
+    stacked = np.vstack([np.asarray(predictions[name], dtype='float64').ravel() for name in names])
+    metrics = regression_metrics(np.asarray(y_true, dtype='float64').ravel(), stacked,
+                                 None if y_train is None else np.asarray(y_train, dtype='float64').ravel(), sp)
+    return pd.DataFrame({
+        'model': np.repeat(names, len(metric_names)),
+        'metric': np.tile(metric_names, len(names)),
+        'value': np.column_stack([metrics[metric] for metric in metric_names]).ravel()
+    })
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+# Factor of the interquartile range used for the outlier bounds (Q1 - k * IQR, Q3 + k * IQR)
+iqr_factor = 1.5
+
+# Default number of weighted points kept per column (and group) by the streaming quantile sketch
+sketch_size = 2000
+
+
+def _groups(df: pd.DataFrame, by: str) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Returns the group code of each row (-1 for missing keys) and the groups, or a single group when by is None.
+    """
+    if by is None:
+        return np.zeros(len(df), dtype='int64'), pd.Index([None])
+    codes, groups = pd.factorize(df[by], sort=True)
+    return codes, pd.Index(groups, name=by)
+
+
+def _tidy_bounds(groups: pd.Index, columns: List[str], q1: np.ndarray, q3: np.ndarray, k: float) -> pd.DataFrame:
+    """
+    Returns the quartiles and bounds of each group and column (arrays of shape groups x columns) as a tidy DataFrame.
+    """
+    iqr = q3 - q1
+    bounds = pd.DataFrame({
+        'column': np.tile(columns, len(groups)),
+        'Q1': q1.ravel(),
+        'Q3': q3.ravel(),
+        'lower': (q1 - k * iqr).ravel(),
+        'upper': (q3 + k * iqr).ravel()
+    })
+    if groups.name is not None:
+        bounds.insert(0, groups.name, np.repeat(groups.to_numpy(), len(columns)))
+    return bounds
+
+
+def _quartiles(block: np.ndarray) -> np.ndarray:
+    """
+    Returns Q1 and Q3 (array of shape 2 x columns) of each column of a block of rows x columns, ignoring the missing
+    values and with the linear interpolation of pandas. The columns are sorted at once (the NaN go to the end).
+    """
+    values = np.sort(block.T, axis=1)
+    counts = (~np.isnan(values)).sum(axis=1)
+    positions = np.multiply.outer([0.25, 0.75], np.maximum(counts - 1, 0))
+    first = np.floor(positions).astype('int64')
+    last = np.ceil(positions).astype('int64')
+    columns = np.arange(len(values))
+    with np.errstate(invalid='ignore'):
+        quartiles = values[columns, first] + (values[columns, last] - values[columns, first]) * (positions - first)
+    quartiles[:, counts == 0] = np.nan
+    return quartiles
+
+
+def iqr_bounds(df: pd.DataFrame, columns: List[str], by: str = None, k: float = iqr_factor) -> pd.DataFrame:
+    """
+    Computes the quartiles and the outlier bounds of several columns at once, over a single NumPy block.
+
+    Args:
+        df (pd.DataFrame): Data.
+        columns (List[str]): Numeric columns.
+        by (str, optional): Column of the groups with their own bounds (RegionHidrologica, CodigoEmbalse).
+            Defaults to None (the same bounds for all the rows).
+        k (float, optional): Factor of the interquartile range. Defaults to 1.5.
+
+    Returns:
+        pd.DataFrame: Columns [by,] column, Q1, Q3, lower and upper, one row per group and column.
+    """
+    columns = list(columns)
+    block = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    codes, groups = _groups(df, by)
+
+    quartiles = np.full((2, len(groups), len(columns)), np.nan)
+    if by is None:
+        if len(block):
+            quartiles[:, 0] = _quartiles(block)
+    else:
+        # The rows are sorted by group once, so each group is a contiguous slice of the block
+        order = np.argsort(codes, kind='stable')
+        ends = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(groups)))
+        first = int((codes < 0).sum())
+        block = block[order]
+        for group, last in enumerate(ends + first):
+            if last > first:
+                quartiles[:, group] = _quartiles(block[first:last])
+            first = last
+
+    return _tidy_bounds(groups, columns, quartiles[0], quartiles[1], k)
+
+
+def outlier_mask(df: pd.DataFrame, columns: List[str], by: str = None, k: float = iqr_factor,
+                 bounds: pd.DataFrame = None, per_column: bool = False):
+    """
+    Identifies the outliers of several columns with the interquartile range rule, comparing the whole block of
+    columns against the bounds at once. The missing values and the groups without bounds are never outliers.
+
+    Args:
+        df (pd.DataFrame): Data.
+        columns (List[str]): Numeric columns.
+        by (str, optional): Column of the groups with their own bounds. Defaults to None.
+        k (float, optional): Factor of the interquartile range. Defaults to 1.5.
+        bounds (pd.DataFrame, optional): Bounds computed before, from iqr_bounds or QuantileSketch.bounds (for
+            example over the whole history, to check new partitions). Defaults to None (computed from df).
+        per_column (bool, optional): Return one column per variable instead of one value per row. Defaults to False.
+
+    Returns:
+        pd.Series | pd.DataFrame: True for the rows (or values when per_column) that are outliers, with the index of df.
+    """
+    columns = list(columns)
+    if bounds is None:
+        bounds = iqr_bounds(df, columns, by, k)
+
+    if by is None:
+        lower = bounds.set_index('column')['lower'].reindex(columns).to_numpy()
+        upper = bounds.set_index('column')['upper'].reindex(columns).to_numpy()
+    else:
+        # One row of bounds per group plus a last row without bounds for the groups that are not in bounds
+        lower = bounds.pivot(index=by, columns='column', values='lower').reindex(columns=columns)
+        upper = bounds.pivot(index=by, columns='column', values='upper').reindex(columns=columns)
+        rows = lower.index.get_indexer(df[by])
+        lower = np.vstack([lower.to_numpy(dtype='float64'), np.full(len(columns), np.nan)])[rows]
+        upper = np.vstack([upper.to_numpy(dtype='float64'), np.full(len(columns), np.nan)])[rows]
+
+    block = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    mask = (block < lower) | (block > upper)
+
+    if per_column:
+        return pd.DataFrame(mask, index=df.index, columns=columns)
+    return pd.Series(mask.any(axis=1), index=df.index)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of several columns computed by parts, for data that does not fit in memory (for example
+    the yearly partitions of StreamJoinData).
+
+    For each column (and group) the sketch keeps at most `size` weighted points: each part is merged with the points
+    and, when there are more than `size`, the sorted values are compressed into `size` bins of equal weight. While
+    the data fits in the sketch the quantiles are exact and equal to the ones of pandas.
+
+    Attributes:
+        columns (List[str]): Numeric columns.
+        by (str): Column of the groups, None for a single group.
+        size (int): Maximum number of points per column and group.
+        rows (int): Number of rows added.
+
+    Methods:
+        partial_fit: Adds a part of the data.
+        quantile: Returns the approximate quantiles.
+        bounds: Returns the outlier bounds, in the format of iqr_bounds.
+    """
+
+    def __init__(self, columns: List[str], by: str = None, size: int = sketch_size) -> None:
+        """
+        Initialize the QuantileSketch object.
+
+        Args:
+            columns (List[str]): Numeric columns.
+            by (str, optional): Column of the groups. Defaults to None.
+            size (int, optional): Maximum number of points per column and group. Defaults to 2000.
+        """
+        self.columns = list(columns)
+        self.by = by
+        self.size = size
+        self.rows = 0
+        self._points: Dict[object, List[Tuple[np.ndarray, np.ndarray]]] = {}
+
+    def _compress(self, values: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compresses sorted weighted values into at most `size` points of equal weight.
+        """
+        if len(values) <= self.size:
+            return values, weights
+
+        cumulative = np.cumsum(weights)
+        bins = np.minimum(((cumulative - weights / 2) / cumulative[-1] * self.size).astype('int64'), self.size - 1)
+        bin_weights = np.bincount(bins, weights, minlength=self.size)
+        bin_values = np.bincount(bins, weights * values, minlength=self.size)
+        used = bin_weights > 0
+        return bin_values[used] / bin_weights[used], bin_weights[used]
+
+    def partial_fit(self, df: pd.DataFrame) -> 'QuantileSketch':
+        """
+        Adds a part of the data to the sketch.
+
+        Args:
+            df (pd.DataFrame): Part of the data with the columns (and the group column) of the sketch.
+
+        Returns:
+            QuantileSketch: The updated sketch.
+        """
+        block = df[self.columns].to_numpy(dtype='float64', na_value=np.nan)
+        codes, groups = _groups(df, self.by)
+        for code, group in enumerate(groups):
+            rows = block[codes == code]
+            points = self._points.setdefault(group, [(np.empty(0), np.empty(0)) for _ in self.columns])
+            for i, column in enumerate(rows.T):
+                # The new values are sorted and compressed alone, so only the small summaries are merged
+                column = np.sort(column[~np.isnan(column)])
+                column, column_weights = self._compress(column, np.ones(len(column)))
+                values = np.concatenate([points[i][0], column])
+                weights = np.concatenate([points[i][1], column_weights])
+                order = np.argsort(values, kind='stable')
+                points[i] = self._compress(values[order], weights[order])
+        self.rows += len(df)
+        return self
+
+    def _quantile(self, values: np.ndarray, weights: np.ndarray, q: List[float]) -> np.ndarray:
+        if len(values) == 0:
+            return np.full(len(q), np.nan)
+        if len(values) == 1:
+            return np.repeat(values, len(q))
+        # Position of the center of each point, with the same interpolation as numpy and pandas for unit weights
+        cumulative = np.cumsum(weights)
+        positions = (cumulative - weights / 2 - 0.5) / (cumulative[-1] - 1)
+        return np.interp(q, positions, values)
+
+    def quantile(self, q: List[float]) -> pd.DataFrame:
+        """
+        Returns the approximate quantiles of each column (and group).
+
+        Args:
+            q (List[float]): Quantiles, between 0 and 1.
+
+        Returns:
+            pd.DataFrame: Columns [by,] column and one column per quantile.
+        """
+        groups = pd.Index(sorted(self._points, key=lambda group: (group is None, group)), name=self.by)
+        values = np.array([[self._quantile(*points, q) for points in self._points[group]] for group in groups])
+        values = values.reshape(len(groups) * len(self.columns), len(q))
+        quantiles = pd.DataFrame(values, columns=list(q))
+        quantiles.insert(0, 'column', np.tile(self.columns, len(groups)))
+        if self.by is not None:
+            quantiles.insert(0, self.by, np.repeat(groups.to_numpy(), len(self.columns)))
+        return quantiles
+
+    def bounds(self, k: float = iqr_factor) -> pd.DataFrame:
+        """
+        Returns the approximate quartiles and outlier bounds, in the format of iqr_bounds, to use in outlier_mask.
+
+        Args:
+            k (float, optional): Factor of the interquartile range. Defaults to 1.5.
+
+        Returns:
+            pd.DataFrame: Columns [by,] column, Q1, Q3, lower and upper.
+        """
+        if not self._points:
+            raise ValueError("El estimador de cuantiles no ha sido ajustado con datos")
+        quantiles = self.quantile([0.25, 0.75])
+        groups = pd.Index(quantiles[self.by].iloc[::len(self.columns)].to_numpy() if self.by is not None else [None], name=self.by)
+        shape = (len(groups), len(self.columns))
+        return _tidy_bounds(groups, self.columns, quantiles[0.25].to_numpy().reshape(shape), quantiles[0.75].to_numpy().reshape(shape), k)
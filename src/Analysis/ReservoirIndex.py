@@ -0,0 +1,185 @@
+import os
+import json
+import logging
+import difflib
+import hashlib
+import pandas as pd
+from typing import Dict, List
+
+# Logger of the errors that are handled
+logger = logging.getLogger(__name__)
+
+# Version of the index, increase it when the normalization or the matching change so the saved indexes are rebuilt
+index_version = 1
+
+# Default name of the file of the index, saved next to ListadoEmbalses
+index_file = 'ReservoirIndex.json'
+
+# Known names of PARATEC (normalized) that differ from the names and codes of ListadoEmbalses
+reservoir_aliases = {
+    'CALIMA': 'CALIMA1',
+    'URRA': 'URRA1',
+    'QUEBRADONA': 'QUBRADON'
+}
+
+# Minimum similarity (difflib ratio) of the fuzzy matches
+fuzzy_cutoff = 0.85
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """
+    Normalizes reservoir names to match them: upper case, without accents and without spaces or symbols.
+
+    Args:
+        names (pd.Series): Reservoir names.
+
+    Returns:
+        pd.Series: Normalized names.
+    """
+    return (names.astype('string').str.upper()
+            .str.normalize('NFD')
+            .str.replace('[\u0300-\u036f]', '', regex=True)
+            .str.replace(r'[^A-Z0-9]', '', regex=True))
+
+
+class ReservoirIndex:
+    """
+    Index of the SIMEM reservoir code (CodigoEmbalse) of each reservoir name.
+
+    The index is built from the names and codes of ListadoEmbalses, the aliases of reservoir_aliases and a
+    fuzzy match for the PARATEC names without an exact match. It is saved as JSON with its version and a digest of
+    the data used to build it, so it is rebuilt only when the data or the version change.
+
+    Attributes:
+        names (Dict[str, str]): CodigoEmbalse of each normalized name.
+        matches (Dict[str, dict]): Code, method ('exact', 'alias', 'fuzzy' or None) and score of each PARATEC reservoir.
+        source (str): Digest of the data used to build the index.
+
+    Methods:
+        build: Builds the index from ListadoEmbalses and PARATEC.
+        load: Loads the saved index or builds it when it is outdated.
+        save: Saves the index as JSON.
+        lookup: Returns the CodigoEmbalse of reservoir names.
+        report: Returns the match of each PARATEC reservoir.
+        unmatched: Returns the PARATEC reservoirs without CodigoEmbalse.
+    """
+
+    def __init__(self, names: Dict[str, str], matches: Dict[str, dict], source: str) -> None:
+        self.names = names
+        self.matches = matches
+        self.source = source
+
+    @staticmethod
+    def digest(df_embalses: pd.DataFrame, df_paratec: pd.DataFrame) -> str:
+        """
+        Returns the digest of the data used to build the index.
+        """
+        values = sorted(df_embalses['CodigoEmbalse'].astype(str) + '|' + df_embalses['NombreEmbalse'].astype(str))
+        values += sorted(df_paratec['reservoir'].astype(str)) + sorted(f'{k}|{v}' for k, v in reservoir_aliases.items())
+        return hashlib.sha256('\n'.join([str(index_version)] + values).encode()).hexdigest()
+
+    @classmethod
+    def build(cls, df_embalses: pd.DataFrame, df_paratec: pd.DataFrame) -> 'ReservoirIndex':
+        """
+        Builds the index from ListadoEmbalses and PARATEC.
+
+        Args:
+            df_embalses (pd.DataFrame): ListadoEmbalses with the columns CodigoEmbalse and NombreEmbalse.
+            df_paratec (pd.DataFrame): PARATEC with the column reservoir.
+
+        Returns:
+            ReservoirIndex: Index of the reservoirs.
+        """
+        # The codes are also valid names and a name matches its code before the name of another reservoir
+        names = dict(zip(normalize_names(df_embalses['NombreEmbalse']), df_embalses['CodigoEmbalse']))
+        names.update(zip(normalize_names(df_embalses['CodigoEmbalse']), df_embalses['CodigoEmbalse']))
+        names = {name: code for name, code in names.items() if not pd.isna(name)}
+        candidates = list(names)
+
+        matches = {}
+        for reservoir, name in zip(df_paratec['reservoir'], normalize_names(df_paratec['reservoir'])):
+            if name in names:
+                matches[reservoir] = {'CodigoEmbalse': names[name], 'method': 'exact', 'score': 1.0}
+            elif name in reservoir_aliases:
+                matches[reservoir] = {'CodigoEmbalse': reservoir_aliases[name], 'method': 'alias', 'score': 1.0}
+            else:
+                close = difflib.get_close_matches(name, candidates, n=1, cutoff=fuzzy_cutoff)
+                if close:
+                    score = difflib.SequenceMatcher(None, name, close[0]).ratio()
+                    matches[reservoir] = {'CodigoEmbalse': names[close[0]], 'method': 'fuzzy', 'score': score}
+                else:
+                    matches[reservoir] = {'CodigoEmbalse': None, 'method': None, 'score': 0.0}
+
+        # The PARATEC names are added to the lookup so they resolve without matching again
+        names.update({name: match['CodigoEmbalse'] for name, match in zip(normalize_names(pd.Series(list(matches))), matches.values())
+                      if match['CodigoEmbalse'] is not None})
+        return cls(names, matches, cls.digest(df_embalses, df_paratec))
+
+    @classmethod
+    def load(cls, path: str, df_embalses: pd.DataFrame, df_paratec: pd.DataFrame) -> 'ReservoirIndex':
+        """
+        Loads the saved index, building and saving it again when it does not exist or the data changed.
+
+        Args:
+            path (str): Path of the JSON file of the index.
+            df_embalses (pd.DataFrame): ListadoEmbalses with the columns CodigoEmbalse and NombreEmbalse.
+            df_paratec (pd.DataFrame): PARATEC with the column reservoir.
+
+        Returns:
+            ReservoirIndex: Index of the reservoirs.
+        """
+        source = cls.digest(df_embalses, df_paratec)
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+            if saved.get('version') == index_version and saved.get('source') == source:
+                return cls(saved['names'], saved['matches'], source)
+
+        index = cls.build(df_embalses, df_paratec)
+        index.save(path)
+        return index
+
+    def save(self, path: str) -> None:
+        """
+        Saves the index as JSON.
+
+        Args:
+            path (str): Path of the JSON file of the index.
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({'version': index_version, 'source': self.source, 'names': self.names, 'matches': self.matches},
+                          file, ensure_ascii=False, indent=1)
+        except OSError as e:
+            logger.error("Error al guardar el índice de embalses en la ruta %s: %s", path, e)
+
+    def lookup(self, names: pd.Series) -> pd.Series:
+        """
+        Returns the CodigoEmbalse of reservoir names (NaN when the name is not in the index).
+
+        Args:
+            names (pd.Series): Reservoir names.
+
+        Returns:
+            pd.Series: CodigoEmbalse of each name.
+        """
+        return normalize_names(names).map(self.names)
+
+    def report(self) -> pd.DataFrame:
+        """
+        Returns the match of each PARATEC reservoir.
+
+        Returns:
+            pd.DataFrame: Columns reservoir, CodigoEmbalse, method and score.
+        """
+        return pd.DataFrame([{'reservoir': reservoir, **match} for reservoir, match in self.matches.items()],
+                            columns=['reservoir', 'CodigoEmbalse', 'method', 'score'])
+
+    def unmatched(self) -> List[str]:
+        """
+        Returns the PARATEC reservoirs without CodigoEmbalse.
+
+        Returns:
+            List[str]: Names of the reservoirs.
+        """
+        return [reservoir for reservoir, match in self.matches.items() if match['CodigoEmbalse'] is None]
@@ -0,0 +1,154 @@
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import List
+
+# Logger of the errors that are handled
+logger = logging.getLogger(__name__)
+
+# Version of the saved scalers and extension of their files
+scaler_version = 1
+scaler_extension = '.scaler.json'
+
+
+class IncrementalScaler:
+    """
+    Min-max scaler that can be updated by parts and saved, so the data is scaled with the same bounds in the
+    training, in the daily updates and in the inference.
+
+    The bounds ignore the missing values (MinMaxScaler.partial_fit propagates the NaN of a part without data) and
+    the transformation is the one of sklearn's MinMaxScaler fitted with those bounds, computed without importing
+    sklearn so the transformation modules load fast.
+
+    Attributes:
+        columns (List[str]): Columns scaled.
+        data_min (pd.Series): Minimum of each column.
+        data_max (pd.Series): Maximum of each column.
+        rows (int): Number of rows used to fit the scaler.
+
+    Methods:
+        partial_fit: Updates the bounds with new data.
+        check: Checks that the scaler was fitted with the columns of the data.
+        transform: Scales the columns of a DataFrame.
+        save: Saves the scaler as JSON.
+        load: Loads a saved scaler.
+    """
+
+    def __init__(self, columns: List[str]) -> None:
+        """
+        Initialize the IncrementalScaler object.
+
+        Args:
+            columns (List[str]): Columns to scale.
+        """
+        self.columns = list(columns)
+        self.data_min = None
+        self.data_max = None
+        self.rows = 0
+        self._scale = None
+        self._offset = None
+
+    def partial_fit(self, df: pd.DataFrame) -> 'IncrementalScaler':
+        """
+        Updates the bounds of the columns with new data.
+
+        Args:
+            df (pd.DataFrame): New data with the columns of the scaler.
+
+        Returns:
+            IncrementalScaler: The updated scaler.
+        """
+        values = df[self.columns].astype('float64')
+        self.data_min = values.min() if self.data_min is None else np.fmin(self.data_min, values.min())
+        self.data_max = values.max() if self.data_max is None else np.fmax(self.data_max, values.max())
+        self.rows += len(df)
+        self._scale = None
+        self._offset = None
+        return self
+
+    def check(self, columns: List[str]) -> 'IncrementalScaler':
+        """
+        Checks that the scaler was fitted with the given columns, so a saved scaler is not applied to other data.
+
+        Args:
+            columns (List[str]): Columns of the data to scale.
+
+        Returns:
+            IncrementalScaler: The scaler.
+
+        Raises:
+            ValueError: When the columns of the scaler are not the given columns.
+        """
+        missing, extra = sorted(set(columns) - set(self.columns)), sorted(set(self.columns) - set(columns))
+        if missing or extra:
+            raise ValueError(f"El escalador no corresponde a las columnas de los datos (sin escalar: {missing}, ausentes en los datos: {extra}), "
+                             "vuelva a ajustarlo con refit_scaler=True")
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scales the columns of the scaler, without modifying the data.
+
+        Args:
+            df (pd.DataFrame): Data with the columns of the scaler.
+
+        Returns:
+            pd.DataFrame: Copy of the data with the scaled columns.
+        """
+        if self.data_min is None:
+            raise ValueError("El escalador no ha sido ajustado con datos")
+        if self._scale is None:
+            # As MinMaxScaler: the columns without range (constant) are only shifted
+            data_range = (self.data_max - self.data_min).to_numpy(dtype='float64', copy=True)
+            data_range[data_range < 10 * np.finfo('float64').eps] = 1.0
+            self._scale = 1.0 / data_range
+            self._offset = -self.data_min.to_numpy(dtype='float64') * self._scale
+
+        df_scaled = df.copy()
+        df_scaled[self.columns] = df[self.columns].to_numpy(dtype='float64') * self._scale + self._offset
+        return df_scaled
+
+    def save(self, path: str) -> None:
+        """
+        Saves the scaler as JSON.
+
+        Args:
+            path (str): Path of the file.
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({
+                    'version': scaler_version,
+                    'columns': self.columns,
+                    'data_min': self.data_min.tolist(),
+                    'data_max': self.data_max.tolist(),
+                    'rows': self.rows
+                }, file, ensure_ascii=False, indent=1)
+        except OSError as e:
+            logger.error("Error al guardar el escalador en la ruta %s: %s", path, e)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalScaler':
+        """
+        Loads a saved scaler.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            IncrementalScaler: Scaler saved, None when the file does not exist or is from another version.
+        """
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            saved = json.load(file)
+        if saved.get('version') != scaler_version:
+            return None
+
+        scaler = cls(saved['columns'])
+        scaler.data_min = pd.Series(saved['data_min'], index=scaler.columns, dtype='float64')
+        scaler.data_max = pd.Series(saved['data_max'], index=scaler.columns, dtype='float64')
+        scaler.rows = saved['rows']
+        return scaler
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid
+from typing import Dict, List
+from src.Analysis.Metrics import regression_metrics
+from src.ResourceManager.Profiler import span
+
+# Default number of processes of the sweeps, can be changed with an environment variable
+default_workers = int(os.environ.get('SWEEP_WORKERS', os.cpu_count() or 1))
+
+# Metrics where a lower value is better, for the early stopping
+lower_is_better = {'mase_train', 'mase_test'}
+
+# Metrics of each candidate, NaN for the candidates not evaluated after an early stop
+metrics = ['r2_train', 'r2_test', 'mase_train', 'mase_test', 'seconds']
+
+# Data of the worker processes, sent once per process instead of once per candidate
+_worker_data = {}
+
+
+def _digest(values) -> str:
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _data_digest(*arrays) -> str:
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(np.asarray(array, dtype='float64'))
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _set_worker_data(base_model, X_train, y_train, X_test, y_test) -> None:
+    _worker_data.update(base_model=base_model, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+
+
+def _fit_candidate(params: dict) -> dict:
+    """
+    Fits a copy of the base model with the parameters, predicts each split once and computes all the metrics from
+    those predictions.
+    """
+    data = _worker_data
+    start = time.perf_counter()
+    model = clone(data['base_model']).set_params(**params)
+    model.fit(data['X_train'], data['y_train'])
+
+    y_train = np.asarray(data['y_train'], dtype='float64').ravel()
+    y_test = np.asarray(data['y_test'], dtype='float64').ravel()
+    pred_train = np.asarray(model.predict(data['X_train']), dtype='float64').ravel()
+    pred_test = np.asarray(model.predict(data['X_test']), dtype='float64').ravel()
+
+    # MASE of each set with the scale of its own naive forecast, as the previous search_param
+    train = regression_metrics(y_train, pred_train)
+    test = regression_metrics(y_test, pred_test)
+    return {
+        'r2_train': train['r2'],
+        'r2_test': test['r2'],
+        'mase_train': train['mase'],
+        'mase_test': test['mase'],
+        'seconds': time.perf_counter() - start
+    }
+
+
+def _load_results(path: str) -> Dict[str, dict]:
+    """
+    Returns the results saved by a previous run of the sweep, by key of the candidate.
+    """
+    results = {}
+    if path is None or not os.path.isfile(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of an interrupted run
+                continue
+            results[result['key']] = result
+    return results
+
+
+def run_sweep(base_model, X_train, y_train, X_test, y_test, grid, base_params: dict = None,
+              max_workers: int = None, results_path: str = None, patience: int = None,
+              monitor: str = 'r2_test') -> pd.DataFrame:
+    """
+    Fits the model with each combination of parameters of a grid on a pool of processes and evaluates R² and MASE
+    on the train and test sets, predicting each set once per candidate.
+
+    Each result is appended to results_path as soon as it finishes, so an interrupted sweep resumes with the
+    candidates that are missing. The saved results are reused only for the same model, parameters and data.
+
+    Args:
+        base_model (object): Model with the sklearn interface (fit, predict, get_params, set_params).
+        X_train (array-like): Features of the train set.
+        y_train (array-like): Target of the train set.
+        X_test (array-like): Features of the test set.
+        y_test (array-like): Target of the test set.
+        grid (dict | list): Values of each parameter ({'max_depth': [2, 4, 8]}), or list of grids, as ParameterGrid.
+        base_params (dict, optional): Fixed parameters of all the candidates, not modified. Defaults to None.
+        max_workers (int, optional): Number of processes. Defaults to the environment variable SWEEP_WORKERS or the CPUs.
+        results_path (str, optional): JSON Lines file with the results of the sweep. Defaults to None (not saved).
+        patience (int, optional): Stop after this number of candidates, in the order of the grid, without
+            improving the monitored metric. Defaults to None (all the candidates).
+        monitor (str, optional): Metric of the early stopping. Defaults to 'r2_test'.
+
+    Returns:
+        pd.DataFrame: One row per candidate of the grid, in its order, with its parameters, r2_train, r2_test,
+            mase_train, mase_test, seconds of the fit, whether it was loaded from results_path and whether it was
+            evaluated (the metrics are NaN after an early stop). The reason of the early stop is in
+            attrs['stop_reason'] (None when all the candidates were evaluated) and in the span sweep.run.
+    """
+    max_workers = max_workers or default_workers
+    candidates = [{**(base_params or {}), **params} for params in ParameterGrid(grid)]
+    names = list(dict.fromkeys(name for params in ParameterGrid(grid) for name in params))
+
+    data = _data_digest(X_train, y_train, X_test, y_test)
+    model = type(base_model).__name__
+    keys = [_digest({'model': model, 'params': params, 'data': data}) for params in candidates]
+    saved = _load_results(results_path)
+    if results_path is not None:
+        os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+        # The file is rewritten with the complete results only, without the last line of an interrupted run
+        with open(results_path, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(result, default=str) + '\n' for result in saved.values())
+
+    best = None
+    waiting = 0
+    results = []
+    stop_reason = None
+    executor = None
+    if max_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_set_worker_data,
+                                       initargs=(base_model, X_train, y_train, X_test, y_test))
+    else:
+        _set_worker_data(base_model, X_train, y_train, X_test, y_test)
+
+    try:
+        with span('sweep.run', model=model, candidates=len(candidates), workers=max_workers) as current:
+            # The candidates are evaluated in batches of one per process, so the early stopping follows the grid order
+            for first in range(0, len(candidates), max_workers):
+                batch = range(first, min(first + max_workers, len(candidates)))
+                pending = [i for i in batch if keys[i] not in saved]
+                params = [candidates[i] for i in pending]
+                outputs = executor.map(_fit_candidate, params) if executor is not None else map(_fit_candidate, params)
+
+                for i, output in zip(pending, outputs):
+                    saved[keys[i]] = {'key': keys[i], 'model': model, 'params': candidates[i], **output}
+                    if results_path is not None:
+                        with open(results_path, 'a', encoding='utf-8') as file:
+                            file.write(json.dumps(saved[keys[i]], default=str) + '\n')
+
+                for i in batch:
+                    result = saved[keys[i]]
+                    results.append({**{name: candidates[i].get(name) for name in names},
+                                    **{metric: result[metric] for metric in metrics},
+                                    'cached': i not in pending, 'evaluated': True})
+                    value = result[monitor] if monitor not in lower_is_better else -result[monitor]
+                    if best is None or value > best:
+                        best, waiting = value, 0
+                    else:
+                        waiting += 1
+
+                if patience is not None and waiting >= patience:
+                    stop_reason = f"Búsqueda detenida después de {len(results)} de {len(candidates)} candidatos sin mejorar {monitor}"
+                    break
+            current.set(evaluated=len(results), stop_reason=stop_reason)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # The candidates not evaluated keep their row, so the results are aligned with the grid
+    results += [{**{name: candidates[i].get(name) for name in names}, **dict.fromkeys(metrics, np.nan),
+                 'cached': False, 'evaluated': False} for i in range(len(results), len(candidates))]
+    results = pd.DataFrame(results)
+    results.attrs['stop_reason'] = stop_reason
+    return results
+
+
+def sweep_scores(results: pd.DataFrame) -> List[dict]:
+    """
+    Returns the R² and MASE of a sweep in the format of funciones.search_param and funciones.plot_param_perf.
+
+    Args:
+        results (pd.DataFrame): Results of run_sweep.
+
+    Returns:
+        List[dict]: R² and MASE, each one with the lists 'train' and 'test' aligned with the grid (NaN for the
+            candidates not evaluated after an early stop).
+    """
+    return [{'train': results[f'{metric}_train'].tolist(), 'test': results[f'{metric}_test'].tolist()} for metric in ['r2', 'mase']]
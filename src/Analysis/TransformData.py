@@ -1,214 +1,818 @@
+import os
+import numpy as np
+from operator import itemgetter
 import pandas as pd
-import unicodedata
-from sklearn.preprocessing import MinMaxScaler
-from typing import List
+from typing import Dict, Iterator, List, Tuple
+from src.ResourceManager.Storage import read_data, write_data, default_format, read_partitions, read_partition, write_partition, remove_data
+from src.ResourceManager.Memory import MemoryMonitor, default_memory_limit
+from src.ResourceManager.FeatureStore import FeatureStore
+from src.ResourceManager.Profiler import span, annotate
+from src.Analysis.Aggregate import aggregate
+from src.Analysis.LazyPlan import lazy_plan, default_backend, backends
+from src.Analysis.ReservoirIndex import ReservoirIndex, index_file
+from src.Analysis.Scaler import IncrementalScaler, scaler_extension
 
-def strip_accents(s):
+# Columns used from each data set, only these are loaded from the storage
+oni_columns = ['Date', 'SST', 'ANOM']
+paratec_columns = ['reservoir', 'latitude', 'longitude']
+paratec_validity_columns = ['valid_from', 'valid_to']
+simem_reservas_columns = ['Fecha', 'CodigoEmbalse', 'RegionHidrologica', 'VolumenUtilDiarioEnergia',
+                          'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia']
+simem_aportes_columns = ['Fecha', 'RegionHidrologica', 'AportesHidricosEnergia',
+                         'PromedioAcumuladoEnergia', 'MediaHistoricaEnergia']
+simem_embalses_columns = ['CodigoEmbalse', 'NombreEmbalse']
+
+# Coarse-grained covariates attached to each reservoir day by the period that contains the date, keyed by the
+# name of the data in the clean stage: column with the date, columns to attach and pandas period frequency
+covariates = {
+    'oni': {'date': 'Date', 'columns': ['SST', 'ANOM'], 'freq': 'M'}
+}
+
+# Columns of the reservoir data joined with the covariates and the coordinates (enrich stage)
+enrich_columns = ['Fecha', 'CodigoEmbalse', 'VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia',
+                  'VertimientosEnergia', 'RegionHidrologica', 'SST', 'ANOM', 'latitude', 'longitude']
+
+# Aggregations by date and hydrological region of the reservoir and water contributions data
+reservas_aggregations = {
+    'VolumenUtilDiarioEnergia': 'mean',
+    'CapacidadUtilEnergia': 'mean',
+    'VolumenTotalEnergia': 'max',
+    'VertimientosEnergia': 'sum',
+    'SST': 'mean',
+    'ANOM': 'mean'
+}
+aportes_aggregations = {
+    'AportesHidricosEnergia': 'sum',
+    'PromedioAcumuladoEnergia': 'mean',
+    'MediaHistoricaEnergia': 'max'
+}
+
+# Fills of the missing values of the water contributions after the join of the aggregated data
+regions_fills = {
+    'PromedioAcumuladoEnergia': 'ffill',
+    'MediaHistoricaEnergia': 'bfill'
+}
+
+# Columns standardized in the non-aggregated data (the aggregated data is standardized in all its columns)
+scaled_columns = ['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia', 'SST', 'ANOM']
+
+
+def read_paratec(path: str) -> pd.DataFrame:
     """
-    Remove accents from a given string.
+    Reads the coordinates of the reservoirs from the history of PARATEC (one row by version, valid from valid_from
+    until valid_to) or from a snapshot, whose rows are valid on every date (NaT validity).
 
     Args:
-    s (str): The input string with accents.
+    - path (str): Path of the history or of the snapshot.
 
     Returns:
-    str: The input string without accents.
+    pd.DataFrame: Columns reservoir, latitude, longitude, valid_from and valid_to.
     """
-    return ''.join(c for c in unicodedata.normalize('NFD', s)
-                   if unicodedata.category(c) != 'Mn')
+    data = read_data(path)
+    missing = {column: pd.Series(pd.NaT, index=data.index, dtype='datetime64[ns]') for column in paratec_validity_columns if column not in data.columns}
+    return data.assign(**missing)[paratec_columns + paratec_validity_columns]
 
 class JoinData:
     """
     Class to join and clean data for analysis.
 
+    The transformation is a graph of named stages (clean -> enrich -> not_agregate, regions -> agregate -> scaled), each
+    stage is computed at most once and its result is reused by the stages that depend on it, so the outputs can
+    be requested in any order. The stages never modify their inputs and the returned DataFrames are shared, so
+    they must not be modified in place.
+
     Attributes:
     - df_oni: DataFrame containing ONI historical data.
-    - df_paratec: DataFrame containing PARATEC data.
+    - df_paratec: DataFrame containing PARATEC data (versions of the coordinates, see read_paratec).
     - df_simem_reservas: DataFrame containing SIMEM reservoir data.
     - df_simem_aportes: DataFrame containing SIMEM water contributions data.
     - df_simem_embalses: DataFrame containing SIMEM reservoir list.
-    - scaler: MinMaxScaler for data normalization.
+    - index_path: Path of the index of reservoir names (ReservoirIndex), next to ListadoEmbalses by default.
+    - unmatched: CodigoEmbalse of the reservoir data without coordinates.
+    - engine: Aggregation engine of the aggregated data ('pandas', 'process' or 'arrow', see Aggregate.aggregate).
+    - backend: Backend of the stages after clean ('pandas' or 'polars', see LazyPlan.lazy_plan).
+    - scalers: IncrementalScaler of each scaled stage, loaded from the Standardized folder when it was saved before.
+    - stages: Method and dependencies of each stage.
 
     Methods:
+    - get_stage(name: str): Returns the result of a stage, computing it and its dependencies only once.
+    - _clean_names(): Cleans the ONI data and resolves the CodigoEmbalse of the PARATEC coordinates.
+    - report_unmatched(): Returns the reservoirs that could not be joined with their coordinates.
     - _clean_data(): Cleans and preprocesses the data.
-    - _merge_data_not_agregate(): Merges data without aggregation.
-    - _merge_data_agregate(): Merges data with aggregation.
-    - save_data_not_agregate(stale: bool): Saves non-aggregated data.
-    - save_data_agregate(stale: bool): Saves aggregated data.
+    - _join_reservas(clean): Joins the reservoir data with ONI and coordinates.
+    - _merge_data_not_agregate(df_reservas): Merges data without aggregation.
+    - _aggregate_regions(df_reservas, clean): Aggregates the data by date and hydrological region.
+    - _merge_data_agregate(df_regions): Merges data with aggregation.
+    - _run_plan(clean, outputs): Computes the stages after clean as one lazy plan of the polars backend.
+    - save_feature_store(store: FeatureStore): Saves the reservoir and regional features in the feature store.
+    - save_data_not_agregate(stale: bool, results_path: str, file_format: str): Saves non-aggregated data.
+    - save_data_agregate(stale: bool, results_path: str, file_format: str): Saves aggregated data.
     """
-    def __init__(self,oni_path:str, paratec_path:str, simem_reservas_path:str, simem_aportes_path:str, simem_embalses_path:str):
+
+    # Stages of the transformation: name -> (method, stages whose results are the arguments of the method)
+    stages = {
+        'clean': ('_clean_data', []),
+        'enrich': ('_join_reservas', ['clean']),
+        'not_agregate': ('_merge_data_not_agregate', ['enrich']),
+        'regions': ('_aggregate_regions', ['enrich', 'clean']),
+        'agregate': ('_merge_data_agregate', ['regions']),
+        'scaled_not_agregate': ('_scale_data_not_agregate', ['not_agregate']),
+        'scaled_agregate': ('_scale_data_agregate', ['agregate'])
+    }
+
+    # Stages replaced by the polars backend: the plan stage computes all of them at once and each one takes its output
+    plan_stages = {
+        'plan': ('_run_plan', ['clean']),
+        'enrich': (itemgetter('enrich'), ['plan']),
+        'not_agregate': (itemgetter('not_agregate'), ['plan']),
+        'regions': (itemgetter('regions'), ['plan']),
+        'agregate': (itemgetter('agregate'), ['plan'])
+    }
+
+    def __init__(self,oni_path:str, paratec_path:str, simem_reservas_path:str, simem_aportes_path:str, simem_embalses_path:str, engine:str = None, index_path:str = None, backend:str = None):
         
-        self.df_oni = pd.read_excel(oni_path)
-        self.df_paratec = pd.read_excel(paratec_path)
-        self.df_simem_reservas = pd.read_excel(simem_reservas_path)
-        self.df_simem_aportes = pd.read_excel(simem_aportes_path)
-        self.df_simem_embalses = pd.read_excel(simem_embalses_path)
-        self.scaler = MinMaxScaler()
+        # Only the columns used in the join are loaded (Parquet or Excel depending on the extension of the path)
+        with span('join.read'):
+            self.df_oni = read_data(oni_path, columns=oni_columns)
+            self.df_paratec = read_paratec(paratec_path)
+            self.df_simem_reservas = read_data(simem_reservas_path, columns=simem_reservas_columns)
+            self.df_simem_aportes = read_data(simem_aportes_path, columns=simem_aportes_columns)
+            self.df_simem_embalses = read_data(simem_embalses_path, columns=simem_embalses_columns)
+        self.engine = engine
+        self.index_path = index_path or os.path.join(os.path.dirname(simem_embalses_path), index_file)
+        self.unmatched = set()
+        self.scalers = {}
+        self._results = {}
+        self._set_backend(backend)
+        self._set_key_types()
+
+    def _set_backend(self, backend: str) -> None:
+        """
+        Sets the backend of the transformation, replacing the stages computed by the lazy plan with the polars backend.
+
+        Args:
+        - backend (str): 'pandas' or 'polars', None for the environment variable TRANSFORM_BACKEND or 'pandas'.
+        """
+        self.backend = backend or default_backend
+        if self.backend not in backends:
+            raise ValueError(f"El motor {self.backend} no existe, los motores disponibles son {backends}")
+        if self.backend == 'polars':
+            self.stages = {**self.stages, **self.plan_stages}
+
+    def _set_key_types(self) -> None:
+        """
+        Sets the join keys to native types: the dates as datetime64 and the hydrological region as a categorical
+        shared by the reservoir and water contributions data, so the merges and groupbys do not compare strings.
+        """
+        self.df_oni['Date'] = pd.to_datetime(self.df_oni['Date'])
+        self.df_simem_reservas['Fecha'] = pd.to_datetime(self.df_simem_reservas['Fecha'])
+        self.df_simem_aportes['Fecha'] = pd.to_datetime(self.df_simem_aportes['Fecha'])
+
+        regions = pd.CategoricalDtype(sorted(set(self.df_simem_reservas['RegionHidrologica'].dropna()) | set(self.df_simem_aportes['RegionHidrologica'].dropna())))
+        self.df_simem_reservas['RegionHidrologica'] = self.df_simem_reservas['RegionHidrologica'].astype(regions)
+        self.df_simem_aportes['RegionHidrologica'] = self.df_simem_aportes['RegionHidrologica'].astype(regions)
+
+    def get_stage(self, name: str):
+        """
+        Returns the result of a stage, computing first the stages it depends on. Each stage is computed at most once,
+        in a span of the tracer named join.<stage> that does not include its dependencies.
+
+        Args:
+        - name (str): Name of the stage (key of stages).
+
+        Returns:
+        Result of the stage.
+        """
+        if name not in self._results:
+            method, dependencies = self.stages[name]
+            arguments = [self.get_stage(dependency) for dependency in dependencies]
+            with span(f'join.{name}') as current:
+                self._results[name] = (method if callable(method) else getattr(self, method))(*arguments)
+                if isinstance(self._results[name], pd.DataFrame):
+                    current.add(rows=len(self._results[name]))
+        return self._results[name]
 
-    def _clean_data(self) -> List[pd.DataFrame]:
+    def _clean_names(self) -> Dict[str, pd.DataFrame]:
         """
-        Cleans and preprocesses the dataframes.
+        Cleans the small data sets (ONI, PARATEC and ListadoEmbalses), without modifying the loaded data.
 
         Returns:
-        List of cleaned and preprocessed DataFrames: df_paratec, df_simem_embalses, df_oni, df_simem_reservas, df_simem_aportes.
+        Dict of cleaned DataFrames: oni and coordenadas (latitude and longitude of each version of each CodigoEmbalse).
         """
         
-        # standardizing words, removing spaces and accents to join data
-        self.df_paratec['reservoir'] = self.df_paratec['reservoir'].str.replace(' ', '')
-        self.df_paratec['reservoir'] = self.df_paratec['reservoir'].apply(lambda x: strip_accents(x))
-        self.df_simem_embalses['NombreEmbalse'] = self.df_simem_embalses['NombreEmbalse'].str.replace(' ', '')
-        self.df_simem_embalses['NombreEmbalse'] = self.df_simem_embalses['NombreEmbalse'].apply(lambda x: strip_accents(x))
+        # Resolving the CodigoEmbalse of the PARATEC reservoirs with the saved index of names, the reservoirs without
+        # CodigoEmbalse are recorded in the span of the stage and returned by report_unmatched
+        self.index = ReservoirIndex.load(self.index_path, self.df_simem_embalses, self.df_paratec[['reservoir']].drop_duplicates())
+        annotate(unmatched_paratec=self.index.unmatched())
+        df_coordenadas = self.df_paratec.assign(CodigoEmbalse=self.index.lookup(self.df_paratec['reservoir']))
+        df_coordenadas = df_coordenadas.dropna(subset=['CodigoEmbalse']).drop_duplicates(subset=['CodigoEmbalse', 'valid_from'])
+
+        # The first version of each reservoir is also valid before it was captured (the history starts after SIMEM)
+        first = ~df_coordenadas.sort_values('valid_from').duplicated(subset=['CodigoEmbalse'])
+        df_coordenadas = df_coordenadas.assign(valid_from=df_coordenadas['valid_from'].mask(first))
         
-        # Creating ONI Daily Data to join with the rest of the data
-        self.df_simem_reservas['Fecha'] = pd.to_datetime(self.df_simem_reservas['Fecha'])
-        self.df_oni.set_index('Date', inplace=True)
-        self.df_oni = self.df_oni.resample('D').ffill()
-        self.df_oni.reset_index(inplace=True)
+        # The monthly ONI data is joined by month (see _join_period), so it is not expanded to daily data
+        return {'oni': self.df_oni, 'coordenadas': df_coordenadas[['CodigoEmbalse', 'latitude', 'longitude'] + paratec_validity_columns]}
+
+    def _clean_data(self) -> Dict[str, pd.DataFrame]:
+        """
+        Cleans and preprocesses the dataframes, without modifying the loaded data.
+
+        Returns:
+        Dict of cleaned and preprocessed DataFrames: paratec, embalses, oni, reservas, aportes.
+        """
         
         # Filling missing values in df_simem_aportes
-        self.df_simem_aportes['PromedioAcumuladoEnergia'].fillna(method='ffill', inplace=True)
-        self.df_simem_aportes['MediaHistoricaEnergia'].fillna(method='bfill', inplace=True)
+        df_simem_aportes = self.df_simem_aportes.assign(
+            PromedioAcumuladoEnergia=self.df_simem_aportes['PromedioAcumuladoEnergia'].ffill(),
+            MediaHistoricaEnergia=self.df_simem_aportes['MediaHistoricaEnergia'].bfill())
         
-        return self.df_paratec, self.df_simem_embalses, self.df_oni, self.df_simem_reservas, self.df_simem_aportes
+        return {
+            **self._clean_names(),
+            'reservas': self.df_simem_reservas,
+            'aportes': df_simem_aportes
+        }
     
-    def _merge_data_not_agregate(self)-> pd.DataFrame:
+    def _join_reservas(self, clean: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Join the reservoir data with the ONI data and the coordinates of the reservoirs, keeping the column Fecha.
+
+        Args:
+        - clean (Dict[str, pd.DataFrame]): Result of the clean stage.
+
+        Returns:
+        pd.DataFrame: Reservoir data with ONI and coordinates.
+        """
+        # Join with ONI Data (and the other coarse covariates) by period, only the dates with data are kept
+        df_merge_reservas = clean['reservas']
+        for name, covariate in covariates.items():
+            df_merge_reservas = self._join_period(df_merge_reservas, clean[name], **covariate)
+
+        # Join with SIMEM reservoir data with coordinates, keeping the reservoirs without coordinates to report them
+        df_merge_res_embalses = self._join_coordinates(df_merge_reservas, clean['coordenadas'])
+        self.unmatched |= set(df_merge_res_embalses.loc[df_merge_res_embalses['latitude'].isna(), 'CodigoEmbalse'].dropna())
+        
+        # Selecting columns to keep
+        return df_merge_res_embalses[enrich_columns]
+
+    def report_unmatched(self) -> pd.DataFrame:
+        """
+        Returns the reservoirs that could not be joined: PARATEC reservoirs without CodigoEmbalse and reservoirs of
+        the joined data without coordinates.
+
+        Returns:
+        pd.DataFrame: Columns fuente (PARATEC or SIMEM) and embalse.
+        """
+        self.get_stage('clean')
+        return pd.DataFrame([{'fuente': 'PARATEC', 'embalse': reservoir} for reservoir in self.index.unmatched()] +
+                            [{'fuente': 'SIMEM', 'embalse': code} for code in sorted(self.unmatched)],
+                            columns=['fuente', 'embalse'])
+
+    @staticmethod
+    def _join_period(df: pd.DataFrame, df_covariate: pd.DataFrame, date: str, columns: List[str], freq: str, on: str = 'Fecha') -> pd.DataFrame:
+        """
+        Attach the columns of a coarse-grained covariate (for example monthly ONI) to each row of a daily DataFrame,
+        looking up the period that contains the date instead of expanding the covariate to daily data.
+
+        Args:
+        - df (pd.DataFrame): Daily data with the datetime64 column on.
+        - df_covariate (pd.DataFrame): Covariate data with one row per period.
+        - date (str): Column of the covariate with the start date of the period.
+        - columns (List[str]): Columns of the covariate to attach.
+        - freq (str): Pandas period frequency of the covariate ('M' monthly, 'Q' quarterly...).
+        - on (str): Date column of the daily data. Defaults to 'Fecha'.
+
+        Returns:
+        pd.DataFrame: Rows of df whose period is in the covariate, with the covariate columns.
+        """
+        periods = pd.PeriodIndex(df_covariate[date], freq=freq)
+        lookup = df_covariate.loc[~periods.duplicated(keep='last'), columns]
+        positions = periods[~periods.duplicated(keep='last')].get_indexer(pd.PeriodIndex(df[on], freq=freq))
+
+        matched = positions >= 0
+        positions = positions[matched]
+        return df[matched].assign(**{column: lookup[column].to_numpy()[positions] for column in columns})
+
+    @staticmethod
+    def _join_coordinates(df: pd.DataFrame, df_coordenadas: pd.DataFrame, on: str = 'Fecha') -> pd.DataFrame:
+        """
+        Left join of the coordinates of each reservoir valid on the date of each row (valid_from <= date < valid_to,
+        a missing bound is open). With one version by reservoir it is a plain join by CodigoEmbalse.
+
+        Args:
+        - df (pd.DataFrame): Daily data with the columns CodigoEmbalse and on.
+        - df_coordenadas (pd.DataFrame): Versions of the coordinates (coordenadas of the clean stage).
+        - on (str): Date column of the daily data. Defaults to 'Fecha'.
+
+        Returns:
+        pd.DataFrame: Rows of df with the columns latitude and longitude (NaN without a valid version).
+        """
+        if df_coordenadas[paratec_validity_columns].isna().all(axis=None):
+            return df.merge(df_coordenadas[['CodigoEmbalse', 'latitude', 'longitude']], how='left', on='CodigoEmbalse')
+
+        rows = df[['CodigoEmbalse', on]].reset_index(drop=True).assign(row=np.arange(len(df))).merge(df_coordenadas, on='CodigoEmbalse')
+        valid = (rows['valid_from'].isna() | (rows[on] >= rows['valid_from'])) & (rows['valid_to'].isna() | (rows[on] < rows['valid_to']))
+        rows = rows[valid].drop_duplicates(subset=['row'])
+
+        coordinates = {}
+        for column in ['latitude', 'longitude']:
+            coordinates[column] = np.full(len(df), np.nan)
+            coordinates[column][rows['row'].to_numpy()] = rows[column].to_numpy(dtype='float64')
+        return df.reset_index(drop=True).assign(**coordinates)
+
+    @staticmethod
+    def _split_date(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replaces the column Fecha with the columns Dia, Mes and Año.
+
+        Args:
+        - df (pd.DataFrame): DataFrame with the datetime64 column Fecha.
+
+        Returns:
+        pd.DataFrame: DataFrame with the columns Dia, Mes and Año instead of Fecha.
+        """
+        fecha = df['Fecha'].dt
+        return df.drop(columns=['Fecha']).assign(Dia=fecha.day, Mes=fecha.month, Año=fecha.year)
+
+    def _merge_data_not_agregate(self, df_reservas: pd.DataFrame)-> pd.DataFrame:
         """
         Merge data from different dataframes without aggregation.
+
+        Args:
+        - df_reservas (pd.DataFrame): Result of the enrich stage.
         
         Returns:
         pd.DataFrame: Merged dataframe with specified columns.
         """
         
-        # Join paratec data to get coordinates with CodigoEmbalse
-        df_merged = self.df_paratec.merge(self.df_simem_embalses, how='left', left_on='reservoir', right_on='NombreEmbalse')
-        df_merged = df_merged[['reservoir','latitude','longitude','CodigoEmbalse']].merge(self.df_simem_embalses, how='left', left_on='reservoir', right_on='CodigoEmbalse')
-        df_merged['CodigoEmbalse'] = df_merged['CodigoEmbalse_x'].combine_first(df_merged['CodigoEmbalse_y'])
-        df_merged = df_merged[['latitude','longitude','CodigoEmbalse']]
-        
-        # Join with ONI Data
-        self.df_simem_reservas['Fecha'] = self.df_simem_reservas['Fecha'].astype(str)
-        self.df_oni['Date'] = self.df_oni['Date'].astype(str)
-        df_merge_reservas = self.df_simem_reservas.merge(self.df_oni, how='left', left_on='Fecha', right_on='Date')
-        df_merge_reservas = df_merge_reservas[df_merge_reservas['Date'].notnull()].drop(columns=['Date'])
-
-        # Join with SIMEM reservoir data with coordinates
-        df_merge_res_embalses = df_merge_reservas.merge(df_merged, how='left', left_on='CodigoEmbalse', right_on='CodigoEmbalse')
-        
-        # Selecting columns to keep
-        df_merge_res_embalses = df_merge_res_embalses[['Fecha','VolumenUtilDiarioEnergia',
-                                                       'CapacidadUtilEnergia',
-                                                       'VolumenTotalEnergia',
-                                                       'VertimientosEnergia',
-                                                       'RegionHidrologica',
-                                                       'SST',
-                                                       'ANOM',
-                                                       'latitude',
-                                                       'longitude']]
-        
         # Create new columns for day, month, and year
-        df_merge_res_embalses['Fecha'] = pd.to_datetime(df_merge_res_embalses['Fecha'])
-        df_merge_res_embalses['Dia'] = df_merge_res_embalses['Fecha'].dt.day
-        df_merge_res_embalses['Mes'] = df_merge_res_embalses['Fecha'].dt.month
-        df_merge_res_embalses['Año'] = df_merge_res_embalses['Fecha'].dt.year
-        df_merge_res_embalses.drop(columns=['Fecha'], inplace=True)
-
-        return df_merge_res_embalses
+        return self._split_date(df_reservas.drop(columns=['CodigoEmbalse']))
     
-    def _merge_data_agregate(self)-> pd.DataFrame:
+    def _aggregate_regions(self, df_reservas: pd.DataFrame, clean: Dict[str, pd.DataFrame])-> pd.DataFrame:
         """
-        Merge data from different dataframes with aggregation.
+        Aggregate the reservoir and water contributions data by date and hydrological region.
+
+        Args:
+        - df_reservas (pd.DataFrame): Result of the enrich stage.
+        - clean (Dict[str, pd.DataFrame]): Result of the clean stage.
 
         Returns:
-        pd.DataFrame: Merged and aggregated dataframe with specified columns.
+        pd.DataFrame: Aggregated data with the columns Fecha and RegionHidrologica.
         """
-        #Get general data
-        df_merge_agregate = self._merge_data_not_agregate()
         
         # Aggregate data with Date and region
-
-        df_merge_agregate['Fecha'] = df_merge_agregate['Dia'].astype(str) + '-' + df_merge_agregate['Mes'].astype(str) + '-' + df_merge_agregate['Año'].astype(str)
-        df_merge_res_embalses_agregados = df_merge_agregate.groupby(['Fecha', 'RegionHidrologica']).agg({
-            'VolumenUtilDiarioEnergia': 'mean',
-            'CapacidadUtilEnergia':'mean',
-            'VolumenTotalEnergia':'max',
-            'VertimientosEnergia':'sum',
-            'SST':'mean',
-            'ANOM':'mean'}).reset_index()
-
-        # filling missing values in df_simem_aportes
-        self.df_simem_aportes['PromedioAcumuladoEnergia'].fillna(method='ffill', inplace=True)
-        self.df_simem_aportes['MediaHistoricaEnergia'].fillna(method='bfill', inplace=True)
+        df_merge_res_embalses_agregados = aggregate(df_reservas, ['Fecha', 'RegionHidrologica'], reservas_aggregations, self.engine)
         
-        # Aggregate data with Date and region
-        df_aportes_agregados = self.df_simem_aportes.groupby(['Fecha', 'RegionHidrologica']).agg({
-            'AportesHidricosEnergia': 'sum',
-            'PromedioAcumuladoEnergia':'mean',
-            'MediaHistoricaEnergia':'max'}).reset_index()
+        # Aggregate data with Date and region (missing values already filled in the clean stage)
+        df_aportes_agregados = aggregate(clean['aportes'], ['Fecha', 'RegionHidrologica'], aportes_aggregations, self.engine)
 
         # Join dataframes on Date and region
-        df_merge_res_embalses_agregados['Fecha'] = df_merge_res_embalses_agregados['Fecha'].astype(str)
-        df_aportes_agregados['Fecha'] = df_aportes_agregados['Fecha'].astype(str)
-        df_merge_agregate = df_merge_res_embalses_agregados.merge(df_aportes_agregados, how='left', left_on=['Fecha', 'RegionHidrologica'], right_on=['Fecha', 'RegionHidrologica'])
+        df_merge_agregate = df_merge_res_embalses_agregados.merge(df_aportes_agregados, how='left', on=['Fecha', 'RegionHidrologica'])
 
         # filling missing values
-        df_merge_agregate['PromedioAcumuladoEnergia'].fillna(method='ffill', inplace=True)
-        df_merge_agregate['MediaHistoricaEnergia'].fillna(method='bfill', inplace=True)
+        for column, fill in regions_fills.items():
+            df_merge_agregate[column] = getattr(df_merge_agregate[column], fill)()
+        return df_merge_agregate
+
+    def _merge_data_agregate(self, df_regions: pd.DataFrame)-> pd.DataFrame:
+        """
+        Merge data from different dataframes with aggregation.
+
+        Args:
+        - df_regions (pd.DataFrame): Result of the regions stage.
+
+        Returns:
+        pd.DataFrame: Merged and aggregated dataframe with specified columns.
+        """
 
         # Create new columns for day, month, and year
-        df_merge_agregate['Dia'] = df_merge_agregate['Fecha'].apply(lambda x: int(x.split('-')[2]))
-        df_merge_agregate['Mes'] = df_merge_agregate['Fecha'].apply(lambda x: int(x.split('-')[1]))
-        df_merge_agregate['Año'] = df_merge_agregate['Fecha'].apply(lambda x: int(x.split('-')[0]))
-        if 'Fecha' in df_merge_agregate.columns:
-            df_merge_agregate.drop(columns=['Fecha'], inplace=True)
+        df_merge_agregate = self._split_date(df_regions)
         df_merge_agregate = pd.get_dummies(df_merge_agregate)
-        
 
         return df_merge_agregate
+
+    def _run_plan(self, clean: Dict[str, pd.DataFrame], outputs: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Computes the enrich, not_agregate, regions and agregate stages as one lazy plan of polars (see LazyPlan.lazy_plan),
+        with the dtypes of the pandas stages.
+
+        Args:
+        - clean (Dict[str, pd.DataFrame]): Result of the clean stage.
+        - outputs (List[str]): Stages to compute. Defaults to None (all of them).
+
+        Returns:
+        Dict[str, pd.DataFrame]: Result of each stage.
+        """
+        results = lazy_plan(clean, covariates, enrich_columns, reservas_aggregations, aportes_aggregations, regions_fills, outputs)
+        self.unmatched |= set(results.pop('unmatched')['CodigoEmbalse'])
+        return results
+
+    def _scale(self, df: pd.DataFrame, stage: str, columns: List[str]) -> pd.DataFrame:
+        """
+        Standardize the columns with the scaler of the stage, fitting it only when there is no saved scaler.
+
+        Args:
+        - df (pd.DataFrame): Data to standardize.
+        - stage (str): Name of the stage of the scaler (key of scalers).
+        - columns (List[str]): Columns to standardize.
+
+        Returns:
+        pd.DataFrame: Copy of the data with the columns standardized.
+
+        Raises:
+        ValueError: When the saved scaler was fitted with other columns (see IncrementalScaler.check).
+        """
+        if stage not in self.scalers:
+            self.scalers[stage] = IncrementalScaler(columns).partial_fit(df)
+        return self.scalers[stage].check(columns).transform(df)
+
+    def _load_scaler(self, stage: str, scaler_path: str, refit: bool) -> None:
+        """
+        Loads the saved scaler of a stage, or discards the current one (and the scaled result) to fit it again.
+
+        Args:
+        - stage (str): Name of the stage of the scaler (key of scalers).
+        - scaler_path (str): Path of the saved scaler.
+        - refit (bool): Flag indicating whether to fit the scaler again with all the data.
+        """
+        if refit:
+            self.scalers.pop(stage, None)
+            self._results.pop(f'scaled_{stage}', None)
+        elif stage not in self.scalers:
+            scaler = IncrementalScaler.load(scaler_path)
+            if scaler is not None:
+                self.scalers[stage] = scaler
+
+    def _scale_data_not_agregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Standardize the numeric columns of the non-aggregated data with MinMaxScaler.
+
+        Args:
+        - df (pd.DataFrame): Result of the not_agregate stage.
+
+        Returns:
+        pd.DataFrame: Copy of the data with the columns of scaled_columns standardized.
+        """
+        return self._scale(df, 'not_agregate', scaled_columns)
+
+    def _scale_data_agregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Standardize all the columns of the aggregated data with MinMaxScaler.
+
+        Args:
+        - df (pd.DataFrame): Result of the agregate stage.
+
+        Returns:
+        pd.DataFrame: Standardized copy of the data.
+        """
+        return self._scale(df, 'agregate', list(df.columns))
     
-    def save_data_not_agregate(self, stale:bool)->None:
+    def save_feature_store(self, store: FeatureStore = None) -> FeatureStore:
+        """
+        Save the non-standardized features in the feature store: the table reservas indexed by Fecha and
+        CodigoEmbalse and the table regiones indexed by Fecha and RegionHidrologica.
+
+        Args:
+        - store (FeatureStore): Feature store. Defaults to None (the store of Data/Features).
+
+        Returns:
+        FeatureStore: Feature store with the tables.
+        """
+        store = store or FeatureStore()
+        store.write('reservas', self.get_stage('enrich'), date='Fecha', entity='CodigoEmbalse')
+        store.write('regiones', self.get_stage('regions'), date='Fecha', entity='RegionHidrologica')
+        return store
+
+    def save_data_not_agregate(self, stale:bool, results_path:str = '../../Data/Results', file_format:str = default_format, refit_scaler:bool = False)->None:
         """
-        Save non-aggregated data to an Excel file.
+        Save non-aggregated data to a Parquet (or Excel) file.
 
         Args:
         - stale (bool): Flag indicating whether to save standardized or not standardized data.
+        - results_path (str): Path of the Results folder. Defaults to '../../Data/Results'.
+        - file_format (str): Extension of the file, '.xlsx' exports to Excel. Defaults to '.parquet'.
+        - refit_scaler (bool): Flag indicating whether to fit the saved scaler again. Defaults to False.
 
         Returns:
         None
         """
         if stale:
-            df_normalized = self._merge_data_not_agregate()
-            df_normalized[['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia', 'SST', 'ANOM']] = self.scaler.fit_transform(df_normalized[['VolumenUtilDiarioEnergia', 'CapacidadUtilEnergia', 'VolumenTotalEnergia', 'VertimientosEnergia', 'SST', 'ANOM']])
-            df_normalized.to_excel('../../Data/Results/Standardized/EmbalsesNoAgregados.xlsx', index=False)
+            scaler_path = os.path.join(results_path, 'Standardized', f'EmbalsesNoAgregados{scaler_extension}')
+            self._load_scaler('not_agregate', scaler_path, refit_scaler)
+            df = self.get_stage('scaled_not_agregate')
+            with span('join.save', data_set='EmbalsesNoAgregados', stale=stale):
+                write_data(df, os.path.join(results_path, 'Standardized', f'EmbalsesNoAgregados{file_format}'))
+                self.scalers['not_agregate'].save(scaler_path)
         else:
-            self._merge_data_not_agregate().to_excel('../../Data/Results/NotStandardized/EmbalsesNoAgregados.xlsx', index=False)
+            df = self.get_stage('not_agregate')
+            with span('join.save', data_set='EmbalsesNoAgregados', stale=stale):
+                write_data(df, os.path.join(results_path, 'NotStandardized', f'EmbalsesNoAgregados{file_format}'))
     
-    def save_data_agregate(self,stale:bool)->None:
+    def save_data_agregate(self,stale:bool, results_path:str = '../../Data/Results', file_format:str = default_format, refit_scaler:bool = False)->None:
             """
-            Save aggregated data to an Excel file, optionally applying data normalization.
+            Save aggregated data to a Parquet (or Excel) file, optionally applying data normalization.
 
             Parameters:
             - stale (bool): Flag indicating whether to apply data normalization.
+            - results_path (str): Path of the Results folder. Defaults to '../../Data/Results'.
+            - file_format (str): Extension of the file, '.xlsx' exports to Excel. Defaults to '.parquet'.
+            - refit_scaler (bool): Flag indicating whether to fit the saved scaler again. Defaults to False.
 
             Returns:
             - None
             """
             if stale:
-                df_normalized = self._merge_data_agregate()
-                
-                df_normalized[[col for col in df_normalized.columns]] = self.scaler.fit_transform(df_normalized[[col for col in df_normalized.columns]])
-                df_normalized.to_excel('../../Data/Results/Standardized/EmbalsesAgregados.xlsx', index=False)
+                scaler_path = os.path.join(results_path, 'Standardized', f'EmbalsesAgregados{scaler_extension}')
+                self._load_scaler('agregate', scaler_path, refit_scaler)
+                df = self.get_stage('scaled_agregate')
+                with span('join.save', data_set='EmbalsesAgregados', stale=stale):
+                    write_data(df, os.path.join(results_path, 'Standardized', f'EmbalsesAgregados{file_format}'))
+                    self.scalers['agregate'].save(scaler_path)
             else:
-                self._merge_data_agregate().to_excel('../../Data/Results/NotStandardized/EmbalsesAgregados.xlsx', index=False)
+                df = self.get_stage('agregate')
+                with span('join.save', data_set='EmbalsesAgregados', stale=stale):
+                    write_data(df, os.path.join(results_path, 'NotStandardized', f'EmbalsesAgregados{file_format}'))
             
+class StreamJoinData(JoinData):
+    """
+    JoinData for reservoir and water contributions histories bigger than the memory.
+
+    Only the small data sets (ONI, PARATEC and ListadoEmbalses) are loaded. The reservoir and water contributions
+    data are read, joined, aggregated and written one year at a time (the yearly partitions of the Parquet data
+    sets), so the memory depends on the size of one year and not on the whole history. The forward and backward
+    fills that cross the years are carried between the partitions, so the results are the same as JoinData's when
+    the data is stored in date order (as DataSIMEM saves it). The resident memory is checked after each year and
+    the process stops with MemoryError when it exceeds the limit.
+
+    Attributes:
+    - simem_reservas_path: Path of the SIMEM reservoir data.
+    - simem_aportes_path: Path of the SIMEM water contributions data.
+    - regions: Categorical type of the hydrological regions shared by all the partitions.
+    - memory: MemoryMonitor with the limit and the resident memory observed.
+
+    Methods:
+    - save_data_not_agregate(stale: bool, results_path: str, file_format: str): Streams the non-aggregated data.
+    - save_data_agregate(stale: bool, results_path: str, file_format: str): Streams the aggregated data.
+    """
+
+    # Only the small data sets are cleaned as a whole, the rest of the stages are computed by year
+    stages = {
+        'clean': ('_clean_names', [])
+    }
+    plan_stages = {}
+
+    def __init__(self, oni_path:str, paratec_path:str, simem_reservas_path:str, simem_aportes_path:str, simem_embalses_path:str, memory_limit:int = default_memory_limit, engine:str = None, index_path:str = None, backend:str = None):
+        with span('join.read'):
+            self.df_oni = read_data(oni_path, columns=oni_columns)
+            self.df_paratec = read_paratec(paratec_path)
+            self.df_simem_embalses = read_data(simem_embalses_path, columns=simem_embalses_columns)
+        self.simem_reservas_path = simem_reservas_path
+        self.simem_aportes_path = simem_aportes_path
+        self.memory = MemoryMonitor(memory_limit)
+        self.engine = engine
+        self.index_path = index_path or os.path.join(os.path.dirname(simem_embalses_path), index_file)
+        self.unmatched = set()
+        self.scalers = {}
+        self._results = {}
+        self._set_backend(backend)
+        self._set_key_types()
+
+    def _set_key_types(self) -> None:
+        """
+        Sets the ONI dates as datetime64 and builds the categorical type of the hydrological regions, reading only
+        that column of each partition.
+        """
+        self.df_oni['Date'] = pd.to_datetime(self.df_oni['Date'])
+
+        regions = set()
+        for path in [self.simem_reservas_path, self.simem_aportes_path]:
+            for year in read_partitions(path):
+                regions |= set(read_partition(path, year, columns=['RegionHidrologica'])['RegionHidrologica'].dropna())
+        self.regions = pd.CategoricalDtype(sorted(regions))
+
+    def _fill_values(self) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """
+        Returns the values that continue the fills of the water contributions across the years.
+
+        Returns:
+        Tuple with the last PromedioAcumuladoEnergia before each year and the first MediaHistoricaEnergia after each year.
+        """
+        last, first = {}, {}
+        for year in read_partitions(self.simem_aportes_path):
+            df = read_partition(self.simem_aportes_path, year, columns=['PromedioAcumuladoEnergia', 'MediaHistoricaEnergia'])
+            promedio, media = df['PromedioAcumuladoEnergia'].dropna(), df['MediaHistoricaEnergia'].dropna()
+            last[year] = promedio.iloc[-1] if len(promedio) else np.nan
+            first[year] = media.iloc[0] if len(media) else np.nan
+
+        last, first = pd.Series(last, dtype='float64'), pd.Series(first, dtype='float64')
+        return last.ffill().shift(1).to_dict(), first.bfill().shift(-1).to_dict()
+
+    def _partitions(self, since: int = None) -> Iterator[Tuple[int, Dict[str, pd.DataFrame]]]:
+        """
+        Yields the clean data of each year of the reservoir data.
+
+        Args:
+        - since (int): First year to yield. Defaults to None (all the years).
+
+        Returns:
+        Iterator of tuples with the year and the dict of cleaned DataFrames of the year (as the clean stage).
+        """
+        clean = self.get_stage('clean')
+        previous, following = self._fill_values()
+        for year in read_partitions(self.simem_reservas_path):
+            if since is not None and year < since:
+                continue
+            df_reservas = read_partition(self.simem_reservas_path, year, columns=simem_reservas_columns)
+            df_reservas = df_reservas.assign(Fecha=pd.to_datetime(df_reservas['Fecha']),
+                                             RegionHidrologica=df_reservas['RegionHidrologica'].astype(self.regions))
+
+            # Filling missing values in df_simem_aportes with the values of the previous and next years
+            df_aportes = read_partition(self.simem_aportes_path, year, columns=simem_aportes_columns)
+            df_aportes = df_aportes.astype({'AportesHidricosEnergia': 'float64', 'PromedioAcumuladoEnergia': 'float64', 'MediaHistoricaEnergia': 'float64'})
+            df_aportes = df_aportes.assign(
+                Fecha=pd.to_datetime(df_aportes['Fecha']),
+                RegionHidrologica=df_aportes['RegionHidrologica'].astype(self.regions),
+                PromedioAcumuladoEnergia=df_aportes['PromedioAcumuladoEnergia'].ffill().fillna(previous.get(year, np.nan)),
+                MediaHistoricaEnergia=df_aportes['MediaHistoricaEnergia'].bfill().fillna(following.get(year, np.nan)))
+
+            self.memory.check(f'la lectura del año {year}')
+            yield year, {**clean, 'reservas': df_reservas, 'aportes': df_aportes}
+
+    def _stream_not_agregate(self, since: int = None) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Yields the non-aggregated data of each year, computed from the clean data of the year only.
+
+        Args:
+        - since (int): First year to yield. Defaults to None (all the years).
+
+        Returns:
+        Iterator of tuples with the year and its non-aggregated data (as the not_agregate stage).
+        """
+        for year, clean in self._partitions(since):
+            with span('join.not_agregate', year=year) as current:
+                if self.backend == 'polars':
+                    df = self._run_plan(clean, ['not_agregate'])['not_agregate']
+                else:
+                    df = self._merge_data_not_agregate(self._join_reservas(clean))
+                current.add(rows=len(df))
+            yield year, df
+
+    def _stream_agregate(self, since: int = None) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Yields the aggregated data of each year. The years that end with missing MediaHistoricaEnergia are held
+        until a later year gives the next valid value, as the backward fill of JoinData. When since is given the
+        year before since is yielded again, since it was saved before the new years could fill its last
+        MediaHistoricaEnergia, and the year before it is computed to carry the forward fill.
+
+        Args:
+        - since (int): First new year. Defaults to None (all the years).
+
+        Returns:
+        Iterator of tuples with the year and its aggregated data (as the agregate stage).
+        """
+        last_promedio = np.nan
+        pending = []
+        for year, clean in self._partitions(None if since is None else since - 2):
+            with span('join.agregate', year=year) as current:
+                if self.backend == 'polars':
+                    df = self._run_plan(clean, ['agregate'])['agregate']
+                else:
+                    df = self._merge_data_agregate(self._aggregate_regions(self._join_reservas(clean), clean))
+                current.add(rows=len(df))
+            df['PromedioAcumuladoEnergia'] = df['PromedioAcumuladoEnergia'].fillna(last_promedio)
+            promedio, media = df['PromedioAcumuladoEnergia'].dropna(), df['MediaHistoricaEnergia'].dropna()
+            if len(promedio):
+                last_promedio = promedio.iloc[-1]
+            if len(media):
+                for pending_year, df_pending in pending:
+                    df_pending['MediaHistoricaEnergia'] = df_pending['MediaHistoricaEnergia'].fillna(media.iloc[0])
+                    yield pending_year, df_pending
+                pending = []
+
+            if since is not None and year < since - 1:
+                continue
+            if df['MediaHistoricaEnergia'].isna().any():
+                pending.append((year, df))
+            else:
+                yield year, df
+        yield from pending
+
+    def _save_stream(self, stream, path: str, stage: str = None, columns: List[str] = None, scaler_path: str = None, refit_scaler: bool = False, since: int = None) -> Dict[str, int]:
+        """
+        Writes the data of each year in the folder of the data set.
+
+        When a stage is given the data is standardized with the saved scaler of the stage, transforming each year
+        as it is written. If there is no saved scaler (or refit_scaler is True) the scaler is fitted over all the
+        years, the partitions are rewritten with the scaled values and the scaler is saved. A saved scaler fitted
+        with other columns raises ValueError before the saved data is modified.
+
+        Args:
+        - stream (Callable): Method that yields the year and data of each partition from a year.
+        - path (str): Path of the data set.
+        - stage (str): Name of the scaler stage, None to save the data not standardized. Defaults to None.
+        - columns (List[str]): Columns to standardize, None for all the columns. Defaults to None.
+        - scaler_path (str): Path of the saved scaler of the stage. Defaults to None.
+        - refit_scaler (bool): Flag indicating whether to fit the saved scaler again. Defaults to False.
+        - since (int): First year of the new data, the previous years are kept (the stream can yield again the year
+          before it). Defaults to None (all the years).
+
+        Returns:
+        Dict[str, int]: Memory report of the process.
+        """
+        with span('join.save', data_set=os.path.basename(path), stage=stage, since=since):
+            if stage is not None:
+                self._load_scaler(stage, scaler_path, refit_scaler)
+            scaler = self.scalers.get(stage)
+            fit = stage is not None and scaler is None
+
+            # Only the new years are written when the data does not need a new scaling
+            if fit:
+                since = None
+
+            years = []
+            for year, df in stream(since):
+                if fit:
+                    if scaler is None:
+                        scaler = IncrementalScaler(columns or list(df.columns))
+                    scaler.partial_fit(df)
+                elif scaler is not None:
+                    df = scaler.check(columns or list(df.columns)).transform(df)
+                # The saved data is removed once the first year is ready, so a saved scaler of other columns keeps it
+                if since is None and not years:
+                    remove_data(path)
+                write_partition(df, path, year)
+                years.append(year)
+                self.memory.check(f'la escritura del año {year}')
+
+            if fit:
+                self.scalers[stage] = scaler
+                for year in years:
+                    write_partition(scaler.transform(read_partition(path, year)), path, year)
+                    self.memory.check(f'la estandarización del año {year}')
+            if stage is not None:
+                scaler.save(scaler_path)
+        return self.memory.report()
+
+    def save_data_not_agregate(self, stale:bool, results_path:str = '../../Data/Results', file_format:str = default_format, refit_scaler:bool = False, since:int = None)->Dict[str, int]:
+        """
+        Save non-aggregated data by year to a folder of Parquet files.
+
+        Args:
+        - stale (bool): Flag indicating whether to save standardized or not standardized data.
+        - results_path (str): Path of the Results folder. Defaults to '../../Data/Results'.
+        - file_format (str): Extension of the data set, only '.parquet' can be written by year. Defaults to '.parquet'.
+        - refit_scaler (bool): Flag indicating whether to fit the saved scaler again. Defaults to False.
+        - since (int): First year to write, used in the daily updates. Defaults to None (all the years).
+
+        Returns:
+        Dict[str, int]: Memory report of the process.
+        """
+        if stale:
+            return self._save_stream(self._stream_not_agregate, os.path.join(results_path, 'Standardized', f'EmbalsesNoAgregados{file_format}'), 'not_agregate', scaled_columns,
+                                     os.path.join(results_path, 'Standardized', f'EmbalsesNoAgregados{scaler_extension}'), refit_scaler, since)
+        return self._save_stream(self._stream_not_agregate, os.path.join(results_path, 'NotStandardized', f'EmbalsesNoAgregados{file_format}'), since=since)
+
+    def save_data_agregate(self, stale:bool, results_path:str = '../../Data/Results', file_format:str = default_format, refit_scaler:bool = False, since:int = None)->Dict[str, int]:
+        """
+        Save aggregated data by year to a folder of Parquet files.
+
+        Args:
+        - stale (bool): Flag indicating whether to save standardized or not standardized data.
+        - results_path (str): Path of the Results folder. Defaults to '../../Data/Results'.
+        - file_format (str): Extension of the data set, only '.parquet' can be written by year. Defaults to '.parquet'.
+        - refit_scaler (bool): Flag indicating whether to fit the saved scaler again. Defaults to False.
+        - since (int): First year to write, used in the daily updates. Defaults to None (all the years).
+
+        Returns:
+        Dict[str, int]: Memory report of the process.
+        """
+        if stale:
+            return self._save_stream(self._stream_agregate, os.path.join(results_path, 'Standardized', f'EmbalsesAgregados{file_format}'), 'agregate', None,
+                                     os.path.join(results_path, 'Standardized', f'EmbalsesAgregados{scaler_extension}'), refit_scaler, since)
+        return self._save_stream(self._stream_agregate, os.path.join(results_path, 'NotStandardized', f'EmbalsesAgregados{file_format}'), since=since)
+
+
 if __name__ == "__main__":
-    oni_path = './Data/Cleansed/ONI/ONI_historico.xlsx'
-    paratec_path = './Data/Cleansed/PARATEC/PARATEC_2025-05-17.xlsx'
-    simem_reservas_path = './Data/Cleansed/SIMEM/ReservasHidraulicasEnergía.xlsx'
-    simem_aportes_path = './Data/Cleansed/SIMEM/AportesHidricos.xlsx'
-    simem_embalses_path = './Data/Cleansed/SIMEM/ListadoEmbalses.xlsx'
-    join_data = JoinData(oni_path, paratec_path, simem_reservas_path, simem_aportes_path, simem_embalses_path)
-
-    join_data.save_data_not_agregate(stale=True)
-    join_data.save_data_agregate(stale=True)
+    import glob
+
+    # The Parquet data of the pipeline (or of the migration of Storage), else the Excel files of the repository
+    # (the latest snapshot of PARATEC)
+    candidates = {
+        'oni': ['./Data/Cleansed/ONI/ONI_historico.parquet', './Data/Cleansed/ONI/ONI_historico.xlsx'],
+        'paratec': ['./Data/Cleansed/PARATEC/PARATEC_historico.parquet', *sorted(glob.glob('./Data/Cleansed/PARATEC/PARATEC_*.xlsx'), reverse=True)],
+        'reservas': ['./Data/Cleansed/SIMEM/ReservasHidraulicasEnergía.parquet', './Data/Cleansed/SIMEM/ReservasHidraulicasEnergía.xlsx'],
+        'aportes': ['./Data/Cleansed/SIMEM/AportesHidricos.parquet', './Data/Cleansed/SIMEM/AportesHidricos.xlsx'],
+        'embalses': ['./Data/Cleansed/SIMEM/ListadoEmbalses.parquet', './Data/Cleansed/SIMEM/ListadoEmbalses.xlsx']
+    }
+    paths = {name: next((path for path in paths if os.path.exists(path)), None) for name, paths in candidates.items()}
+    missing = [candidates[name][0] for name, path in paths.items() if path is None]
+    if missing:
+        raise SystemExit(f"No existen los datos {missing}, descárguelos con el pipeline (src/ResourceManager/Pipeline.py) "
+                         f"o migre los archivos de Excel con python -m src.ResourceManager.Storage")
+    join_data = JoinData(*paths.values())
+
+    join_data.save_data_not_agregate(stale=True, results_path='./Data/Results')
+    join_data.save_data_agregate(stale=True, results_path='./Data/Results')
 
 
 
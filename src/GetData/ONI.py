@@ -1,4 +1,14 @@
+import io
+import logging
+import hashlib
 import pandas as pd
+from src.ResourceManager.Storage import write_data
+from src.ResourceManager.HttpClient import HttpClient, get_client, revalidate
+from src.ResourceManager.Cache import ResponseCache, get_cache
+from src.ResourceManager.Profiler import span, record_error
+
+# Logger of the errors that are handled, also recorded in the open span when the tracing is on
+logger = logging.getLogger(__name__)
 
 # Path to get ONI Data
 oni_path = 'https://www.cpc.ncep.noaa.gov/data/indices/oni.ascii.txt'
@@ -14,20 +24,58 @@ class DataOni:
     Class for handling ONI data.
 
     Attributes:
-        data_raw (pandas.DataFrame): Raw ONI data.
+        data_raw (pandas.DataFrame): Raw ONI data, downloaded the first time it is needed.
         data (pandas.DataFrame): Cleaned ONI data.
+        client (HttpClient): HTTP client used to download the data.
+        cache (ResponseCache): Cache of the raw responses.
 
     Methods:
+        refresh: Downloads the ONI data again if it changed in the source.
         _clean_data: Cleans the raw ONI data.
         get_oni_data: Returns the cleaned ONI data.
-        save_oni_data: Saves the cleaned ONI data to an Excel file.
+        save_oni_data: Saves the cleaned ONI data to a Parquet (or Excel) file.
 
     """
 
-    def __init__(self) -> None:
+    def __init__(self, client: HttpClient = None, cache: ResponseCache = None) -> None:
+        # The data is read when it is needed
+        self.client = client if client else get_client()
+        self.cache = cache if cache else get_cache()
+        self._data_raw = None
+        self._digest = None
+        self.data = None
+
+    @property
+    def data_raw(self) -> pd.DataFrame:
+        """
+        Raw ONI data, downloaded the first time it is needed.
+        """
+        if self._data_raw is None:
+            self.refresh()
+        return self._data_raw
+
+    def refresh(self) -> bool:
+        """
+        Downloads the ONI data with a conditional request, revalidating the cached payload (see
+        HttpClient.revalidate). The payload is parsed only if it changed.
+
+        Returns:
+            bool: True if the data changed since the last read.
+        """
+        with span('oni.fetch') as current:
+            response = revalidate(self.client, self.cache, 'ONI', oni_path)
+            content = response.content
+            current.set(modified=response.modified).add(bytes_read=len(content))
+
+        digest = hashlib.sha256(content).hexdigest()
+        if digest == self._digest:
+            return False
+
         # Reading the data
-        self.data_raw = pd.read_csv(oni_path, sep='\s+')
+        self._data_raw = pd.read_csv(io.BytesIO(content), sep='\s+')
+        self._digest = digest
         self.data = None
+        return True
     
     def _clean_data(self)->pd.DataFrame:
         """
@@ -37,19 +85,21 @@ class DataOni:
             pandas.DataFrame: Cleaned ONI data.
 
         """
-        df = self.data_raw.copy()
+        with span('oni.clean') as current:
+            df = self.data_raw.copy()
 
-        # Applying mapping
-        df['Mes'] = df['SEAS'].map(seas_to_month)
-        
-        # Renaming columns for better understanding
-        df.rename(columns={'YR': 'Year', 'Mes': 'Month', 'TOTAL': 'SST'}, inplace=True)
+            # Applying mapping
+            df['Mes'] = df['SEAS'].map(seas_to_month)
+
+            # Renaming columns for better understanding
+            df.rename(columns={'YR': 'Year', 'Mes': 'Month', 'TOTAL': 'SST'}, inplace=True)
 
-        # Creating the date column based on the year and month and setting the day to the first of the month
-        df['Date'] = pd.to_datetime(df[['Year', 'Month']].assign(DAY=1))
+            # Creating the date column based on the year and month and setting the day to the first of the month
+            df['Date'] = pd.to_datetime(df[['Year', 'Month']].assign(DAY=1))
 
-        # Selected the necessary columns
-        df = df[['Date','SST','ANOM']]
+            # Selected the necessary columns
+            df = df[['Date','SST','ANOM']]
+            current.add(rows=len(df))
         self.data = df
         return self.data
     
@@ -61,17 +111,18 @@ class DataOni:
             pandas.DataFrame: Cleaned ONI data.
 
         """
-        if not self.data:
+        if self.data is None:
             # Clean the data
             self._clean_data()
         return self.data
     
     def save_oni_data(self, path: str,save_raw:bool=False)-> pd.DataFrame:
         """
-        Saves the cleaned ONI data to an Excel file.
+        Saves the cleaned ONI data to a Parquet file, or to an Excel file if the path ends with '.xlsx'.
 
         Args:
             path (str): The file path to save the data.
+            save_raw (bool, optional): Save the raw data instead of the cleaned data. Defaults to False.
 
         Returns:
             pandas.DataFrame: Cleaned ONI data.
@@ -84,17 +135,19 @@ class DataOni:
             self._clean_data()
             
         data_save = self.data_raw if save_raw else self.data
-        try:
-            # Save the data in the path
-            data_save.to_excel(path,index=False)
-        except Exception as e:
-            print(f"Error al guardar los datos en la ruta {path}: {e}")
-        else:
-            return data_save
+        with span('oni.save', path=path):
+            try:
+                # Save the data in the path
+                write_data(data_save, path, schema=None if save_raw else 'ONI_historico')
+            except Exception as e:
+                record_error(e)
+                logger.error("Error al guardar los datos en la ruta %s: %s", path, e)
+            else:
+                return data_save
     
 if __name__ == '__main__':
     oni = DataOni()
-    oni.save_oni_data('Data/Cleansed/ONI/ONI_historico.xlsx',save_raw=False)
-    oni.save_oni_data('Data/Raw/ONI/ONI_historico.xlsx',save_raw=True)
+    oni.save_oni_data('Data/Cleansed/ONI/ONI_historico.parquet',save_raw=False)
+    oni.save_oni_data('Data/Raw/ONI/ONI_historico.parquet',save_raw=True)
 
         
\ No newline at end of file
@@ -1,8 +1,19 @@
-import requests
+import os
+import re
 import urllib3
+import hashlib
 import pandas as pd
 import datetime
 import json
+import logging
+from typing import List
+from src.ResourceManager.Storage import write_data, read_data, append_data, default_format
+from src.ResourceManager.HttpClient import HttpClient, get_client, revalidate
+from src.ResourceManager.Cache import ResponseCache, get_cache
+from src.ResourceManager.Profiler import span, record_error
+
+# Logger of the errors that are handled, also recorded in the open span when the tracing is on
+logger = logging.getLogger(__name__)
 
 # API to get reservoirs data
 url_paratect = "https://paratecbackend.xm.com.co/reportehidrologia/api/Hydrology/ReservoirInfo"
@@ -10,25 +21,181 @@ url_paratect = "https://paratecbackend.xm.com.co/reportehidrologia/api/Hydrology
 # Disclable warning for SSL certificate of PARATEC
 urllib3.disable_warnings()
 
+# PARATEC is stored as a slowly changing dimension: one row by version of each reservoir, valid from valid_from
+# until valid_to (NaT while it is the current version). Only the versions that change are written
+history_file = f'PARATEC_historico{default_format}'
+history_key = ['reservoir', 'valid_from']
+tracked_columns = ['latitude', 'longitude']
+
+
+def read_history(path: str) -> pd.DataFrame:
+    """
+    Reads the history of the reservoirs, empty when it has not been saved.
+
+    Args:
+        path (str): Path of the history.
+
+    Returns:
+        pd.DataFrame: Versions of the reservoirs with the columns reservoir, latitude, longitude, valid_from and valid_to.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame({'reservoir': pd.Series(dtype='string'), 'latitude': pd.Series(dtype='float64'),
+                             'longitude': pd.Series(dtype='float64'), 'valid_from': pd.Series(dtype='datetime64[ns]'),
+                             'valid_to': pd.Series(dtype='datetime64[ns]')})
+    return read_data(path)
+
+
+def diff_snapshot(history: pd.DataFrame, data: pd.DataFrame, as_of: datetime.date) -> pd.DataFrame:
+    """
+    Compares a snapshot of the reservoirs with the current versions of the history.
+
+    Args:
+        history (pd.DataFrame): Versions of the reservoirs (see read_history).
+        data (pd.DataFrame): Cleaned reservoirs data of the snapshot.
+        as_of (datetime.date): Date of the snapshot.
+
+    Returns:
+        pd.DataFrame: Versions to write: the current versions closed on as_of (changed or removed reservoirs)
+            followed by the new versions (new or changed reservoirs). Empty when nothing changed.
+    """
+    as_of = pd.Timestamp(as_of)
+    current = history[history['valid_to'].isna()].set_index('reservoir')
+    data = data.drop_duplicates(subset=['reservoir']).set_index('reservoir')[tracked_columns]
+
+    # A reservoir changed when it is new or any tracked column differs (NaN equals NaN)
+    previous = current[tracked_columns].reindex(data.index)
+    equal = (previous == data) | (previous.isna() & data.isna())
+    changed = ~equal.all(axis=1) | ~data.index.isin(current.index)
+    removed = ~current.index.isin(data.index)
+
+    closed = current[(current.index.isin(data.index[changed])) | removed].assign(valid_to=as_of)
+    opened = data[changed].assign(valid_from=as_of, valid_to=pd.NaT)
+    versions = pd.concat([closed.reset_index(), opened.reset_index()], ignore_index=True)
+    return versions.astype({'valid_from': 'datetime64[ns]', 'valid_to': 'datetime64[ns]'})[['reservoir', *tracked_columns, 'valid_from', 'valid_to']]
+
+
+def apply_versions(history: pd.DataFrame, versions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the versions of diff_snapshot to the history, as append_data does with the saved history. A version
+    opened and closed the same day is replaced by the one opened after it.
+
+    Args:
+        history (pd.DataFrame): Versions of the reservoirs.
+        versions (pd.DataFrame): Versions to apply.
+
+    Returns:
+        pd.DataFrame: Updated history.
+    """
+    if versions.empty:
+        return history
+    return pd.concat([history, versions], ignore_index=True).drop_duplicates(subset=history_key, keep='last').reset_index(drop=True)
+
+
+def snapshot_as_of(history: pd.DataFrame, as_of: datetime.date) -> pd.DataFrame:
+    """
+    Returns the versions of the reservoirs valid on a date.
+
+    Args:
+        history (pd.DataFrame): Versions of the reservoirs.
+        as_of (datetime.date): Date of the snapshot.
+
+    Returns:
+        pd.DataFrame: Columns reservoir, latitude and longitude of the versions valid on as_of.
+    """
+    as_of = pd.Timestamp(as_of)
+    valid = (history['valid_from'] <= as_of) & (history['valid_to'].isna() | (history['valid_to'] > as_of))
+    return history.loc[valid, ['reservoir', *tracked_columns]].reset_index(drop=True)
+
+
+def snapshot_date(path: str) -> datetime.date:
+    """
+    Returns the date of a dated snapshot file (PARATEC_YYYY-MM-DD), None if the name has no date.
+    """
+    match = re.search(r'PARATEC_(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+    return datetime.date.fromisoformat(match.group(1)) if match else None
+
+
+def load_snapshots(paths: List[str], path: str) -> pd.DataFrame:
+    """
+    Loads dated snapshot files (PARATEC_YYYY-MM-DD.parquet or .xlsx, as saved before the history) into the
+    history, in the order of their dates, and saves it.
+
+    Args:
+        paths (List[str]): Paths of the snapshots, the files without a date in the name are ignored.
+        path (str): Path of the history.
+
+    Returns:
+        pd.DataFrame: Versions written.
+    """
+    history = read_history(path)
+    written = []
+    for snapshot in sorted((p for p in paths if snapshot_date(p)), key=snapshot_date):
+        versions = diff_snapshot(history, read_data(snapshot, columns=['reservoir', *tracked_columns]), snapshot_date(snapshot))
+        history = apply_versions(history, versions)
+        written.append(versions)
+    versions = pd.concat(written, ignore_index=True).drop_duplicates(subset=history_key, keep='last').reset_index(drop=True) if written else history.iloc[:0]
+    if not versions.empty:
+        append_data(versions, path, history_key, schema='PARATEC_historico')
+    return versions
+
 
 class DataPARATEC:
     """
     Class for retrieving and processing reservoirs data from PARATEC.
     
     Attributes:
-        data_raw (pandas.DataFrame): Raw reservoirs data.
+        data_raw (dict): Raw reservoirs data, downloaded the first time it is needed.
         data (pandas.DataFrame): Cleaned reservoirs data.
+        client (HttpClient): HTTP client used to download the data.
+        cache (ResponseCache): Cache of the raw responses.
 
     Methods:
+        refresh: Downloads the reservoirs data again if it changed in the source.
         _clean_data: Cleans the raw reservoirs data.
         get_paratec_data: Returns the cleaned reservoirs data.
-        save_paratec_data: Saves the cleaned reservoirs data to an Excel file.
+        save_paratec_data: Saves the cleaned reservoirs data to a Parquet (or Excel) file.
+        save_paratec_history: Saves the changes of the reservoirs data to the history.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, client: HttpClient = None, cache: ResponseCache = None) -> None:
+        # The data is read when it is needed
+        self.client = client if client else get_client()
+        self.cache = cache if cache else get_cache()
+        self._data_raw = None
+        self._digest = None
+        self.data = None
+
+    @property
+    def data_raw(self) -> dict:
+        """
+        Raw reservoirs data, downloaded the first time it is needed.
+        """
+        if self._data_raw is None:
+            self.refresh()
+        return self._data_raw
+
+    def refresh(self) -> bool:
+        """
+        Downloads the reservoirs data with a conditional request, revalidating the cached payload (see
+        HttpClient.revalidate). The payload is parsed only if it changed.
+
+        Returns:
+            bool: True if the data changed since the last read.
+        """
+        with span('paratec.fetch') as current:
+            response = revalidate(self.client, self.cache, 'PARATEC', url_paratect, verify=False)
+            content = response.content
+            current.set(modified=response.modified).add(bytes_read=len(content))
+
+        digest = hashlib.sha256(content).hexdigest()
+        if digest == self._digest:
+            return False
+
         # Reading the data
-        self.data_raw = requests.request("GET", url_paratect, verify=False).json()
+        self._data_raw = json.loads(content)
+        self._digest = digest
         self.data = None
+        return True
     
     def _clean_data(self)->pd.DataFrame:
         """
@@ -38,17 +205,19 @@ class DataPARATEC:
             pandas.DataFrame: Cleaned reservoirs data.
         """
         
-        # Get data from 'data' key
-        data = pd.DataFrame(self.data_raw['data'])
-        
-        # Mapping boolean column to number
-        data['isReservoirAggregate'] = data['isReservoirAggregate'].map({'Si': 1, 'No': 0})
-        
-        # Selecting columns
-        data = data[['reservoir', 'latitude', 'longitude']]
-        
-        # removing aggregates from reservoirs (those with NaN latitude)
-        data = data[~data['latitude'].isnull()]
+        with span('paratec.clean') as current:
+            # Get data from 'data' key
+            data = pd.DataFrame(self.data_raw['data'])
+
+            # Mapping boolean column to number
+            data['isReservoirAggregate'] = data['isReservoirAggregate'].map({'Si': 1, 'No': 0})
+
+            # Selecting columns
+            data = data[['reservoir', 'latitude', 'longitude']]
+
+            # removing aggregates from reservoirs (those with NaN latitude)
+            data = data[~data['latitude'].isnull()]
+            current.add(rows=len(data))
         self.data = data
         return self.data
     
@@ -59,17 +228,18 @@ class DataPARATEC:
         Returns:
             pandas.DataFrame: Cleaned reservoirs data.
         """
-        if not self.data:
+        if self.data is None:
             # Clean the data
             self._clean_data()
         return self.data
     
     def save_paratec_data(self, path: str,save_raw:bool=False)->pd.DataFrame:
         """
-        Saves the PARATEC data to a specified path.
+        Saves the PARATEC data to a specified path, as Parquet or as Excel if the path ends with '.xlsx'.
 
         Args:
             path (str): The file path to save the data.
+            save_raw (bool, optional): Save the raw JSON payload instead of the cleaned data. Defaults to False.
 
         Returns:
             pandas.DataFrame: Cleaned reservoirs data.
@@ -84,19 +254,46 @@ class DataPARATEC:
                 
             return self.data_raw    
         
-        try:
-            # Save the data in the path
-            self.data.to_excel(path,index=False)
-        except Exception as e:
-            print(f"Error al guardar los datos en la ruta {path}: {e}")
-        else:
-            return self.data
-           
-        
+        with span('paratec.save', path=path):
+            try:
+                # Save the data in the path
+                write_data(self.data, path, schema='PARATEC')
+            except Exception as e:
+                record_error(e)
+                logger.error("Error al guardar los datos en la ruta %s: %s", path, e)
+            else:
+                return self.data
+
+    def save_paratec_history(self, path: str, as_of: datetime.date = None) -> pd.DataFrame:
+        """
+        Compares the PARATEC data with the current versions of the history and appends only the reservoirs that
+        changed: their current version is closed on as_of and a new one is opened.
+
+        Args:
+            path (str): Path of the history (Parquet).
+            as_of (datetime.date, optional): Date of the data. Defaults to today.
+
+        Returns:
+            pandas.DataFrame: Versions written (empty when nothing changed), None if they could not be saved.
+        """
+        as_of = as_of if as_of else datetime.date.today()
+        with span('paratec.save', path=path, as_of=str(as_of)) as current:
+            try:
+                versions = diff_snapshot(read_history(path), self.get_paratec_data(), as_of)
+                if not versions.empty:
+                    append_data(versions, path, history_key, schema='PARATEC_historico')
+                current.set(versions=len(versions))
+            except Exception as e:
+                record_error(e)
+                logger.error("Error al guardar el histórico de PARATEC en la ruta %s: %s", path, e)
+            else:
+                return versions
+
+
 if __name__ == '__main__':
     paratec = DataPARATEC()
     today = datetime.date.today()
-    filename_cleansed = f'Data/Cleansed/PARATEC/PARATEC_{today}.xlsx'
-    filename_raw = f'Data/Raw/PARATEC/PARATEC_{today}.xlsx'
-    paratec.save_paratec_data(filename_cleansed)
+    filename_history = f'Data/Cleansed/PARATEC/{history_file}'
+    filename_raw = f'Data/Raw/PARATEC/PARATEC_{today}.json'
+    paratec.save_paratec_history(filename_history, today)
     paratec.save_paratec_data(filename_raw, save_raw=True)
@@ -1,12 +1,235 @@
+import numpy as np
 import pandas as pd
-from pydataxm.pydatasimem import ReadSIMEM
-from typing import Dict
-from datetime import date
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from datetime import date, timedelta
 import os
+import json
+import time
+from src.ResourceManager.Storage import read_data, write_data, append_data, default_format
+from src.ResourceManager.Cache import ResponseCache, get_cache
+from src.ResourceManager.Profiler import span
 
 # Minimum date to get data
 minimun_date = date(2013, 1, 1)
 
+# Natural key of the cleaned data sets, used to remove duplicates in incremental loads
+natural_keys = {
+    'B0E933': ['Fecha', 'CodigoEmbalse'],
+    'A0CF2A': ['CodigoEmbalse', 'NombreEmbalse'],
+    'BA1C55': ['Fecha', 'CodigoSerieHidrologica']
+}
+
+# File with the last loaded Fecha of each data set
+watermarks_file = 'watermarks.json'
+
+# Errors of a request to SIMEM that are retried (network, timeout and HTTP errors), the other errors are raised at once
+retried_errors = (requests.RequestException, ConnectionError, TimeoutError)
+
+# Compact types of the columns of each data set, applied when the data is read: the codes and regions as
+# categoricals, the dates as datetime64 and the energies as float32 (see exact_downcast)
+simem_schemas = {
+    'B0E933': {
+        'FechaPublicacion': 'datetime64[ns]',
+        'Fecha': 'datetime64[ns]',
+        'CodigoEmbalse': 'category',
+        'RegionHidrologica': 'category',
+        'VolumenUtilDiarioEnergia': 'float32',
+        'CapacidadUtilEnergia': 'float32',
+        'VolumenTotalEnergia': 'float32',
+        'VertimientosEnergia': 'float32'
+    },
+    'A0CF2A': {
+        'Fecha': 'datetime64[ns]',
+        'CodigoEmbalse': 'category',
+        'NombreEmbalse': 'category',
+        'FechaEjecucion': 'datetime64[ns]'
+    },
+    'BA1C55': {
+        'FechaPublicacion': 'datetime64[ns]',
+        'Fecha': 'datetime64[ns]',
+        'CodigoSerieHidrologica': 'category',
+        'RegionHidrologica': 'category',
+        'AportesHidricosEnergia': 'float32',
+        'PromedioAcumuladoEnergia': 'float32',
+        'MediaHistoricaEnergia': 'float32'
+    }
+}
+
+# Cleaning of each data set: columns dropped, rows excluded by (column, operator, value) with the operators
+# 'equals' and 'contains', and whether the duplicates are removed. All the exclusions are applied in one mask
+cleaning_rules = {
+    'B0E933': {'drop': ['FechaPublicacion'], 'exclude': [('CodigoEmbalse', 'contains', 'AGREGADO')]},
+    'A0CF2A': {'drop': ['Fecha', 'FechaEjecucion'], 'exclude': [], 'drop_duplicates': True},
+    'BA1C55': {'drop': ['FechaPublicacion'], 'exclude': [('CodigoSerieHidrologica', 'equals', 'Colombia')]}
+}
+
+# The float32 columns are only downcast when no value changes, so the saved data and the results stay the same.
+# With 0 they are always downcast (the energies in Wh lose precision over 2^24)
+exact_downcast = os.environ.get('SIMEM_EXACT_DOWNCAST', '1') != '0'
+
+
+def _downcast(values: pd.Series, dtype: str, exact: bool) -> pd.Series:
+    values = values.astype('float64')
+    compact = values.astype(dtype)
+    if exact and not np.array_equal(compact.to_numpy(dtype='float64'), values.to_numpy(), equal_nan=True):
+        return values
+    return compact
+
+
+def compact_frame(data: pd.DataFrame, data_id: str, exact: bool = exact_downcast) -> pd.DataFrame:
+    """
+    Casts the columns of a SIMEM data set to the compact types of its schema. The columns that are not in the
+    schema are kept as they are.
+
+    Args:
+        data (pd.DataFrame): Data of the data set, as returned by ReadSIMEM.
+        data_id (str): ID of the data set (key of simem_schemas).
+        exact (bool, optional): Downcast the float columns only when no value changes. Defaults to the environment variable SIMEM_EXACT_DOWNCAST or True.
+
+    Returns:
+        pd.DataFrame: Data with the compact types.
+    """
+    columns = {}
+    for column, dtype in simem_schemas.get(data_id, {}).items():
+        if column not in data.columns or data[column].dtype == dtype:
+            continue
+        if dtype == 'datetime64[ns]':
+            columns[column] = pd.to_datetime(data[column]).astype(dtype)
+        elif dtype.startswith('float'):
+            columns[column] = _downcast(data[column], dtype, exact)
+        else:
+            columns[column] = data[column].astype(dtype)
+    return data.assign(**columns) if columns else data
+
+
+def _excluded(values: pd.Series, operator: str, value: str) -> np.ndarray:
+    # The categoricals are compared once by category and the result is taken by code (-1, the missing values, is not excluded)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = pd.Series(values.cat.categories.astype(str))
+        by_category = categories.str.contains(value, regex=False) if operator == 'contains' else categories == value
+        return np.append(by_category.to_numpy(dtype=bool), False)[values.cat.codes.to_numpy()]
+    if operator == 'contains':
+        return values.astype('str').str.contains(value, regex=False).fillna(False).to_numpy(dtype=bool)
+    if operator == 'equals':
+        return (values == value).fillna(False).to_numpy(dtype=bool)
+    raise ValueError(f"Operador de limpieza desconocido: {operator}")
+
+
+def clean_frame(data: pd.DataFrame, data_id: str) -> pd.DataFrame:
+    """
+    Cleans a SIMEM data set with its rules of cleaning_rules in one pass: the exclusions are combined in one mask
+    and the rows and columns are selected at once. The data is not modified and, when no row is excluded, the
+    result shares the memory of the columns with it (copy-on-write).
+
+    Args:
+        data (pd.DataFrame): Data of the data set, as retrieved.
+        data_id (str): ID of the data set (key of cleaning_rules).
+
+    Returns:
+        pd.DataFrame: Cleaned data.
+    """
+    rules = cleaning_rules.get(data_id, {})
+    columns = [column for column in data.columns if column not in rules.get('drop', [])]
+
+    mask = np.zeros(len(data), dtype=bool)
+    for column, operator, value in rules.get('exclude', []):
+        if column in data.columns:
+            mask |= _excluded(data[column], operator, value)
+
+    data = data.loc[~mask, columns] if mask.any() else data[columns]
+    return data.drop_duplicates() if rules.get('drop_duplicates') else data
+
+
+def concat_frames(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates the chunks of a data set keeping the categorical columns, whose categories are united first
+    (pandas converts categoricals with different categories to object when they are concatenated).
+
+    Args:
+        parts (List[pd.DataFrame]): Chunks of the data set, with the same columns.
+
+    Returns:
+        pd.DataFrame: Data of all the chunks.
+    """
+    for column in parts[0].select_dtypes('category').columns:
+        categories = sorted(set().union(*[part[column].cat.categories for part in parts if column in part.columns]))
+        dtype = pd.CategoricalDtype(categories)
+        parts = [part.assign(**{column: part[column].astype(dtype)}) if column in part.columns else part for part in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def memory_report(data_sets: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Returns the memory used by each column of the data sets.
+
+    Args:
+        data_sets (Dict[str, pd.DataFrame]): Data sets by ID.
+
+    Returns:
+        pd.DataFrame: Columns data_id, column, dtype and bytes (including the Python strings).
+    """
+    return pd.DataFrame([
+        {'data_id': data_id, 'column': column, 'dtype': str(data[column].dtype), 'bytes': int(data[column].memory_usage(index=False, deep=True))}
+        for data_id, data in data_sets.items() for column in data.columns
+    ], columns=['data_id', 'column', 'dtype', 'bytes'])
+
+
+def split_dates(start_date: date, end_date: date, freq: str = 'YS') -> List[Tuple[date, date]]:
+    """
+    Split a date range in consecutive chunks that do not overlap.
+
+    Args:
+        start_date (date): Start date of the range.
+        end_date (date): End date of the range (included).
+        freq (str, optional): Pandas frequency of the start of each chunk ('YS' by year, 'MS' by month, None for one chunk). Defaults to 'YS'.
+
+    Returns:
+        List[Tuple[date, date]]: Start and end date (both included) of each chunk, in order.
+    """
+    if start_date > end_date:
+        return []
+    if freq is None:
+        return [(start_date, end_date)]
+    starts = [start_date] + [d.date() for d in pd.date_range(start_date, end_date, freq=freq) if d.date() > start_date]
+    ends = [d - timedelta(days=1) for d in starts[1:]] + [end_date]
+    return list(zip(starts, ends))
+
+
+def read_watermarks(relative_path: str) -> Dict[str, date]:
+    """
+    Read the last loaded date (high-water mark) of each SIMEM data set.
+
+    Args:
+        relative_path (str): Relative path of the Data folder.
+
+    Returns:
+        Dict[str, date]: Last loaded date by data set ID, empty if nothing has been loaded.
+    """
+    file_path = os.path.join(relative_path, 'Cleansed', 'SIMEM', watermarks_file)
+    if not os.path.isfile(file_path):
+        return {}
+    with open(file_path, 'r') as file:
+        return {data_id: date.fromisoformat(value) for data_id, value in json.load(file).items()}
+
+
+def save_watermarks(relative_path: str, watermarks: Dict[str, date]) -> Dict[str, date]:
+    """
+    Save the last loaded date (high-water mark) of each SIMEM data set.
+
+    Args:
+        relative_path (str): Relative path of the Data folder.
+        watermarks (Dict[str, date]): Last loaded date by data set ID.
+
+    Returns:
+        Dict[str, date]: Saved high-water marks.
+    """
+    file_path = os.path.join(relative_path, 'Cleansed', 'SIMEM', watermarks_file)
+    with open(file_path, 'w') as file:
+        json.dump({data_id: str(value) for data_id, value in watermarks.items()}, file, indent=4)
+    return watermarks
+
 
 class DataSIMEM:
     """
@@ -15,19 +238,31 @@ class DataSIMEM:
     Attributes:
         data_sets_keys (Dict[str,str]): Default dataset to get data with the names to save the files.
         data_sets (Dict[str, pd.DataFrame]): Dictionary to handel the data.
+        raw_data (Dict[str, pd.DataFrame]): Dictionary with the retrieved data before cleaning.
+        cache (ResponseCache): Cache of the raw responses by data set and date window.
+        compact (bool): Whether the data read is cast to the compact types of simem_schemas.
 
     Methods:
         _clean_data: Cleans the raw SIMEM data.
         get_simem_data: Returns the cleaned SIMEM data.
-        save_simem_data: Saves the cleaned SIMEM data to an Excel file.
+        save_simem_data: Saves the cleaned SIMEM data to Parquet (or Excel) files.
+        update_simem_data: Fetches only the data after the last loaded date and appends it to the saved files.
     """
 
-    def __init__(self, data_sets: Dict[str, pd.DataFrame] = None) -> None:
+    def __init__(self, data_sets: Dict[str, pd.DataFrame] = None, max_workers: int = 4, chunk_freq: str = 'YS',
+                 retries: int = 3, backoff: float = 1.0, reader: type = None, cache: ResponseCache = None, compact: bool = True) -> None:
         """
         Initialize the DataSIMEM object.
 
         Args:
             data_sets (Dict[str, pd.DataFrame], optional): Dictionary to store the data sets. Defaults to None.
+            max_workers (int, optional): Maximum number of concurrent requests to SIMEM. Defaults to 4.
+            chunk_freq (str, optional): Frequency used to split the date range of each request ('YS' by year, 'MS' by month, None to not split it). Defaults to 'YS'.
+            retries (int, optional): Number of retries of a failed request. Defaults to 3.
+            backoff (float, optional): Seconds to wait before the first retry, doubled on each retry. Defaults to 1.0.
+            reader (type, optional): Class used to read SIMEM, with the interface of pydatasimem.ReadSIMEM. Defaults to None (ReadSIMEM, imported before the first fetch).
+            cache (ResponseCache, optional): Cache of the raw responses by data set and date window. Defaults to the shared cache.
+            compact (bool, optional): Cast the data read to the compact types of simem_schemas. Defaults to True.
         """
         self.data_sets_keys = {
             'B0E933': 'ReservasHidraulicasEnergía',
@@ -36,15 +271,73 @@ class DataSIMEM:
         }
         self.data_sets = data_sets if data_sets else {}
         self.raw_data = {}
+        self.max_workers = max_workers
+        self.chunk_freq = chunk_freq
+        self.retries = retries
+        self.backoff = backoff
+        self.reader = reader
+        self.cache = cache if cache else get_cache()
+        self.compact = compact
+
+    def _get_reader(self) -> type:
+        """
+        Returns the class that reads SIMEM, importing ReadSIMEM on the first call (pydataxm is imported only when
+        SIMEM is read, so importing this module stays fast).
+
+        Returns:
+            type: Class with the interface of pydatasimem.ReadSIMEM.
+        """
+        if self.reader is None:
+            from pydataxm.pydatasimem import ReadSIMEM
+            self.reader = ReadSIMEM
+        return self.reader
+
+    def _read_chunk(self, data_id: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Retrieve a chunk of a data set from the cache or from SIMEM, retrying the network and HTTP errors (retried_errors)
+        with exponential backoff.
+
+        Args:
+            data_id (str): ID of the data set.
+            start_date (date): Start date of the chunk.
+            end_date (date): End date of the chunk.
+
+        Returns:
+            pd.DataFrame: Data of the chunk, with the compact types of simem_schemas when compact is True.
+        """
+        with span('simem.read_chunk', data_id=data_id, start_date=str(start_date), end_date=str(end_date)) as current:
+            data = self.cache.get_frame('SIMEM', data_id, start_date, end_date)
+            if data is not None:
+                current.set(cached=True).add(rows=len(data))
+                return compact_frame(data, data_id) if self.compact else data
 
-    def get_simem_data(self, start_date: date = None, end_date: date = None, data_sets: list = None) -> Dict[str, pd.DataFrame]:
+            reader = self._get_reader()
+            for attempt in range(self.retries + 1):
+                try:
+                    data = reader(data_id, str(start_date), str(end_date)).main(filter=False)
+                    break
+                except retried_errors:
+                    if attempt == self.retries:
+                        raise
+                    time.sleep(self.backoff * 2 ** attempt)
+
+            current.set(cached=False, attempts=attempt + 1).add(rows=0 if data is None else len(data))
+            if data is not None and not data.empty:
+                if self.compact:
+                    data = compact_frame(data, data_id)
+                self.cache.set_frame(data, 'SIMEM', data_id, start_date, end_date)
+            return data
+
+    def get_simem_data(self, start_date: date = None, end_date: date = None, data_sets: list = None, watermarks: Dict[str, date] = None) -> Dict[str, pd.DataFrame]:
         """
-        Retrieve data from SIMEM.
+        Retrieve data from SIMEM. The date range of each data set is split in chunks and all the chunks
+        are retrieved in a pool of threads, the data of each data set is assembled in date order.
 
         Args:
             start_date (date, optional): Start date of the data. Defaults to None.
             end_date (date, optional): End date of the data. Defaults to None.
             data_sets (list, optional): List of data sets to retrieve. Defaults to None.
+            watermarks (Dict[str, date], optional): Last loaded date by data set, the data is retrieved from that date. Defaults to None.
 
         Returns:
             Dict[str, pd.DataFrame]: Dictionary containing the retrieved data sets.
@@ -55,16 +348,34 @@ class DataSIMEM:
 
         # Settings which data sets get the data
     
-        data_sets = [data for data in self.data_sets_keys if data in data_sets] if data_sets is not None else self.data_sets_keys
-        self.data_sets_keys = data_sets
-       
+        data_sets = [data for data in self.data_sets_keys if data in data_sets] if data_sets is not None else list(self.data_sets_keys)
+        watermarks = watermarks if watermarks else {}
         
+        # Incremental loads start in the last loaded date, the overlap is removed with the natural key
+        chunks = {
+            data_id: split_dates(max(start_date, watermarks.get(data_id, start_date)), end_date, self.chunk_freq)
+            for data_id in data_sets
+        }
+
+        # Getting the chunks of all the DataSets concurrently, the reader is resolved before the threads start
+        self._get_reader()
+        with span('simem.fetch', data_sets=data_sets, chunks=sum(len(chunk) for chunk in chunks.values())) as current, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                data_id: [executor.submit(self._read_chunk, data_id, chunk_start, chunk_end) for chunk_start, chunk_end in chunks[data_id]]
+                for data_id in data_sets
+            }
+            results = {data_id: [future.result() for future in futures[data_id]] for data_id in data_sets}
+            current.add(rows=sum(len(part) for parts in results.values() for part in parts if part is not None))
+
         for data_id in data_sets:
             
-            # Getting the data from the DataSet
-            file = ReadSIMEM(data_id, str(start_date), str(end_date))
-            data = file.main(filter=False)
-            
+            # Skipping the data sets without new data
+            parts = [part for part in results[data_id] if part is not None and not part.empty]
+            if not parts:
+                continue
+            data = concat_frames(parts)
+
             # Updating the Key in the Dict of DataSet's
             self.data_sets[data_id] = data
             self.raw_data[data_id] = data
@@ -73,58 +384,102 @@ class DataSIMEM:
 
     def _clean_data(self) -> Dict[str, pd.DataFrame]:
         """
-        Clean the retrieved data.
+        Clean the retrieved data with the rules of cleaning_rules. The raw data is not modified and stays in raw_data.
 
         Returns:
             Dict[str, pd.DataFrame]: Dictionary containing the cleaned data sets.
         """
         if not self.data_sets:
             self.get_simem_data()
-        
-       
-        # Setting columns from Aportes hidrios
-        self.data_sets['BA1C55'] = self.data_sets['BA1C55'].drop(columns=['FechaPublicacion'])
-        
-        # Filtering the data
-        self.data_sets['BA1C55'] = self.data_sets['BA1C55'][self.data_sets['BA1C55']['CodigoSerieHidrologica']!='Colombia']
-        
-        # Setting columns from Reservas hidricas
-        self.data_sets['B0E933'] = self.data_sets['B0E933'].drop(columns=['FechaPublicacion'])
-        
-        # Filtering the data
-        self.data_sets['B0E933'] = self.data_sets['B0E933'][~self.data_sets['B0E933']['CodigoEmbalse'].str.contains('AGREGADO')]
 
-        # Setting columns from Listado embalses
-        self.data_sets['A0CF2A'] = self.data_sets['A0CF2A'].drop(columns=['Fecha','FechaEjecucion'])
-        
-        # Dropping duplicates
-        self.data_sets['A0CF2A'] = self.data_sets['A0CF2A'].drop_duplicates()
+        # The retrieved data is kept in raw_data and the cleaning always starts from it, so it can be repeated
+        for data_id in self.data_sets:
+            raw = self.raw_data.setdefault(data_id, self.data_sets[data_id])
+            self.data_sets[data_id] = clean_frame(raw, data_id)
 
         return self.data_sets
 
-    def save_simem_data(self, relative_path: str,save_raw:bool =False) -> Dict[str, pd.DataFrame]:
+    def _get_watermarks(self) -> Dict[str, date]:
         """
-        Save the retrieved data to Excel files.
+        Get the last date of the retrieved (not cleaned) data sets.
+
+        Returns:
+            Dict[str, date]: Last date by data set ID.
+        """
+        watermarks = {}
+        for data_id, data in self.data_sets.items():
+            data = self.raw_data.get(data_id, data)
+            if 'Fecha' in data.columns and not data.empty:
+                watermarks[data_id] = pd.to_datetime(data['Fecha']).max().date()
+        return watermarks
+
+    def save_simem_data(self, relative_path: str,save_raw:bool =False, file_format: str = default_format) -> Dict[str, pd.DataFrame]:
+        """
+        Save the retrieved data to Parquet files, partitioned by year when the data set has the column Fecha.
 
         Args:
             relative_path (str): Relative path to save the data files.
+            save_raw (bool, optional): Save the raw data too. Defaults to False.
+            file_format (str, optional): Extension of the files ('.parquet' or '.xlsx' to export to Excel). Defaults to '.parquet'.
 
         Returns:
             Dict[str, pd.DataFrame]: Dictionary containing the saved data sets.
         """
 
-        self._clean_data()
+        watermarks = self._get_watermarks()
+        with span('simem.clean'):
+            self._clean_data()
 
         
         for file_name in self.data_sets:
             
-            file_path = os.path.abspath(os.path.join(relative_path+'\\Cleansed\\SIMEM', f'{self.data_sets_keys[file_name]}.xlsx'))
-            # Save the data in the path
-            self.data_sets[file_name].to_excel(file_path,index=False)
-            if save_raw:
-                raw_file_path = os.path.join(relative_path+'\\Raw\\SIMEM', f'{self.data_sets_keys[file_name]}.xlsx')
-                self.raw_data[file_name].to_excel(raw_file_path,index=False)
+            name = self.data_sets_keys[file_name]
+            partition_on = 'Fecha' if 'Fecha' in self.data_sets[file_name].columns else None
+            file_path = os.path.abspath(os.path.join(relative_path, 'Cleansed', 'SIMEM', f'{name}{file_format}'))
+            with span('simem.save', data_id=file_name, path=file_path):
+                # Save the data in the path
+                write_data(self.data_sets[file_name], file_path, partition_on=partition_on, schema=name)
+                if save_raw:
+                    raw_partition_on = 'Fecha' if 'Fecha' in self.raw_data[file_name].columns else None
+                    raw_file_path = os.path.join(relative_path, 'Raw', 'SIMEM', f'{name}{file_format}')
+                    write_data(self.raw_data[file_name], raw_file_path, partition_on=raw_partition_on)
         
+        # Saving the last loaded date to allow incremental loads
+        if file_format == default_format:
+            save_watermarks(relative_path, {**read_watermarks(relative_path), **watermarks})
+
+        return self.data_sets
+
+    def update_simem_data(self, relative_path: str, end_date: date = None, data_sets: list = None) -> Dict[str, pd.DataFrame]:
+        """
+        Incremental load: retrieve only the data from the last loaded date of each data set (high-water mark)
+        and append it to the saved Parquet files, removing duplicates with the natural key of the data set.
+
+        Args:
+            relative_path (str): Relative path of the Data folder.
+            end_date (date, optional): End date of the data. Defaults to today.
+            data_sets (list, optional): List of data sets to update. Defaults to None (all the data sets).
+
+        Returns:
+            Dict[str, pd.DataFrame]: Dictionary containing the new cleaned data.
+        """
+        watermarks = read_watermarks(relative_path)
+        self.get_simem_data(end_date=end_date if end_date else date.today(), data_sets=data_sets, watermarks=watermarks)
+        watermarks.update(self._get_watermarks())
+        with span('simem.clean'):
+            self._clean_data()
+
+        for data_id in self.data_sets:
+
+            name = self.data_sets_keys[data_id]
+            partition_on = 'Fecha' if 'Fecha' in self.data_sets[data_id].columns else None
+            file_path = os.path.abspath(os.path.join(relative_path, 'Cleansed', 'SIMEM', f'{name}{default_format}'))
+            with span('simem.append', data_id=data_id, path=file_path):
+                # Append the new data in the path
+                append_data(self.data_sets[data_id], file_path, natural_keys[data_id], partition_on=partition_on, schema=name)
+
+        save_watermarks(relative_path, watermarks)
+
         return self.data_sets
 
 
@@ -133,9 +488,9 @@ if __name__ == "__main__":
     start_date = date(2013, 1, 1)
     end_date = date(2025, 3, 31)
     data_sets = {
-            'B0E933': pd.read_excel(os.path.abspath('./Data/Raw/SIMEM/ReservasHidraulicasEnergía.xlsx')),
-            'A0CF2A': pd.read_excel(os.path.abspath('./Data/Raw/SIMEM/ListadoEmbalses.xlsx')),
-            'BA1C55': pd.read_excel(os.path.abspath('./Data/Raw/SIMEM/AportesHidricos.xlsx'))
+            'B0E933': read_data(os.path.abspath('./Data/Raw/SIMEM/ReservasHidraulicasEnergía.parquet')),
+            'A0CF2A': read_data(os.path.abspath('./Data/Raw/SIMEM/ListadoEmbalses.parquet')),
+            'BA1C55': read_data(os.path.abspath('./Data/Raw/SIMEM/AportesHidricos.parquet'))
         }
     simem = DataSIMEM(data_sets=data_sets)
     simem.save_simem_data('Data')
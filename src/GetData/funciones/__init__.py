@@ -0,0 +1,37 @@
+'''
+Funciones de apoyo para el análisis exploratorio y el entrenamiento de los modelos.
+
+Las funciones están separadas en submódulos que solo se importan cuando se usa una de sus funciones, de modo que
+importar una función de estadística no carga matplotlib, seaborn ni sklearn:
+    - graficos: multiple_plot, plot_roc_curve, plot_param_perf (matplotlib y seaborn).
+    - estadistica: tidy_corr_matrix, checkVIF, podarVIF, identificar_outliers (numpy y pandas).
+    - modelos: eval_model, search_param (sklearn solo para la búsqueda de parámetros).
+'''
+import importlib
+
+# Submódulo de cada función
+_submodules = {
+    'multiple_plot': 'graficos',
+    'plot_roc_curve': 'graficos',
+    'plot_param_perf': 'graficos',
+    'tidy_corr_matrix': 'estadistica',
+    'checkVIF': 'estadistica',
+    'podarVIF': 'estadistica',
+    'identificar_outliers': 'estadistica',
+    'eval_model': 'modelos',
+    'search_param': 'modelos'
+}
+
+__all__ = list(_submodules)
+
+
+def __getattr__(name):
+    if name not in _submodules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_submodules[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
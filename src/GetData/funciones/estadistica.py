@@ -0,0 +1,68 @@
+#Librerias
+import numpy as np
+import pandas as pd
+
+from src.Analysis.Outliers import outlier_mask
+#Factor de Inflación de la Varianza VIF
+from src.Analysis.Collinearity import vif as compute_vif, prune_vif
+
+
+# Función para convertir una matriz de correlación de pandas en formato tidy    
+def tidy_corr_matrix(corr_mat):
+    '''
+    Función para convertir una matriz de correlación de pandas en formato tidy
+    '''
+    corr_mat = corr_mat.stack().reset_index()
+    corr_mat.columns = ['variable_1','variable_2','r']
+    corr_mat = corr_mat.loc[corr_mat['variable_1'] != corr_mat['variable_2'], :]
+    corr_mat['abs_r'] = np.abs(corr_mat['r'])
+    corr_mat = corr_mat.sort_values('abs_r', ascending=False)
+    
+    return(corr_mat)
+
+#Función para calcular VIF (Variance Inflation Factor):
+   
+
+def checkVIF(X, center=True):
+    '''
+    Se Utiliza VIF para solucionar la multicolinealidad. VIF indica el grado de indecencia de esa variable. 
+    Los valores de los umbrales típicos que se suelen utilizar son entre 5 y 10, siendo más exigentes los valores más bajos.
+    Se calcula con una sola inversión de la matriz de correlación (ver src/Analysis/Collinearity.py); las variables que son combinación lineal de otras tienen VIF inf.
+    Por defecto se usa la correlación centrada (regresiones con intercepto, como variance_inflation_factor de statsmodels 0.15 con standardize=True).
+    Con center=False se usa la correlación sin centrar (regresiones sin intercepto, como standardize=False o las versiones anteriores de statsmodels).
+    '''    
+    vif = pd.DataFrame()
+    vif['Features'] = X.columns
+    vif['VIF'] = compute_vif(X, center=center).to_numpy()
+    vif['VIF'] = round(vif['VIF'], 2)
+    vif = vif.sort_values(by = "VIF", ascending = False)
+    return(vif)
+
+def podarVIF(X, umbral=10, center=True):
+    '''
+    Elimina iterativamente la variable con mayor VIF hasta que todas las variables tengan un VIF menor al umbral.
+    La inversa de la matriz de correlación se actualiza en cada paso en lugar de calcularse de nuevo.
+
+    Retorna:
+    tuple: DataFrame con las variables que se conservan y DataFrame con las variables eliminadas y su VIF.
+    '''
+    columnas, eliminadas = prune_vif(X, threshold=umbral, center=center)
+    return X[columnas], eliminadas
+
+def identificar_outliers(df, numCols, by=None, mask=False):
+    """
+    Identifica los índices de los valores outliers en un DataFrame para una lista de variables numéricas.
+    Los cuartiles de todas las columnas se calculan en una sola pasada (ver src/Analysis/Outliers.py).
+
+    Parámetros:
+    df (pd.DataFrame): El DataFrame que contiene los datos.
+    numCols (list): Lista de nombres de las columnas numéricas a analizar.
+    by (str): Columna para calcular los límites por grupo, por ejemplo 'RegionHidrologica' o 'CodigoEmbalse' (opcional).
+    mask (bool): Si es True retorna un DataFrame booleano con una columna por variable en lugar de la lista (opcional).
+
+    Retorna:
+    list: Lista de índices de los valores outliers, sin repetir.
+    """
+    if mask:
+        return outlier_mask(df, numCols, by=by, per_column=True)
+    return df.index[outlier_mask(df, numCols, by=by).to_numpy()].tolist()
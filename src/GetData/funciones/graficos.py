@@ -1,20 +1,9 @@
 #Librerias
 import math
-import numpy as np
-import pandas as pd
 
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from sklearn.metrics import (mean_absolute_error, 
-                             r2_score,
-                             root_mean_squared_error)
-#from sktime.performance_metrics.forecasting import mean_absolute_scaled_error
-
-#Factor de Inflación de la Varianza VIF
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from sktime.performance_metrics.forecasting import mean_absolute_scaled_error
-
 
 # Función para graficar atributos en barras, pair plot o box-plot
 def multiple_plot(ncols, data, columns, target_var, plot_type, title, rot): 
@@ -193,93 +182,6 @@ def plot_roc_curve(fpr, tpr):
     plt.legend()
     plt.show()
 
-# Función para convertir una matriz de correlación de pandas en formato tidy    
-def tidy_corr_matrix(corr_mat):
-    '''
-    Función para convertir una matriz de correlación de pandas en formato tidy
-    '''
-    corr_mat = corr_mat.stack().reset_index()
-    corr_mat.columns = ['variable_1','variable_2','r']
-    corr_mat = corr_mat.loc[corr_mat['variable_1'] != corr_mat['variable_2'], :]
-    corr_mat['abs_r'] = np.abs(corr_mat['r'])
-    corr_mat = corr_mat.sort_values('abs_r', ascending=False)
-    
-    return(corr_mat)
-
-#Función para calcular VIF (Variance Inflation Factor):
-   
-
-def checkVIF(X):
-    '''
-    Se Utiliza VIF para solucionar la multicolinealidad. VIF indica el grado de indecencia de esa variable. 
-    Los valores de los umbrales típicos que se suelen utilizar son entre 5 y 10, siendo más exigentes los valores más bajos.
-    '''    
-    vif = pd.DataFrame()
-    vif['Features'] = X.columns
-    vif['VIF'] = [variance_inflation_factor(X.values, i) for i in range(X.shape[1])]
-    vif['VIF'] = round(vif['VIF'], 2)
-    vif = vif.sort_values(by = "VIF", ascending = False)
-    return(vif)
-
-def identificar_outliers(df, numCols):
-    """
-    Identifica los índices de los valores outliers en un DataFrame para una lista de variables numéricas.
-
-    Parámetros:
-    df (pd.DataFrame): El DataFrame que contiene los datos.
-    numCols (list): Lista de nombres de las columnas numéricas a analizar.
-
-    Retorna:
-    list: Lista de índices de los valores outliers.
-    """
-    # Lista para almacenar los índices de los outliers
-    outliers_indices = []
-
-    for var in numCols:
-        # Calcular el rango intercuartílico (IQR)
-        Q1 = df[var].quantile(0.25)
-        Q3 = df[var].quantile(0.75)
-        IQR = Q3 - Q1
-
-        # Definir los límites para identificar outliers
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-
-        # Identificar los índices de los outliers
-        outliers = df[(df[var] < lower_bound) | (df[var] > upper_bound)].index.tolist()
-        
-        # Agregar los índices a la lista de outliers
-        outliers_indices.extend(outliers)
-
-    return outliers_indices
-
-def eval_model(model, X_train, y_train):
-    """
-    Permite evaluar el rendimiento de un modelo de regresión utilizando varias métricas.
-
-    Parámetros:
-    model (object): El modelo de regresión que se va a evaluar.
-    X_train (array-like): Conjunto de características de entrenamiento.
-    y_train (array-like): Valores reales de la variable objetivo para el conjunto de entrenamiento.
-
-    Retorna:
-    dict: Un diccionario que contiene las siguientes métricas de evaluación:
-        - "mae": Error absoluto medio (Mean Absolute Error).
-        - "rmse": Raíz del error cuadrático medio (Root Mean Squared Error).
-        - "r2": Coeficiente de determinación (R²).
-        - "mase": Error absoluto medio escalado (Mean Absolute Scaled Error).
-    """
-    y_pred = model.predict(X_train)
-
-    metrics = {
-        "mae": round(mean_absolute_error(y_train, y_pred), 5),
-        "rmse": round(root_mean_squared_error(y_train, y_pred), 5),
-        "r2": round(r2_score(y_train, y_pred), 5),
-        "mase": round(mean_absolute_scaled_error(y_train, y_pred, y_train=y_train), 5)
-    }
-
-    return metrics
-
 def plot_param_perf(x, y_data, title, x_label, y_label):
     """
     Grafica el rendimiento del modelo en función de un parámetro ajustado.
@@ -301,58 +203,3 @@ def plot_param_perf(x, y_data, title, x_label, y_label):
     plt.xlabel(x_label)
     plt.ylabel(y_label)
     plt.show()
-    
-
-def search_param(base_model, X_train, y_train, X_test, y_test, base_params, search_param, search_range):
-    """
-    Busca el mejor valor para un parámetro específico del modelo, evaluando el rendimiento
-    en términos de R² y MASE para los conjuntos de entrenamiento y prueba.
-
-    Parámetros:
-    base_model (object): El modelo base que se va a ajustar.
-    X_train (array-like): Conjunto de características de entrenamiento.
-    y_train (array-like): Valores reales de la variable objetivo para el conjunto de entrenamiento.
-    X_test (array-like): Conjunto de características de prueba.
-    y_test (array-like): Valores reales de la variable objetivo para el conjunto de prueba.
-    base_params (dict): Parámetros base del modelo.
-    search_param (str): El nombre del parámetro que se va a ajustar.
-    search_range (iterable): Rango de valores para el parámetro que se va a buscar.
-
-    Retorna:
-    tuple: Dos diccionarios que contienen las métricas R² y MASE para los conjuntos de entrenamiento y prueba.
-    """
-    r2_train = []
-    r2_test = []
-    mase_train = []
-    mase_test = []
-
-    for param in search_range:
-        
-        # Actualizar los parámetros del modelo con el valor actual del parámetro en búsqueda
-        model_params = base_params
-        model_params[search_param] = param
-        current_model = base_model.set_params(**model_params)
-
-        print(f"Ajustando para {search_param}={param}")
-        current_model.fit(X_train, y_train)
-
-        # Guardar R² para entrenamiento y prueba
-        r2_train.append(r2_score(y_train, current_model.predict(X_train)))
-        r2_test.append(r2_score(y_test, current_model.predict(X_test)))
-
-        # Guardar MASE para entrenamiento y prueba
-        mase_train.append(
-            mean_absolute_scaled_error(
-                y_train, current_model.predict(X_train), y_train=y_train
-            )
-        )
-        mase_test.append(
-            mean_absolute_scaled_error(
-                y_test, current_model.predict(X_test), y_train=y_test
-            )
-        )
-
-    # Guardar métricas en diccionarios
-    r2_scores = {"train": r2_train, "test": r2_test}
-    mase_scores = {"train": mase_train, "test": mase_test}
-    return r2_scores, mase_scores
\ No newline at end of file
@@ -0,0 +1,63 @@
+#Librerias
+import numpy as np
+
+from src.Analysis.Metrics import regression_metrics
+
+
+def eval_model(model, X_train, y_train, sp=1):
+    """
+    Permite evaluar el rendimiento de un modelo de regresión utilizando varias métricas.
+    Todas las métricas se calculan en una sola pasada sobre los errores (ver src/Analysis/Metrics.py).
+
+    Parámetros:
+    model (object): El modelo de regresión que se va a evaluar.
+    X_train (array-like): Conjunto de características de entrenamiento.
+    y_train (array-like): Valores reales de la variable objetivo para el conjunto de entrenamiento.
+    sp (int): Rezago estacional del pronóstico ingenuo del MASE (opcional, por defecto 1).
+
+    Retorna:
+    dict: Un diccionario que contiene las siguientes métricas de evaluación:
+        - "mae": Error absoluto medio (Mean Absolute Error).
+        - "rmse": Raíz del error cuadrático medio (Root Mean Squared Error).
+        - "r2": Coeficiente de determinación (R²).
+        - "mase": Error absoluto medio escalado (Mean Absolute Scaled Error).
+    """
+    y_pred = model.predict(X_train)
+
+    metrics = regression_metrics(np.ravel(y_train), np.ravel(y_pred), sp=sp)
+    metrics = {name: round(value, 5) for name, value in metrics.items()}
+
+    return metrics
+
+def search_param(base_model, X_train, y_train, X_test, y_test, base_params, search_param, search_range,
+                 max_workers=None, results_path=None, patience=None):
+    """
+    Busca el mejor valor para un parámetro específico del modelo, evaluando el rendimiento
+    en términos de R² y MASE para los conjuntos de entrenamiento y prueba.
+    Los candidatos se ajustan en paralelo y cada conjunto se predice una sola vez por candidato (ver src/Analysis/Sweep.py);
+    el modelo base y base_params no se modifican.
+
+    Parámetros:
+    base_model (object): El modelo base que se va a ajustar.
+    X_train (array-like): Conjunto de características de entrenamiento.
+    y_train (array-like): Valores reales de la variable objetivo para el conjunto de entrenamiento.
+    X_test (array-like): Conjunto de características de prueba.
+    y_test (array-like): Valores reales de la variable objetivo para el conjunto de prueba.
+    base_params (dict): Parámetros base del modelo.
+    search_param (str): El nombre del parámetro que se va a ajustar.
+    search_range (iterable): Rango de valores para el parámetro que se va a buscar.
+    max_workers (int): Número de procesos (opcional, por defecto la variable de entorno SWEEP_WORKERS o los núcleos).
+    results_path (str): Archivo .jsonl donde se guardan los resultados para continuar una búsqueda interrumpida (opcional).
+    patience (int): Detiene la búsqueda después de este número de valores sin mejorar el R² de prueba (opcional).
+
+    Retorna:
+    tuple: Dos diccionarios que contienen las métricas R² y MASE para los conjuntos de entrenamiento y prueba, con un valor
+    por cada valor de search_range (NaN para los valores que no se evaluaron porque la búsqueda se detuvo).
+    """
+    # El ajuste en paralelo usa sklearn, que solo se importa cuando se hace una búsqueda
+    from src.Analysis.Sweep import run_sweep, sweep_scores
+
+    results = run_sweep(base_model, X_train, y_train, X_test, y_test, {search_param: list(search_range)},
+                        base_params=base_params, max_workers=max_workers, results_path=results_path, patience=patience)
+    r2_scores, mase_scores = sweep_scores(results)
+    return r2_scores, mase_scores
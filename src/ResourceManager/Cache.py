@@ -0,0 +1,275 @@
+import io
+import os
+import atexit
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import pandas as pd
+from collections import Counter
+from typing import Dict
+
+# Default settings of the shared cache, can be changed with environment variables
+default_cache_path = os.environ.get('DATA_CACHE_PATH', os.path.join('Data', 'Cache'))
+default_ttl = float(os.environ.get('DATA_CACHE_TTL', 24 * 60 * 60))
+default_max_bytes = int(os.environ.get('DATA_CACHE_MAX_BYTES', 1024 ** 3))
+
+# Hits whose access times are kept in memory before the index is saved (it is also saved on set and close)
+index_flush_hits = 100
+
+
+class ResponseCache:
+    """
+    On-disk cache of the raw responses of the data sources.
+
+    The entries are keyed by (source, dataset id, start date, end date) and the payloads are stored by the
+    SHA-256 of their content, so identical payloads are stored once. Entries older than the TTL are ignored and
+    when the cache is bigger than the maximum size the least recently used entries are evicted. The access times of
+    the hits are kept in memory and the index is replaced atomically, so a crash or another process never leaves it
+    truncated.
+
+    Attributes:
+        path (str): Folder of the cache.
+        ttl (float): Seconds an entry is valid, 0 disables the cache.
+        max_bytes (int): Maximum size in bytes of the stored payloads.
+        stats (Dict[str, int]): Hits, misses, evictions (by size) and expirations (by TTL) of the cache.
+
+    Methods:
+        get: Returns the cached payload of a key.
+        set: Saves the payload of a key.
+        validators: Returns the HTTP validators saved with the payload of a key.
+        get_frame: Returns the cached DataFrame of a key.
+        set_frame: Saves the DataFrame of a key.
+        report: Returns the statistics and size of the cache.
+        close: Saves the access times kept in memory.
+    """
+
+    def __init__(self, path: str = default_cache_path, ttl: float = default_ttl, max_bytes: int = default_max_bytes) -> None:
+        """
+        Initialize the ResponseCache object.
+
+        Args:
+            path (str, optional): Folder of the cache. Defaults to 'Data/Cache'.
+            ttl (float, optional): Seconds an entry is valid, 0 disables the cache. Defaults to one day.
+            max_bytes (int, optional): Maximum size in bytes of the stored payloads. Defaults to 1 GiB.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(path, 'index.json')
+        self._index = self._read_index()
+        self._pending_hits = 0
+
+        # Keys pointing to each payload and size of the stored payloads, updated as the entries are added and removed
+        self._references = Counter(entry['object'] for entry in self._index.values())
+        self._bytes = sum({entry['object']: entry['size'] for entry in self._index.values()}.values())
+
+    @staticmethod
+    def key(source: str, dataset_id: str = None, start_date=None, end_date=None) -> str:
+        """
+        Returns the key of an entry of the cache.
+
+        Args:
+            source (str): Name of the data source (SIMEM, ONI, PARATEC).
+            dataset_id (str, optional): ID of the data set or resource. Defaults to None.
+            start_date (optional): Start date of the window. Defaults to None.
+            end_date (optional): End date of the window. Defaults to None.
+
+        Returns:
+            str: Key of the entry.
+        """
+        return hashlib.sha256('|'.join(str(value) for value in (source, dataset_id, start_date, end_date)).encode()).hexdigest()
+
+    def _read_index(self) -> Dict[str, dict]:
+        if not os.path.isfile(self._index_path):
+            return {}
+        with open(self._index_path, 'r') as file:
+            return json.load(file)
+
+    def _save_index(self) -> None:
+        # Written to a temporary file in the same folder and then replaced, so the index is never left half written
+        os.makedirs(self.path, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.path, prefix='index.', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                json.dump(self._index, file)
+            os.replace(temporary, self._index_path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self._pending_hits = 0
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.path, 'objects', digest)
+
+    def get(self, source: str, dataset_id: str = None, start_date=None, end_date=None) -> bytes:
+        """
+        Returns the cached payload of a key if it exists and has not expired.
+
+        Returns:
+            bytes: Cached payload, None when the key is not in the cache.
+        """
+        if self.ttl <= 0:
+            return None
+
+        key = self.key(source, dataset_id, start_date, end_date)
+        with self._lock:
+            entry = self._index.get(key)
+            now = time.time()
+            if entry is None or now - entry['created'] > self.ttl or not os.path.isfile(self._object_path(entry['object'])):
+                self.stats['misses'] += 1
+                return None
+            entry['accessed'] = now
+            self.stats['hits'] += 1
+            self._pending_hits += 1
+            if self._pending_hits >= index_flush_hits:
+                self._save_index()
+
+            with open(self._object_path(entry['object']), 'rb') as file:
+                return file.read()
+
+    def validators(self, source: str, dataset_id: str = None, start_date=None, end_date=None) -> Dict[str, str]:
+        """
+        Returns the HTTP validators (ETag and Last-Modified) saved with the payload of a key, so the next request
+        can be conditional. The access time of the entry is not updated.
+
+        Returns:
+            Dict[str, str]: etag and last_modified, None when the key is not in the cache or has no validators.
+        """
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._index.get(self.key(source, dataset_id, start_date, end_date))
+            return None if entry is None else entry.get('validators')
+
+    def set(self, content: bytes, source: str, dataset_id: str = None, start_date=None, end_date=None, validators: Dict[str, str] = None) -> str:
+        """
+        Saves the payload of a key and evicts the least recently used entries if the cache is full.
+
+        Args:
+            validators (Dict[str, str], optional): HTTP validators of the payload (etag and last_modified). Defaults to None.
+
+        Returns:
+            str: SHA-256 of the payload.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        if self.ttl <= 0:
+            return digest
+
+        key = self.key(source, dataset_id, start_date, end_date)
+        with self._lock:
+            os.makedirs(os.path.join(self.path, 'objects'), exist_ok=True)
+            if not os.path.isfile(self._object_path(digest)):
+                with open(self._object_path(digest), 'wb') as file:
+                    file.write(content)
+            now = time.time()
+            entry = {'object': digest, 'size': len(content), 'created': now, 'accessed': now}
+            if validators:
+                entry['validators'] = validators
+            self._retain(entry)
+            if key in self._index:
+                self._release(self._index[key])
+            self._index[key] = entry
+            self._evict()
+            self._save_index()
+        return digest
+
+    def _retain(self, entry: dict) -> None:
+        # Each payload is counted once even if several keys point to it
+        if self._references[entry['object']] == 0:
+            self._bytes += entry['size']
+        self._references[entry['object']] += 1
+
+    def _release(self, entry: dict) -> None:
+        # The payload is removed only when no other key points to it
+        self._references[entry['object']] -= 1
+        if self._references[entry['object']] == 0:
+            del self._references[entry['object']]
+            self._bytes -= entry['size']
+            if os.path.isfile(self._object_path(entry['object'])):
+                os.remove(self._object_path(entry['object']))
+
+    def _evict(self) -> None:
+        """
+        Removes the expired entries and then the least recently used ones until the size is under the limit. The
+        entries are only sorted by their last access when the cache is over the limit.
+        """
+        now = time.time()
+        for key in [key for key, entry in self._index.items() if now - entry['created'] > self.ttl]:
+            self._release(self._index.pop(key))
+            self.stats['expirations'] += 1
+
+        if self._bytes <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda key: self._index[key]['accessed']):
+            if self._bytes <= self.max_bytes:
+                break
+            self._release(self._index.pop(key))
+            self.stats['evictions'] += 1
+
+    def get_frame(self, source: str, dataset_id: str = None, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Returns the cached DataFrame of a key, stored as Parquet.
+
+        Returns:
+            pd.DataFrame: Cached data, None when the key is not in the cache.
+        """
+        content = self.get(source, dataset_id, start_date, end_date)
+        return None if content is None else pd.read_parquet(io.BytesIO(content))
+
+    def set_frame(self, data: pd.DataFrame, source: str, dataset_id: str = None, start_date=None, end_date=None) -> str:
+        """
+        Saves the DataFrame of a key as Parquet.
+
+        Returns:
+            str: SHA-256 of the payload.
+        """
+        if self.ttl <= 0:
+            return None
+        return self.set(data.to_parquet(index=False), source, dataset_id, start_date, end_date)
+
+    def report(self) -> Dict[str, float]:
+        """
+        Returns the statistics of the cache.
+
+        Returns:
+            Dict[str, float]: Hits, misses, evictions, expirations, hit ratio, number of entries and stored bytes.
+        """
+        with self._lock:
+            requests = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_ratio': self.stats['hits'] / requests if requests else 0.0,
+                'entries': len(self._index),
+                'bytes': self._bytes
+            }
+
+    def close(self) -> None:
+        """
+        Saves the access times of the hits that are only in memory.
+        """
+        with self._lock:
+            if self._pending_hits:
+                self._save_index()
+
+
+# Cache shared by all the data sources of the process
+_cache = None
+
+
+def get_cache() -> ResponseCache:
+    """
+    Returns the cache shared by the data sources, created on the first call.
+
+    Returns:
+        ResponseCache: Shared cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+        # The access times kept in memory are saved when the process ends
+        atexit.register(_cache.close)
+    return _cache
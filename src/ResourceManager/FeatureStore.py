@@ -0,0 +1,189 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# Default folder of the feature store, can be changed with an environment variable
+default_store_path = os.environ.get('FEATURE_STORE_PATH', os.path.join('Data', 'Features'))
+
+# Version of the layout of the tables
+store_version = 1
+
+
+class FeatureStore:
+    """
+    Out-of-core store of the features of the models, on top of the outputs of JoinData.
+
+    Each table is a folder with one NumPy file per column and a meta.json file. The rows are sorted by date and
+    entity (reservoir or region), so a point-in-time read is a binary search over the dates, and the columns are
+    opened memory-mapped, so the reads return views of the files without copying or loading the whole table.
+    The text and categorical columns are stored as integer codes with their categories in meta.json.
+
+    Attributes:
+        path (str): Folder of the store.
+
+    Methods:
+        write: Saves a DataFrame as a table.
+        tables: Returns the names of the tables.
+        meta: Returns the metadata of a table.
+        read: Returns memory-mapped NumPy views of a range of dates of a table.
+        read_frame: Returns a range of dates of a table as DataFrame.
+        split: Returns consecutive ranges of dates of a table (for example train, validation and test).
+    """
+
+    def __init__(self, path: str = default_store_path) -> None:
+        """
+        Initialize the FeatureStore object.
+
+        Args:
+            path (str, optional): Folder of the store. Defaults to 'Data/Features'.
+        """
+        self.path = path
+
+    def _table_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def write(self, name: str, data: pd.DataFrame, date: str = 'Fecha', entity: str = None) -> str:
+        """
+        Saves a DataFrame as a table, replacing the previous version.
+
+        Args:
+            name (str): Name of the table.
+            data (pd.DataFrame): Data with a datetime column.
+            date (str, optional): Date column of the index. Defaults to 'Fecha'.
+            entity (str, optional): Column of the entity of the index (CodigoEmbalse, RegionHidrologica). Defaults to None.
+
+        Returns:
+            str: Folder of the table.
+        """
+        keys = [date] if entity is None else [date, entity]
+        data = data.sort_values(keys, ignore_index=True, kind='stable')
+
+        # The table is written in a temporary folder and then replaces the previous version
+        table_path = self._table_path(name)
+        tmp_path = table_path + '.tmp'
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        columns = {}
+        for column in data.columns:
+            values = data[column]
+            categories = None
+            if isinstance(values.dtype, pd.CategoricalDtype) or not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+                values = values.astype('category')
+                categories = [str(category) for category in values.cat.categories]
+                values = values.cat.codes
+            array = values.to_numpy(dtype='datetime64[ns]' if pd.api.types.is_datetime64_any_dtype(values) else None)
+            np.save(os.path.join(tmp_path, f'{len(columns)}.npy'), array)
+            columns[column] = {'file': f'{len(columns)}.npy', 'dtype': str(array.dtype), 'categories': categories}
+
+        dates = data[date]
+        meta = {
+            'version': store_version,
+            'rows': len(data),
+            'date': date,
+            'entity': entity,
+            'start': None if dates.empty else str(dates.iloc[0]),
+            'end': None if dates.empty else str(dates.iloc[-1]),
+            'columns': columns
+        }
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False, indent=1)
+
+        if os.path.isdir(table_path):
+            shutil.rmtree(table_path)
+        os.replace(tmp_path, table_path)
+        return table_path
+
+    def tables(self) -> List[str]:
+        """
+        Returns the names of the tables of the store.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if os.path.isfile(os.path.join(self.path, name, 'meta.json')))
+
+    def meta(self, name: str) -> dict:
+        """
+        Returns the metadata of a table: rows, date and entity columns, range of dates and columns.
+        """
+        meta_path = os.path.join(self._table_path(name), 'meta.json')
+        if not os.path.isfile(meta_path):
+            raise ValueError(f"La tabla {name} no existe en el almacén de características {self.path}")
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _column(self, name: str, meta: dict, column: str) -> np.ndarray:
+        if column not in meta['columns']:
+            raise ValueError(f"La columna {column} no existe en la tabla {name}")
+        return np.load(os.path.join(self._table_path(name), meta['columns'][column]['file']), mmap_mode='r')
+
+    def _rows(self, name: str, meta: dict, start=None, end=None) -> slice:
+        """
+        Returns the rows of the dates between start and end (both included), with a binary search over the dates.
+        """
+        dates = self._column(name, meta, meta['date'])
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        last = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        return slice(int(first), int(last))
+
+    def read(self, name: str, start=None, end=None, columns: List[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns the rows of a range of dates as read-only memory-mapped NumPy views (no data is copied).
+
+        Args:
+            name (str): Name of the table.
+            start (optional): First date of the range (included). Defaults to None (first date of the table).
+            end (optional): Last date of the range (included), for example the date of a point-in-time read.
+                Defaults to None (last date of the table).
+            columns (List[str], optional): Columns to read. Defaults to None (all the columns).
+
+        Returns:
+            Dict[str, np.ndarray]: View of each column, the categorical columns as integer codes.
+        """
+        meta = self.meta(name)
+        rows = self._rows(name, meta, start, end)
+        return {column: self._column(name, meta, column)[rows] for column in (columns or list(meta['columns']))}
+
+    def read_frame(self, name: str, start=None, end=None, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Returns the rows of a range of dates as DataFrame, with the categorical columns decoded.
+
+        Args:
+            name (str): Name of the table.
+            start (optional): First date of the range (included). Defaults to None.
+            end (optional): Last date of the range (included). Defaults to None.
+            columns (List[str], optional): Columns to read. Defaults to None (all the columns).
+
+        Returns:
+            pd.DataFrame: Data of the range.
+        """
+        meta = self.meta(name)
+        data = {}
+        for column, values in self.read(name, start, end, columns).items():
+            categories = meta['columns'][column]['categories']
+            data[column] = values if categories is None else pd.Categorical.from_codes(values, categories=categories)
+        return pd.DataFrame(data, columns=list(data))
+
+    def split(self, name: str, boundaries: List, columns: List[str] = None) -> List[Dict[str, np.ndarray]]:
+        """
+        Returns consecutive ranges of dates of a table, each one starting at a boundary.
+
+        Args:
+            name (str): Name of the table.
+            boundaries (List): First date of each range after the first one, for example
+                [start of validation, start of test] returns the train, validation and test ranges.
+            columns (List[str], optional): Columns to read. Defaults to None (all the columns).
+
+        Returns:
+            List[Dict[str, np.ndarray]]: Views of the columns of each range.
+        """
+        meta = self.meta(name)
+        dates = self._column(name, meta, meta['date'])
+        cuts = [0] + [int(np.searchsorted(dates, np.datetime64(pd.Timestamp(boundary), 'ns'), side='left')) for boundary in boundaries] + [len(dates)]
+        columns = columns or list(meta['columns'])
+        arrays = {column: self._column(name, meta, column) for column in columns}
+        return [{column: values[first:last] for column, values in arrays.items()} for first, last in zip(cuts[:-1], cuts[1:])]
@@ -0,0 +1,183 @@
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List
+from src.ResourceManager.Cache import ResponseCache
+from src.ResourceManager.Profiler import annotate
+
+# Default seconds to wait for a response
+default_timeout = 60
+
+
+class HttpResponse:
+    """
+    Response of the HTTP client.
+
+    Attributes:
+        url (str): Requested URL.
+        content (bytes): Body of the response (the cached body when the server answers 304).
+        status_code (int): HTTP status code.
+        modified (bool): False when the server confirmed that the payload did not change since the last request.
+        validators (Dict[str, str]): ETag and Last-Modified of the payload (etag and last_modified), None when the
+            server sent neither.
+    """
+
+    def __init__(self, url: str, content: bytes, status_code: int, modified: bool, validators: Dict[str, str] = None) -> None:
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.modified = modified
+        self.validators = validators
+
+
+class HttpClient:
+    """
+    HTTP client shared by the data sources, with a pool of reusable connections and conditional requests.
+
+    The ETag and Last-Modified headers of each response are kept, so the next request to the same URL sends
+    If-None-Match/If-Modified-Since and the server can answer 304 without sending the payload again.
+
+    Attributes:
+        session (requests.Session): Session with the pool of connections.
+        timeout (float): Seconds to wait for a response.
+        pool_size (int): Maximum number of connections by host, also used as the number of concurrent requests.
+
+    Methods:
+        get: Makes a conditional GET request.
+        get_many: Makes concurrent conditional GET requests.
+        close: Closes the connections of the pool.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = default_timeout, retries: int = 3, backoff: float = 0.5) -> None:
+        """
+        Initialize the HttpClient object.
+
+        Args:
+            pool_size (int, optional): Maximum number of connections by host. Defaults to 10.
+            timeout (float, optional): Seconds to wait for a response. Defaults to 60.
+            retries (int, optional): Number of retries of failed requests. Defaults to 3.
+            backoff (float, optional): Backoff factor between retries. Defaults to 0.5.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, backoff_factor=backoff, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._validators: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, verify: bool = True, validators: Dict[str, str] = None, content: bytes = None) -> HttpResponse:
+        """
+        Makes a GET request, conditional when the URL has been requested before or validators are given.
+
+        Args:
+            url (str): URL to request.
+            verify (bool, optional): Verify the SSL certificate of the server. Defaults to True.
+            validators (Dict[str, str], optional): ETag and Last-Modified of a payload saved elsewhere (for example in
+                the response cache), used when this client has not requested the URL. Defaults to None.
+            content (bytes, optional): Payload of the validators, returned when the server answers 304. Defaults to None.
+
+        Returns:
+            HttpResponse: Response with the payload and whether it changed since the last request.
+        """
+        with self._lock:
+            cached = self._validators.get(url)
+        if cached is None and validators and content is not None:
+            cached = {**validators, 'content': content}
+
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout, verify=verify)
+        if response.status_code == 304 and cached:
+            return HttpResponse(url, cached['content'], response.status_code, modified=False,
+                                validators={'etag': cached['etag'], 'last_modified': cached['last_modified']})
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        validators = None
+        if etag or last_modified:
+            validators = {'etag': etag, 'last_modified': last_modified}
+            with self._lock:
+                self._validators[url] = {**validators, 'content': response.content}
+        return HttpResponse(url, response.content, response.status_code, modified=True, validators=validators)
+
+    def get_many(self, urls: List[str], verify: bool = True) -> List[HttpResponse]:
+        """
+        Makes concurrent GET requests reusing the connections of the pool. The requests run in a pool of threads over
+        the synchronous session, the few URLs of ONI and PARATEC do not need an event loop.
+
+        Args:
+            urls (List[str]): URLs to request.
+            verify (bool, optional): Verify the SSL certificate of the servers. Defaults to True.
+
+        Returns:
+            List[HttpResponse]: Responses in the same order of the URLs.
+        """
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(lambda url: self.get(url, verify=verify), urls))
+
+    def close(self) -> None:
+        """
+        Closes the connections of the pool.
+        """
+        self.session.close()
+
+
+def revalidate(client: HttpClient, cache: ResponseCache, source: str, url: str, verify: bool = True) -> HttpResponse:
+    """
+    Gets a URL with a conditional request that uses the validators saved with the cached payload, so a change in the
+    source is detected on every run (also within the TTL of the cache) and an unchanged payload is not downloaded
+    again. The cached payload is only used alone when the request fails (offline runs), recording the error in the
+    open span.
+
+    Args:
+        client (HttpClient): HTTP client.
+        cache (ResponseCache): Cache of the raw responses.
+        source (str): Name of the data source (key of the cache).
+        url (str): URL to request.
+        verify (bool, optional): Verify the SSL certificate of the server. Defaults to True.
+
+    Returns:
+        HttpResponse: Response with the payload, status_code None when it is the cached payload of an offline run.
+    """
+    content = cache.get(source, url)
+    try:
+        response = client.get(url, verify=verify, validators=cache.validators(source, url), content=content)
+    except requests.RequestException as e:
+        if content is None:
+            raise
+        annotate(offline=True, error=f'{type(e).__name__}: {e}')
+        return HttpResponse(url, content, None, modified=False)
+    if response.modified or content is None:
+        cache.set(response.content, source, url, validators=response.validators)
+    return response
+
+
+# Client shared by all the data sources of the process
+_client = None
+
+
+def get_client() -> HttpClient:
+    """
+    Returns the HTTP client shared by the data sources, created on the first call.
+
+    Returns:
+        HttpClient: Shared client.
+    """
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
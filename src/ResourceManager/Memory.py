@@ -0,0 +1,97 @@
+import os
+import sys
+from typing import Dict
+
+try:
+    import resource
+except ImportError:
+    # The resource module is only available on Unix
+    resource = None
+
+# Default maximum resident memory of the process in bytes, can be changed with an environment variable
+default_memory_limit = int(os.environ.get('TRANSFORM_MEMORY_LIMIT', 2 * 1024 ** 3))
+
+
+def current_rss() -> int:
+    """
+    Returns the resident memory of the process in bytes.
+
+    Returns:
+        int: Resident memory in bytes, 0 when it can not be read.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """
+    Returns the maximum resident memory used by the process in bytes.
+
+    Returns:
+        int: Peak resident memory in bytes, 0 when it can not be read.
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryMonitor:
+    """
+    Tracks the resident memory of the process between the steps of a process and stops it when the limit is exceeded.
+
+    Attributes:
+        limit (int): Maximum resident memory in bytes, None disables the limit.
+        max_rss (int): Maximum resident memory observed in the checks.
+        checks (int): Number of checks made.
+
+    Methods:
+        check: Measures the resident memory and raises MemoryError if it is over the limit.
+        report: Returns the memory used by the process.
+    """
+
+    def __init__(self, limit: int = default_memory_limit) -> None:
+        """
+        Initialize the MemoryMonitor object.
+
+        Args:
+            limit (int, optional): Maximum resident memory in bytes, None disables the limit. Defaults to 2 GiB.
+        """
+        self.limit = limit
+        self.max_rss = 0
+        self.checks = 0
+
+    def check(self, step: str) -> int:
+        """
+        Measures the resident memory of the process.
+
+        Args:
+            step (str): Name of the step, used in the error message.
+
+        Returns:
+            int: Resident memory in bytes.
+        """
+        rss = current_rss()
+        self.max_rss = max(self.max_rss, rss)
+        self.checks += 1
+        if self.limit is not None and rss > self.limit:
+            raise MemoryError(f"El proceso usa {rss} bytes de memoria en {step}, por encima del límite de {self.limit} bytes")
+        return rss
+
+    def report(self) -> Dict[str, int]:
+        """
+        Returns the memory used by the process.
+
+        Returns:
+            Dict[str, int]: Maximum resident memory of the checks, peak of the process, limit and number of checks.
+        """
+        return {
+            'max_rss': self.max_rss,
+            'peak_rss': peak_rss(),
+            'limit': self.limit,
+            'checks': self.checks
+        }
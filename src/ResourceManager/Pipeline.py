@@ -0,0 +1,307 @@
+import os
+import glob
+import json
+import logging
+import time
+import hashlib
+import threading
+import pandas as pd
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+from src.GetData.ONI import DataOni
+from src.GetData.PARATEC import DataPARATEC, history_file, load_snapshots
+from src.GetData.SIMEM import DataSIMEM
+from src.Analysis.TransformData import StreamJoinData
+from src.ResourceManager.Storage import default_format
+from src.ResourceManager.HttpClient import HttpClient
+from src.ResourceManager.Cache import ResponseCache
+from src.ResourceManager.Memory import default_memory_limit, peak_rss
+from src.ResourceManager.Profiler import enable_tracing
+
+# Logger of the pipeline, its messages reach the logs of the Azure Function
+logger = logging.getLogger(__name__)
+
+# Default settings of the pipeline of the Azure Function, can be changed with environment variables
+default_data_path = os.environ.get('PIPELINE_DATA_PATH', 'Data')
+pipeline_schedule = os.environ.get('PIPELINE_SCHEDULE', '0 0 6 * * *')
+
+# Stages of the pipeline, in the order they are run
+pipeline_stages = ['oni', 'paratec', 'simem', 'transform']
+
+# SIMEM data sets updated on each run, ListadoEmbalses (A0CF2A) is only loaded when it is missing
+daily_data_sets = ['B0E933', 'BA1C55']
+
+# Names of the files of the SIMEM data sets, as DataSIMEM saves them
+simem_files = {'B0E933': 'ReservasHidraulicasEnergía', 'A0CF2A': 'ListadoEmbalses', 'BA1C55': 'AportesHidricos'}
+
+# File with the digests of the reference data sets of the last run
+state_file = 'pipeline.json'
+
+
+def _frame_digest(df: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:16]
+
+
+class DataPipeline:
+    """
+    Pipeline of the Azure Function: updates ONI, PARATEC and SIMEM and writes the results of StreamJoinData.
+
+    The object is kept by the worker between invocations (get_pipeline), so the HTTP client, the cache, the
+    parsed ONI and PARATEC payloads and the join with its reference tables are reused while the worker is warm.
+    Each run only does incremental work: ONI and PARATEC are saved only when their content changed, SIMEM is
+    read from the last loaded date, and the results are rewritten from the first year with new data. All the
+    results are recomputed only when a reference data set (ONI, PARATEC or ListadoEmbalses) changed.
+
+    Attributes:
+        data_path (str): Relative path of the Data folder.
+        oni (DataOni): ONI data source.
+        paratec (DataPARATEC): PARATEC data source.
+        join (StreamJoinData): Join of the last run, None until the first transformation.
+        runs (int): Number of runs of the object.
+
+    Methods:
+        run: Runs the stages of the pipeline and returns the report of the run.
+    """
+
+    def __init__(self, data_path: str = default_data_path, simem_reader: type = None, client: HttpClient = None,
+                 cache: ResponseCache = None, memory_limit: int = default_memory_limit) -> None:
+        """
+        Initialize the DataPipeline object.
+
+        Args:
+            data_path (str, optional): Relative path of the Data folder. Defaults to the environment variable PIPELINE_DATA_PATH or 'Data'.
+            simem_reader (type, optional): Class used to read SIMEM, with the interface of pydatasimem.ReadSIMEM. Defaults to None (ReadSIMEM).
+            client (HttpClient, optional): HTTP client of ONI and PARATEC. Defaults to the shared client.
+            cache (ResponseCache, optional): Cache of the raw responses. Defaults to the shared cache.
+            memory_limit (int, optional): Maximum resident memory in bytes of the transformation. Defaults to TRANSFORM_MEMORY_LIMIT.
+        """
+        self.data_path = data_path
+        self.simem_reader = simem_reader
+        self.cache = cache
+        self.memory_limit = memory_limit
+        self.oni = DataOni(client, cache)
+        self.paratec = DataPARATEC(client, cache)
+        self.join = None
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.data_path, *parts)
+
+    def _read_state(self) -> Dict[str, str]:
+        path = self._path('Cleansed', state_file)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def _save_state(self, state: Dict[str, str]) -> None:
+        os.makedirs(self._path('Cleansed'), exist_ok=True)
+        with open(self._path('Cleansed', state_file), 'w') as file:
+            json.dump(state, file, indent=4)
+
+    @property
+    def oni_path(self) -> str:
+        return self._path('Cleansed', 'ONI', f'ONI_historico{default_format}')
+
+    @property
+    def paratec_path(self) -> str:
+        return self._path('Cleansed', 'PARATEC', history_file)
+
+    def _simem_path(self, data_id: str) -> str:
+        return self._path('Cleansed', 'SIMEM', f'{simem_files[data_id]}{default_format}')
+
+    def _run_oni(self, state: Dict[str, str]) -> dict:
+        """
+        Saves the ONI data when it changed since the last run or the file is missing.
+        """
+        self.oni.refresh()
+        data = self.oni.get_oni_data()
+        digest = _frame_digest(data)
+        changed = digest != state.get('oni') or not os.path.exists(self.oni_path)
+        if changed:
+            os.makedirs(os.path.dirname(self.oni_path), exist_ok=True)
+            if self.oni.save_oni_data(self.oni_path) is None:
+                raise OSError(f"No se pudieron guardar los datos de ONI en la ruta {self.oni_path}")
+            state['oni'] = digest
+        return {'changed': changed, 'rows': len(data)}
+
+    def _run_paratec(self, state: Dict[str, str]) -> dict:
+        """
+        Appends the reservoirs that changed to the history of PARATEC when the data changed since the last run or
+        there is no history, which is first built from the dated snapshots saved before it.
+        """
+        self.paratec.refresh()
+        data = self.paratec.get_paratec_data()
+        digest = _frame_digest(data)
+        missing = not os.path.exists(self.paratec_path)
+        if missing:
+            os.makedirs(os.path.dirname(self.paratec_path), exist_ok=True)
+            load_snapshots(glob.glob(self._path('Cleansed', 'PARATEC', 'PARATEC_*')), self.paratec_path)
+        if digest == state.get('paratec') and not missing:
+            return {'changed': False, 'rows': len(data), 'versions': 0}
+
+        versions = self.paratec.save_paratec_history(self.paratec_path, date.today())
+        if versions is None:
+            raise OSError(f"No se pudieron guardar los datos de PARATEC en la ruta {self.paratec_path}")
+        state['paratec'] = digest
+        return {'changed': missing or not versions.empty, 'rows': len(data), 'versions': len(versions)}
+
+    def _run_simem(self, end_date: date = None) -> dict:
+        """
+        Appends the SIMEM data after the last loaded date, and ListadoEmbalses when it has not been loaded.
+        """
+        data_sets = list(daily_data_sets)
+        embalses = not os.path.exists(self._simem_path('A0CF2A'))
+        if embalses:
+            data_sets.append('A0CF2A')
+
+        # A new object per run, the data of the previous run is not kept
+        simem = DataSIMEM(reader=self.simem_reader, cache=self.cache)
+        new_data = simem.update_simem_data(self.data_path, end_date=end_date, data_sets=data_sets)
+        self.simem_reader = simem.reader
+
+        dates = [pd.to_datetime(new_data[data_id]['Fecha']).min() for data_id in daily_data_sets
+                 if data_id in new_data and not new_data[data_id].empty]
+        return {
+            'changed': bool(dates) or embalses,
+            'embalses': embalses,
+            'rows': sum(len(data) for data in new_data.values()),
+            'since': min(dates).year if dates else None
+        }
+
+    def _run_transform(self, report: Dict[str, dict], full: bool = False) -> dict:
+        """
+        Writes the results from the first year with new SIMEM data, or all the years when a reference data set
+        changed, the results are missing or full is True. The join is rebuilt only when its references changed.
+        """
+        results_path = self._path('Results')
+        references = full or any(report.get(stage, {}).get('changed') for stage in ['oni', 'paratec']) \
+            or report.get('simem', {}).get('embalses', False)
+        missing = not os.path.exists(os.path.join(results_path, 'NotStandardized', f'EmbalsesAgregados{default_format}'))
+        simem = report.get('simem', {})
+
+        if not (references or missing or simem.get('changed')):
+            return {'changed': False, 'since': None}
+
+        if self.join is None or references:
+            self.join = StreamJoinData(self.oni_path, self.paratec_path, self._simem_path('B0E933'), self._simem_path('BA1C55'),
+                                       self._simem_path('A0CF2A'), memory_limit=self.memory_limit)
+        else:
+            # The reference tables are kept, only the regions of the new partitions are read
+            self.join._set_key_types()
+
+        since = None if references or missing else simem.get('since')
+        for stale in [False, True]:
+            self.join.save_data_not_agregate(stale=stale, results_path=results_path, since=since)
+            self.join.save_data_agregate(stale=stale, results_path=results_path, since=since)
+        return {'changed': True, 'since': since, 'unmatched': len(self.join.unmatched)}
+
+    def run(self, stages: List[str] = None, end_date: date = None) -> dict:
+        """
+        Runs the stages of the pipeline. Only one run at a time is allowed, a run requested while another one is
+        in progress returns the status 'running' without doing anything.
+
+        Args:
+            stages (List[str], optional): Stages to run ('oni', 'paratec', 'simem', 'transform'). Defaults to None (all the stages).
+                When 'transform' is requested without the other stages all the results are recomputed.
+            end_date (date, optional): End date of the SIMEM data. Defaults to today.
+
+        Returns:
+            dict: Report of the run with the status ('ok', 'error' or 'running'), the seconds, the peak resident memory,
+                the result of each stage and the path of the trace of the run (saved in Data/Traces).
+        """
+        stages = list(pipeline_stages) if stages is None else stages
+        unknown = [stage for stage in stages if stage not in pipeline_stages]
+        if unknown:
+            raise ValueError(f"Etapas desconocidas: {unknown}. Las etapas disponibles son {pipeline_stages}")
+
+        if not self._lock.acquire(blocking=False):
+            return {'status': 'running', 'runs': self.runs}
+
+        self.runs += 1
+        report = {'status': 'ok', 'runs': self.runs, 'started': datetime.now().isoformat(timespec='seconds'), 'stages': {}}
+        start = time.perf_counter()
+        tracer = enable_tracing()
+        try:
+            with tracer.span('pipeline.run', stages=stages):
+                state = self._read_state()
+                for stage in [stage for stage in pipeline_stages if stage in stages]:
+                    stage_start = time.perf_counter()
+                    with tracer.span(f'pipeline.{stage}'):
+                        if stage == 'oni':
+                            result = self._run_oni(state)
+                        elif stage == 'paratec':
+                            result = self._run_paratec(state)
+                        elif stage == 'simem':
+                            result = self._run_simem(end_date)
+                        else:
+                            result = self._run_transform(report['stages'], full=stages == ['transform'])
+                    report['stages'][stage] = {**result, 'seconds': time.perf_counter() - stage_start}
+                    self._save_state(state)
+        except Exception as e:
+            # The pipeline.run span is already marked as failed, the traceback goes to the log
+            logger.exception("Error en la ejecución del pipeline: %s", e)
+            report.update(status='error', error=f'{type(e).__name__}: {e}')
+        finally:
+            report['seconds'] = time.perf_counter() - start
+            report['peak_rss'] = peak_rss()
+            # The spans of the run are saved and dropped, so a warm worker does not accumulate them
+            if tracer.enabled:
+                report['trace'] = tracer.save(self._path('Traces'), run=f"{datetime.now():%Y%m%dT%H%M%S}_{self.runs}")
+                tracer.reset()
+            self._lock.release()
+        return report
+
+
+# Pipeline kept by the worker of the Azure Function between invocations
+_pipeline = None
+
+
+def get_pipeline() -> DataPipeline:
+    """
+    Returns the pipeline of the worker, created on the first invocation.
+
+    Returns:
+        DataPipeline: Shared pipeline.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = DataPipeline()
+    return _pipeline
+
+
+def handle_timer(past_due: bool = False, pipeline: DataPipeline = None) -> dict:
+    """
+    Body of the timer trigger, runs all the stages of the pipeline.
+
+    Args:
+        past_due (bool, optional): Whether the run is late (the worker was stopped at the scheduled time). Defaults to False.
+        pipeline (DataPipeline, optional): Pipeline to run. Defaults to the pipeline of the worker.
+
+    Returns:
+        dict: Report of the run.
+    """
+    if past_due:
+        logger.warning("La ejecución programada del pipeline está retrasada")
+    return (pipeline or get_pipeline()).run()
+
+
+def handle_request(stages: str = None, pipeline: DataPipeline = None) -> Tuple[int, str]:
+    """
+    Body of the HTTP trigger, runs the requested stages of the pipeline.
+
+    Args:
+        stages (str, optional): Stages separated by commas ('simem,transform'). Defaults to None (all the stages).
+        pipeline (DataPipeline, optional): Pipeline to run. Defaults to the pipeline of the worker.
+
+    Returns:
+        Tuple[int, str]: HTTP status code and JSON body with the report of the run.
+    """
+    try:
+        stages = [stage.strip() for stage in stages.split(',') if stage.strip()] if stages else None
+        report = (pipeline or get_pipeline()).run(stages)
+    except ValueError as e:
+        return 400, json.dumps({'status': 'error', 'error': str(e)})
+    status_code = {'ok': 200, 'running': 409}.get(report['status'], 500)
+    return status_code, json.dumps(report, default=str)
@@ -0,0 +1,443 @@
+import os
+import json
+import logging
+import time
+import shutil
+import signal
+import cProfile
+import itertools
+import threading
+import subprocess
+import pandas as pd
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List
+from src.ResourceManager.Memory import current_rss, peak_rss
+
+# Logger of the messages of the tracer
+logger = logging.getLogger(__name__)
+
+# Default settings of the tracer, can be changed with environment variables
+default_trace_path = os.environ.get('TRACE_PATH', os.path.join('Data', 'Traces'))
+
+# The tracing is off by default, so importing the modules (and the tests) records nothing and reads no memory. The
+# entry points (DataPipeline.run and the benchmarks) turn it on with enable_tracing unless TRACE_ENABLED is 0, and
+# with TRACE_ENABLED=1 it is on in every process
+trace_enabled = os.environ.get('TRACE_ENABLED') == '1'
+
+# Spans to profile ('all' or names separated by commas, for example 'join.regions,simem.fetch') and profiler
+# ('cprofile' or 'py-spy', py-spy must be installed and allowed to attach to the process)
+default_profile = os.environ.get('TRACE_PROFILE', '')
+default_profiler = os.environ.get('TRACE_PROFILER', 'cprofile')
+
+# Counters summed in each span: rows produced by the span, and rows and bytes read from and written to the storage
+counter_names = ['rows', 'rows_read', 'rows_written', 'bytes_read', 'bytes_written']
+
+# Maximum number of spans kept in memory, the oldest are dropped
+max_spans = int(os.environ.get('TRACE_MAX_SPANS', 100_000))
+
+# File with the summary of each saved run, used to track regressions
+history_file = 'history.jsonl'
+
+
+def data_size(path: str) -> int:
+    """
+    Returns the size in bytes of a file or of all the files of a folder (a partitioned data set).
+
+    Args:
+        path (str): Path of the file or folder.
+
+    Returns:
+        int: Size in bytes, 0 if the path does not exist.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, file)) for file in files)
+    return size
+
+
+class Span:
+    """
+    Timed section of the pipeline with its counters, resident memory and outcome.
+
+    Attributes:
+        name (str): Name of the span, by convention '<module>.<stage>' (for example 'join.regions').
+        id (int): Identifier of the span in the trace.
+        parent (int): Identifier of the enclosing span, None for a root span.
+        attributes (dict): Values that describe the span (data set, year, path...).
+        counters (Dict[str, int]): Rows produced and rows and bytes read and written, recorded in the span itself (not in its children).
+        seconds (float): Duration of the span.
+        rss (int): Resident memory at the end of the span.
+        peak_rss (int): Peak resident memory of the process at the end of the span.
+        status (str): 'ok' or 'error'.
+        error (str): Error raised or recorded in the span.
+    """
+
+    def __init__(self, name: str, id: int, parent: int = None, attributes: dict = None, measure: bool = True) -> None:
+        self.name = name
+        self.id = id
+        self.parent = parent
+        self.attributes = attributes or {}
+        self.counters = dict.fromkeys(counter_names, 0)
+        self.thread = threading.get_ident()
+        self.start = time.time()
+        self.seconds = None
+        self.rss_start = current_rss() if measure else None
+        self.rss = None
+        self.peak_rss = None
+        self.status = 'ok'
+        self.error = None
+        self._start = time.perf_counter()
+
+    def add(self, **counters: int) -> 'Span':
+        """
+        Adds to the counters of the span (see counter_names).
+        """
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+        return self
+
+    def set(self, **attributes) -> 'Span':
+        """
+        Sets attributes of the span.
+        """
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, error: BaseException) -> 'Span':
+        """
+        Marks the span as failed with the error.
+        """
+        self.status = 'error'
+        self.error = f'{type(error).__name__}: {error}'
+        return self
+
+    def finish(self) -> None:
+        self.seconds = time.perf_counter() - self._start
+        self.rss = current_rss()
+        self.peak_rss = peak_rss()
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name, 'id': self.id, 'parent': self.parent, 'thread': self.thread,
+            'start': self.start, 'seconds': self.seconds, 'rss_start': self.rss_start, 'rss': self.rss,
+            'peak_rss': self.peak_rss, 'status': self.status, 'error': self.error,
+            **self.counters, 'attributes': self.attributes
+        }
+
+
+class Tracer:
+    """
+    Collects the timing spans of the pipeline and saves them as JSON traces.
+
+    The spans are nested by thread, a span opened in a thread without open spans (the threads that read SIMEM)
+    is a child of the last span opened in the process, and the counters recorded in those threads are added to
+    it. The selected spans can be profiled with cProfile (a .prof file per span) or py-spy (a speedscope file).
+
+    Attributes:
+        enabled (bool): When False the spans are not recorded.
+        profile (List[str]): Names of the profiled spans, ['all'] to profile every root span.
+        profiler (str): 'cprofile' or 'py-spy'.
+        profile_path (str): Folder of the profiles.
+        spans (deque): Finished spans, the oldest are dropped after max_spans.
+
+    Methods:
+        span: Context manager that records a span.
+        current: Returns the innermost open span.
+        add: Adds counters to the innermost open span.
+        summary: Returns the time, counters and memory of the spans grouped by name.
+        save: Saves the trace and appends the summary to the history of runs.
+        reset: Drops the finished spans.
+    """
+
+    def __init__(self, enabled: bool = trace_enabled, profile: str = default_profile, profiler: str = default_profiler,
+                 profile_path: str = default_trace_path) -> None:
+        """
+        Initialize the Tracer object.
+
+        Args:
+            enabled (bool, optional): Whether the spans are recorded. Defaults to True when the environment variable TRACE_ENABLED is 1.
+            profile (str, optional): Names of the profiled spans separated by commas, 'all' for every root span. Defaults to TRACE_PROFILE or none.
+            profiler (str, optional): 'cprofile' or 'py-spy'. Defaults to TRACE_PROFILER or 'cprofile'.
+            profile_path (str, optional): Folder of the profiles. Defaults to TRACE_PATH or 'Data/Traces'.
+        """
+        if profiler not in ['cprofile', 'py-spy']:
+            raise ValueError(f"Perfilador desconocido: {profiler}. Los perfiladores disponibles son cprofile y py-spy")
+        self.enabled = enabled
+        self.profile = [name.strip() for name in profile.split(',') if name.strip()]
+        self.profiler = profiler
+        self.profile_path = profile_path
+        self.spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._open = []
+        self._lock = threading.Lock()
+        self._profiling = False
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> Span:
+        """
+        Returns the innermost open span of the thread, or the last span opened in the process.
+
+        Returns:
+            Span: Open span, None when there is none.
+        """
+        stack = self._stack()
+        if stack:
+            return stack[-1]
+        with self._lock:
+            return self._open[-1] if self._open else None
+
+    def add(self, **counters: int) -> None:
+        """
+        Adds counters (see counter_names) to the innermost open span.
+        """
+        if not self.enabled:
+            return
+        current = self.current()
+        if current is not None:
+            with self._lock:
+                current.add(**counters)
+
+    def _profiled(self, name: str, parent: int) -> bool:
+        return not self._profiling and (name in self.profile or ('all' in self.profile and parent is None))
+
+    @contextmanager
+    def _profile(self, name: str) -> Iterator[None]:
+        """
+        Profiles the code of the span with cProfile or py-spy, saving one file per span.
+        """
+        os.makedirs(self.profile_path, exist_ok=True)
+        file_name = os.path.join(self.profile_path, f"{name}_{datetime.now():%Y%m%dT%H%M%S}")
+        self._profiling = True
+        try:
+            if self.profiler == 'py-spy' and shutil.which('py-spy'):
+                process = subprocess.Popen(['py-spy', 'record', '--pid', str(os.getpid()), '--format', 'speedscope',
+                                            '--output', f'{file_name}.speedscope.json'],
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                try:
+                    yield
+                finally:
+                    # py-spy writes the profile when it is interrupted
+                    process.send_signal(signal.SIGINT)
+                    process.wait(timeout=30)
+            else:
+                if self.profiler == 'py-spy':
+                    logger.warning("py-spy no está instalado, se usa cProfile")
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(f'{file_name}.prof')
+        finally:
+            self._profiling = False
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Records the time, counters and memory of a block of code. An exception raised in the block marks the span
+        as failed and is raised again.
+
+        Args:
+            name (str): Name of the span.
+            **attributes: Values that describe the span.
+
+        Returns:
+            Iterator[Span]: The open span, to add counters or attributes.
+        """
+        if not self.enabled:
+            # The span is not recorded, so the resident memory is not read
+            yield Span(name, 0, attributes=attributes, measure=False)
+            return
+
+        parent = self.current()
+        current = Span(name, next(self._ids), parent.id if parent else None, attributes)
+        stack = self._stack()
+        stack.append(current)
+        with self._lock:
+            self._open.append(current)
+        try:
+            if self._profiled(name, current.parent):
+                with self._profile(name):
+                    yield current
+            else:
+                yield current
+        except BaseException as e:
+            current.fail(e)
+            raise
+        finally:
+            current.finish()
+            stack.pop()
+            with self._lock:
+                self._open.remove(current)
+                self.spans.append(current)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns the spans grouped by name, in the order they were first opened.
+
+        Returns:
+            pd.DataFrame: Calls, total, mean and maximum seconds, counters, maximum resident and peak memory and
+                errors of each name.
+        """
+        columns = ['name', 'calls', 'seconds', 'mean_seconds', 'max_seconds', *counter_names, 'rss', 'peak_rss', 'errors']
+        if not self.spans:
+            return pd.DataFrame(columns=columns)
+        spans = pd.DataFrame([span.to_dict() for span in self.spans]).sort_values('start', kind='stable')
+        summary = spans.groupby('name', sort=False).agg(
+            calls=('id', 'size'), seconds=('seconds', 'sum'), mean_seconds=('seconds', 'mean'), max_seconds=('seconds', 'max'),
+            **{name: (name, 'sum') for name in counter_names}, rss=('rss', 'max'), peak_rss=('peak_rss', 'max'),
+            errors=('status', lambda status: int((status == 'error').sum())))
+        return summary.reset_index()[columns]
+
+    def save(self, path: str = default_trace_path, run: str = None) -> str:
+        """
+        Saves the spans as a JSON trace in the Trace Event format (it can be opened in chrome://tracing or
+        https://ui.perfetto.dev) and appends the summary of the run to the history of runs of the folder.
+
+        Args:
+            path (str, optional): Folder of the traces. Defaults to the environment variable TRACE_PATH or 'Data/Traces'.
+            run (str, optional): Name of the run. Defaults to the current date and time.
+
+        Returns:
+            str: Path of the trace.
+        """
+        run = run or datetime.now().strftime('%Y%m%dT%H%M%S')
+        os.makedirs(path, exist_ok=True)
+        spans = [span.to_dict() for span in self.spans]
+        events = [{
+            'name': span['name'], 'cat': span['name'].split('.')[0], 'ph': 'X', 'pid': os.getpid(), 'tid': span['thread'],
+            'ts': span['start'] * 1e6, 'dur': span['seconds'] * 1e6,
+            'args': {**span['attributes'], **{name: span[name] for name in counter_names},
+                     'rss': span['rss'], 'peak_rss': span['peak_rss'], 'status': span['status'], 'error': span['error']}
+        } for span in spans]
+
+        trace_path = os.path.join(path, f'trace_{run}.json')
+        with open(trace_path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'otherData': {'run': run}, 'spans': spans}, file, default=str)
+        with open(os.path.join(path, history_file), 'a', encoding='utf-8') as file:
+            for record in self.summary().to_dict(orient='records'):
+                file.write(json.dumps({'run': run, **record}, default=str) + '\n')
+        return trace_path
+
+    def reset(self) -> None:
+        """
+        Drops the finished spans.
+        """
+        with self._lock:
+            self.spans.clear()
+
+
+def read_history(path: str = default_trace_path) -> pd.DataFrame:
+    """
+    Reads the summaries of the runs saved in a folder of traces.
+
+    Args:
+        path (str, optional): Folder of the traces. Defaults to the environment variable TRACE_PATH or 'Data/Traces'.
+
+    Returns:
+        pd.DataFrame: One row per run and span name with the columns of Tracer.summary and run.
+    """
+    file_path = os.path.join(path, history_file)
+    if not os.path.isfile(file_path):
+        return pd.DataFrame(columns=['run', 'name', 'calls', 'seconds'])
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return pd.DataFrame([json.loads(line) for line in file if line.strip()])
+
+
+def find_regressions(history: pd.DataFrame, tolerance: float = 0.2, runs: int = 5, min_seconds: float = 0.01) -> pd.DataFrame:
+    """
+    Compares the seconds of each span of the last run against the median of the previous runs.
+
+    Args:
+        history (pd.DataFrame): Result of read_history.
+        tolerance (float, optional): Fraction slower than the median that is a regression. Defaults to 0.2.
+        runs (int, optional): Number of previous runs of the median. Defaults to 5.
+        min_seconds (float, optional): Spans faster than this in the last run are not regressions, their time is
+            mostly noise. Defaults to 0.01.
+
+    Returns:
+        pd.DataFrame: name, seconds of the last run, median of the previous runs, ratio and regression flag.
+    """
+    names = list(dict.fromkeys(history['run']))
+    if len(names) < 2:
+        return pd.DataFrame(columns=['name', 'seconds', 'baseline', 'ratio', 'regression'])
+    last = history[history['run'] == names[-1]].set_index('name')['seconds']
+    baseline = history[history['run'].isin(names[-runs - 1:-1])].groupby('name')['seconds'].median()
+    result = pd.DataFrame({'seconds': last, 'baseline': baseline.reindex(last.index)})
+    result['ratio'] = result['seconds'] / result['baseline']
+    result['regression'] = (result['ratio'] > 1 + tolerance) & (result['seconds'] >= min_seconds)
+    return result.reset_index().rename(columns={'index': 'name'})
+
+
+# Tracer shared by all the modules of the process
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the tracer shared by the modules of the process, created on the first call.
+
+    Returns:
+        Tracer: Shared tracer.
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def enable_tracing(enabled: bool = None) -> Tracer:
+    """
+    Turns the shared tracer on or off, called by the entry points of the pipeline and the benchmarks.
+
+    Args:
+        enabled (bool, optional): Whether the spans are recorded. Defaults to True unless the environment variable TRACE_ENABLED is 0.
+
+    Returns:
+        Tracer: Shared tracer.
+    """
+    tracer = get_tracer()
+    tracer.enabled = os.environ.get('TRACE_ENABLED', '1') != '0' if enabled is None else enabled
+    return tracer
+
+
+def span(name: str, **attributes):
+    """
+    Records a span in the shared tracer (see Tracer.span).
+    """
+    return get_tracer().span(name, **attributes)
+
+
+def record(**counters: int) -> None:
+    """
+    Adds counters (see counter_names) to the innermost open span of the shared tracer.
+    """
+    get_tracer().add(**counters)
+
+
+def annotate(**attributes) -> None:
+    """
+    Sets attributes of the innermost open span of the shared tracer.
+    """
+    current = get_tracer().current()
+    if current is not None:
+        current.set(**attributes)
+
+
+def record_error(error: BaseException) -> None:
+    """
+    Marks the innermost open span of the shared tracer as failed, for the errors that are handled.
+    """
+    current = get_tracer().current()
+    if current is not None:
+        current.fail(error)
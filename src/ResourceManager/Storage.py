@@ -0,0 +1,439 @@
+import os
+import shutil
+import zipfile
+import pandas as pd
+from typing import Dict, List
+from src.ResourceManager.Profiler import record, data_size
+
+# Default file format for every stage of Data/ (Raw, Cleansed and Results)
+default_format = '.parquet'
+
+# Typed schemas applied before writing, keyed by the name of the data set. The codes and regions of the SIMEM data
+# sets are categoricals as in the compact types of SIMEM (simem_schemas) and their energies are not cast, so they
+# keep the type given by compact_frame (float32 only when the downcast is exact)
+schemas = {
+    'ReservasHidraulicasEnergía': {
+        'Fecha': 'datetime64[ns]',
+        'CodigoEmbalse': 'category',
+        'RegionHidrologica': 'category'
+    },
+    'AportesHidricos': {
+        'Fecha': 'datetime64[ns]',
+        'CodigoSerieHidrologica': 'category',
+        'RegionHidrologica': 'category'
+    },
+    'ListadoEmbalses': {
+        'CodigoEmbalse': 'category',
+        'NombreEmbalse': 'category'
+    },
+    'ONI_historico': {
+        'Date': 'datetime64[ns]',
+        'SST': 'float64',
+        'ANOM': 'float64'
+    },
+    'PARATEC_historico': {
+        'reservoir': 'string',
+        'latitude': 'float64',
+        'longitude': 'float64',
+        'valid_from': 'datetime64[ns]',
+        'valid_to': 'datetime64[ns]'
+    },
+    'PARATEC': {
+        'reservoir': 'string',
+        'latitude': 'float64',
+        'longitude': 'float64'
+    }
+}
+
+
+class DataStorage:
+    """
+    Base class for the storage backends of the Data/ stages.
+
+    Attributes:
+        extension (str): File extension handled by the backend.
+
+    Methods:
+        write: Writes a DataFrame in the given path.
+        read: Reads a DataFrame from the given path.
+        append: Appends a DataFrame to the data set of the given path removing duplicates.
+        partitions: Returns the years of the data set of the given path.
+        read_partition: Reads the rows of one year of the data set of the given path.
+        write_partition: Writes the rows of one year of the data set of the given path.
+        remove: Removes the data set of the given path.
+    """
+
+    extension = None
+
+    def write(self, data: pd.DataFrame, path: str, partition_on: str = None) -> str:
+        raise NotImplementedError
+
+    def read(self, path: str, columns: List[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """
+        Removes the previous version of the data set (file or folder of partitions).
+        """
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.isfile(path):
+            os.remove(path)
+
+    def write_partition(self, data: pd.DataFrame, path: str, partition: int) -> str:
+        raise ValueError(f"El formato de la ruta {path} no admite escritura por particiones")
+
+    def partitions(self, path: str, partition_on: str) -> List[int]:
+        """
+        Returns the years with data of the data set.
+
+        Args:
+            path (str): Path of the data set.
+            partition_on (str): Date column of the partitions.
+
+        Returns:
+            List[int]: Sorted years of the data set.
+        """
+        years = pd.to_datetime(self.read(path, columns=[partition_on])[partition_on]).dt.year
+        return sorted(years.dropna().unique().tolist())
+
+    def read_partition(self, path: str, partition: int, partition_on: str, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Reads the rows of one year of the data set. The base implementation reads the whole data set.
+
+        Args:
+            path (str): Path of the data set.
+            partition (int): Year to read.
+            partition_on (str): Date column of the partitions.
+            columns (List[str], optional): Columns to load. Defaults to None (all the columns).
+
+        Returns:
+            pd.DataFrame: Rows of the year.
+        """
+        data = self.read(path, columns=None if columns is None else list(dict.fromkeys(columns + [partition_on])))
+        data = data[pd.to_datetime(data[partition_on]).dt.year == partition].reset_index(drop=True)
+        return data if columns is None else data[columns]
+
+    def append(self, data: pd.DataFrame, path: str, key: List[str], partition_on: str = None, schema: str = None) -> str:
+        """
+        Appends the data to the stored data set, keeping the new rows when the key is duplicated.
+
+        Args:
+            data (pd.DataFrame): New data.
+            path (str): Path of the data set.
+            key (List[str]): Natural key of the rows of the data set.
+            partition_on (str, optional): Date column used to partition the data by year. Defaults to None.
+            schema (str, optional): Name of the typed schema applied to the stored and new rows together. Defaults to None.
+
+        Returns:
+            str: Path where the data was saved.
+        """
+        if os.path.exists(path):
+            data = pd.concat([self.read(path), data], ignore_index=True)
+            # The categoricals with different categories are concatenated as strings
+            data = apply_schema(data, schema)
+        data = data.drop_duplicates(subset=key, keep='last')
+        return self.write(data, path, partition_on=partition_on)
+
+
+class ParquetStorage(DataStorage):
+    """
+    Columnar storage backend based on Parquet files.
+
+    When a date column is given to partition the data, the path is a folder with one file per year
+    (for example ReservasHidraulicasEnergía.parquet/2013.parquet), otherwise it is a single file.
+    """
+
+    extension = '.parquet'
+
+    def write(self, data: pd.DataFrame, path: str, partition_on: str = None) -> str:
+        """
+        Writes the data as Parquet.
+
+        Args:
+            data (pd.DataFrame): Data to save.
+            path (str): Path of the file or folder of the data set.
+            partition_on (str, optional): Date column used to split the data in one file per year. Defaults to None.
+
+        Returns:
+            str: Path where the data was saved.
+        """
+        self.remove(path)
+
+        if partition_on is None:
+            data.to_parquet(path, index=False)
+            return path
+
+        os.makedirs(path)
+        years = pd.to_datetime(data[partition_on]).dt.year
+        for year, partition in data.groupby(years, sort=True):
+            partition.to_parquet(os.path.join(path, f'{year}.parquet'), index=False)
+        return path
+
+    def append(self, data: pd.DataFrame, path: str, key: List[str], partition_on: str = None, schema: str = None) -> str:
+        """
+        Appends the data to the stored data set. When the data set is partitioned only the yearly files
+        with new rows are read and rewritten.
+        """
+        if partition_on is None or not os.path.isdir(path):
+            return super().append(data, path, key, partition_on=partition_on, schema=schema)
+
+        years = pd.to_datetime(data[partition_on]).dt.year
+        for year, partition in data.groupby(years, sort=True):
+            partition_path = os.path.join(path, f'{year}.parquet')
+            if os.path.isfile(partition_path):
+                partition = apply_schema(pd.concat([pd.read_parquet(partition_path), partition], ignore_index=True), schema)
+            partition = partition.drop_duplicates(subset=key, keep='last')
+            partition.to_parquet(partition_path, index=False)
+        return path
+
+    def write_partition(self, data: pd.DataFrame, path: str, partition: int) -> str:
+        """
+        Writes the rows of one year in the folder of the data set, replacing the file of that year.
+
+        Args:
+            data (pd.DataFrame): Rows of the year.
+            path (str): Path of the folder of the data set.
+            partition (int): Year of the rows.
+
+        Returns:
+            str: Path of the file of the year.
+        """
+        os.makedirs(path, exist_ok=True)
+        partition_path = os.path.join(path, f'{partition}.parquet')
+        data.to_parquet(partition_path, index=False)
+        return partition_path
+
+    def partitions(self, path: str, partition_on: str) -> List[int]:
+        """
+        Returns the years with data of the data set, from the file names when it is partitioned.
+        """
+        if os.path.isdir(path):
+            return sorted(int(os.path.splitext(file)[0]) for file in os.listdir(path) if file.endswith(self.extension))
+        return super().partitions(path, partition_on)
+
+    def read_partition(self, path: str, partition: int, partition_on: str, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Reads the rows of one year, only the file of the year when the data set is partitioned and with a
+        filter pushed down to the row groups when it is a single file.
+        """
+        if os.path.isdir(path):
+            partition_path = os.path.join(path, f'{partition}.parquet')
+            if not os.path.isfile(partition_path):
+                return pd.DataFrame(columns=columns)
+            return pd.read_parquet(partition_path, columns=columns)
+        filters = [(partition_on, '>=', pd.Timestamp(partition, 1, 1)), (partition_on, '<', pd.Timestamp(partition + 1, 1, 1))]
+        return pd.read_parquet(path, columns=columns, filters=filters)
+
+    def read(self, path: str, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Reads a Parquet file or a folder of Parquet partitions.
+
+        Args:
+            path (str): Path of the file or folder of the data set.
+            columns (List[str], optional): Columns to load. Defaults to None (all the columns).
+
+        Returns:
+            pd.DataFrame: Data read.
+        """
+        return pd.read_parquet(path, columns=columns)
+
+
+class ExcelStorage(DataStorage):
+    """
+    Excel storage backend, kept as an export option.
+    """
+
+    extension = '.xlsx'
+
+    def write(self, data: pd.DataFrame, path: str, partition_on: str = None) -> str:
+        data.to_excel(path, index=False)
+        return path
+
+    def read(self, path: str, columns: List[str] = None) -> pd.DataFrame:
+        return pd.read_excel(path, usecols=columns)
+
+
+# Available backends by file extension
+storage_backends: Dict[str, DataStorage] = {
+    ParquetStorage.extension: ParquetStorage(),
+    ExcelStorage.extension: ExcelStorage()
+}
+
+
+def get_storage(path: str) -> DataStorage:
+    """
+    Returns the storage backend for a path based on its extension.
+
+    Args:
+        path (str): Path of the data set.
+
+    Returns:
+        DataStorage: Backend to read and write the path.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in storage_backends:
+        raise ValueError(f"No hay un formato de almacenamiento para la ruta {path}")
+    return storage_backends[extension]
+
+
+def apply_schema(data: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Casts the columns of the data with the typed schema of the data set.
+
+    Args:
+        data (pd.DataFrame): Data to cast.
+        name (str): Name of the data set (key of schemas), None to keep the types.
+
+    Returns:
+        pd.DataFrame: Data with the schema types.
+    """
+    schema = schemas.get(name, {})
+    return data.astype({column: dtype for column, dtype in schema.items() if column in data.columns})
+
+
+def write_data(data: pd.DataFrame, path: str, partition_on: str = None, schema: str = None) -> str:
+    """
+    Writes the data in the path using the backend of its extension.
+
+    Args:
+        data (pd.DataFrame): Data to save.
+        path (str): Path of the data set.
+        partition_on (str, optional): Date column used to partition the data by year. Defaults to None.
+        schema (str, optional): Name of the typed schema to apply. Defaults to None.
+
+    Returns:
+        str: Path where the data was saved.
+    """
+    if schema is not None:
+        data = apply_schema(data, schema)
+    path = get_storage(path).write(data, path, partition_on=partition_on)
+    record(rows_written=len(data), bytes_written=data_size(path))
+    return path
+
+
+def append_data(data: pd.DataFrame, path: str, key: List[str], partition_on: str = None, schema: str = None) -> str:
+    """
+    Appends the data to the data set of the path removing the duplicates of the natural key.
+
+    Args:
+        data (pd.DataFrame): New data.
+        path (str): Path of the data set.
+        key (List[str]): Natural key of the rows of the data set.
+        partition_on (str, optional): Date column used to partition the data by year. Defaults to None.
+        schema (str, optional): Name of the typed schema to apply. Defaults to None.
+
+    Returns:
+        str: Path where the data was saved.
+    """
+    if schema is not None:
+        data = apply_schema(data, schema)
+    path = get_storage(path).append(data, path, key, partition_on=partition_on, schema=schema)
+    record(rows_written=len(data), bytes_written=data_size(path))
+    return path
+
+
+def read_data(path: str, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Reads the data from the path using the backend of its extension.
+
+    Args:
+        path (str): Path of the data set.
+        columns (List[str], optional): Columns to load. Defaults to None (all the columns).
+
+    Returns:
+        pd.DataFrame: Data read.
+    """
+    data = get_storage(path).read(path, columns=columns)
+    record(rows_read=len(data), bytes_read=data_size(path))
+    return data
+
+
+def read_partitions(path: str, partition_on: str = 'Fecha') -> List[int]:
+    """
+    Returns the years with data of the data set of the path.
+
+    Args:
+        path (str): Path of the data set.
+        partition_on (str, optional): Date column of the partitions. Defaults to 'Fecha'.
+
+    Returns:
+        List[int]: Sorted years of the data set.
+    """
+    return get_storage(path).partitions(path, partition_on)
+
+
+def read_partition(path: str, partition: int, partition_on: str = 'Fecha', columns: List[str] = None) -> pd.DataFrame:
+    """
+    Reads the rows of one year of the data set of the path.
+
+    Args:
+        path (str): Path of the data set.
+        partition (int): Year to read.
+        partition_on (str, optional): Date column of the partitions. Defaults to 'Fecha'.
+        columns (List[str], optional): Columns to load. Defaults to None (all the columns).
+
+    Returns:
+        pd.DataFrame: Rows of the year.
+    """
+    data = get_storage(path).read_partition(path, partition, partition_on, columns=columns)
+    partition_path = os.path.join(path, f'{partition}{os.path.splitext(path)[1]}')
+    record(rows_read=len(data), bytes_read=data_size(partition_path if os.path.isdir(path) else path))
+    return data
+
+
+def remove_data(path: str) -> None:
+    """
+    Removes the data set of the path, used before writing a data set by partitions.
+
+    Args:
+        path (str): Path of the data set.
+    """
+    get_storage(path).remove(path)
+
+
+def write_partition(data: pd.DataFrame, path: str, partition: int) -> str:
+    """
+    Writes the rows of one year in the data set of the path, so big results can be saved by parts.
+
+    Args:
+        data (pd.DataFrame): Rows of the year.
+        path (str): Path of the data set.
+        partition (int): Year of the rows.
+
+    Returns:
+        str: Path where the data was saved.
+    """
+    partition_path = get_storage(path).write_partition(data, path, partition)
+    record(rows_written=len(data), bytes_written=data_size(partition_path))
+    return partition_path
+
+
+def export_excel(path: str, excel_path: str, columns: List[str] = None) -> str:
+    """
+    Exports a stored data set to an Excel file.
+
+    Args:
+        path (str): Path of the stored data set.
+        excel_path (str): Path of the Excel file.
+        columns (List[str], optional): Columns to export. Defaults to None (all the columns).
+
+    Returns:
+        str: Path of the Excel file.
+    """
+    return write_data(read_data(path, columns=columns), excel_path)
+
+
+if __name__ == '__main__':
+    # Migrating the Excel files of Data/ to Parquet
+    for root, _, files in os.walk('Data'):
+        for file in files:
+            name, extension = os.path.splitext(file)
+            # Raw PARATEC payloads were saved as JSON with the .xlsx extension
+            if extension != ExcelStorage.extension or not zipfile.is_zipfile(os.path.join(root, file)):
+                continue
+            data = read_data(os.path.join(root, file))
+            partition_on = 'Fecha' if 'Fecha' in data.columns else None
+            schema = next((key for key in schemas if name.startswith(key)), None)
+            write_data(data, os.path.join(root, name + default_format), partition_on=partition_on, schema=schema)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.Analysis import Aggregate
+from src.Analysis.Aggregate import aggregate
+
+spec = {'value': 'mean', 'total': 'sum', 'peak': 'max'}
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Fecha': pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, 2000), unit='D'),
+        'RegionHidrologica': pd.Categorical(rng.choice(['Antioquia', 'Caribe', 'Centro'], 2000)),
+        'value': rng.random(2000), 'total': rng.random(2000), 'peak': rng.random(2000)
+    })
+
+
+@pytest.mark.parametrize('engine', ['process', 'arrow'])
+def test_engines_match_pandas(df, engine, monkeypatch):
+    # The pool is used even on one CPU, so the chunked aggregation is compared
+    monkeypatch.setattr(Aggregate.os, 'cpu_count', lambda: 2)
+    monkeypatch.setattr(Aggregate, 'process_min_rows', 0)
+    keys = ['Fecha', 'RegionHidrologica']
+    expected = aggregate(df, keys, spec, 'pandas')
+    result = aggregate(df, keys, spec, engine, max_workers=2)
+
+    assert result[keys].equals(expected[keys])
+    np.testing.assert_allclose(result[list(spec)], expected[list(spec)], rtol=1e-12)
+
+
+@pytest.mark.parametrize('cpus, rows', [(1, 0), (4, 10 ** 9)])
+def test_process_falls_back_to_pandas(df, cpus, rows, monkeypatch):
+    # With one CPU or less rows than process_min_rows no pool is created
+    monkeypatch.setattr(Aggregate.os, 'cpu_count', lambda: cpus)
+    monkeypatch.setattr(Aggregate, 'process_min_rows', rows)
+    monkeypatch.setattr(Aggregate, 'ProcessPoolExecutor', None)
+    keys = ['Fecha', 'RegionHidrologica']
+
+    assert aggregate(df, keys, spec, 'process', max_workers=4).equals(aggregate(df, keys, spec, 'pandas'))
+
+
+def test_unknown_engine(df):
+    with pytest.raises(ValueError, match='no existe'):
+        aggregate(df, ['Fecha'], spec, 'spark')
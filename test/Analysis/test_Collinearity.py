@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.Analysis.Collinearity import vif, prune_vif
+
+
+@pytest.fixture
+def X():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 4)) + [5, 1, 0, 3], columns=['a', 'b', 'c', 'd'])
+    X['d'] += 0.5 * X['a'] + X['b']
+    return X
+
+
+def regression_vif(X: pd.DataFrame, intercept: bool) -> np.ndarray:
+    # One OLS of each column on the others, with the R2 of the same form (centered with intercept)
+    values = X.to_numpy(dtype='float64')
+    if intercept:
+        values = values - values.mean(axis=0)
+    result = []
+    for i in range(values.shape[1]):
+        others = np.delete(values, i, axis=1)
+        residuals = values[:, i] - others @ np.linalg.lstsq(others, values[:, i], rcond=None)[0]
+        result.append(values[:, i] @ values[:, i] / (residuals @ residuals))
+    return np.array(result)
+
+
+@pytest.mark.parametrize('center', [True, False])
+def test_vif_matches_regressions(X, center):
+    np.testing.assert_allclose(vif(X, center=center), regression_vif(X, intercept=center), rtol=1e-9)
+
+
+def test_vif_default_matches_statsmodels(X):
+    outliers_influence = pytest.importorskip('statsmodels.stats.outliers_influence')
+    expected = [outliers_influence.variance_inflation_factor(X.to_numpy(), i) for i in range(X.shape[1])]
+    np.testing.assert_allclose(vif(X), expected, rtol=1e-9)
+
+
+def test_prune_vif_keeps_columns_below_threshold(X):
+    X = X.assign(e=X['a'] + X['c'])
+    columns, removed = prune_vif(X, threshold=5)
+    assert list(removed['Features']) == ['a']
+    assert (vif(X[columns]) <= 5).all()
@@ -0,0 +1,98 @@
+import os
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from src.ResourceManager.Storage import append_data, read_partitions, read_partition, read_data, write_data
+from src.GetData.PARATEC import read_history, diff_snapshot, history_key
+from src.Analysis.LazyPlan import plan_outputs
+from src.Analysis.TransformData import JoinData, StreamJoinData
+from test.synthetic import write_data_sets, load_join_data, paratec_reservoirs, cleansed_paths, start_date
+
+pytest.importorskip('polars')
+
+# Relative tolerance of the aggregated stages: the sums of pandas are compensated (Kahan) and those of polars are
+# not, so the sums and means can differ in the last digits. The other stages must be equal.
+aggregated_rtol = 1e-12
+aggregated_stages = {'regions', 'agregate'}
+
+reservoirs, years = 5, 3
+
+
+def assert_parity(expected: pd.DataFrame, result: pd.DataFrame, rtol: float = 0.0) -> None:
+    """
+    Checks that a result of the polars backend has the columns, dtypes, index and values of the pandas one, the
+    float values within rtol.
+    """
+    if not rtol:
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        return
+    floats = list(expected.select_dtypes('float').columns)
+    pd.testing.assert_frame_equal(result.drop(columns=floats), expected.drop(columns=floats), check_exact=True)
+    assert list(result.columns) == list(expected.columns) and result.dtypes.equals(expected.dtypes)
+    np.testing.assert_allclose(result[floats].to_numpy('float64'), expected[floats].to_numpy('float64'), rtol=rtol, atol=0)
+
+
+def assert_stages(arguments: list, rtol: float = aggregated_rtol) -> None:
+    joins = {backend: JoinData(*arguments, backend=backend) for backend in ['pandas', 'polars']}
+    for stage in plan_outputs:
+        assert_parity(joins['pandas'].get_stage(stage), joins['polars'].get_stage(stage), rtol if stage in aggregated_stages else 0.0)
+    assert joins['polars'].unmatched == joins['pandas'].unmatched
+
+
+def add_paratec_version(paths: dict, as_of: datetime.date, moved: int = 3) -> None:
+    # A version of PARATEC that moves the first reservoirs, so the coordinates are joined by date
+    data = paratec_reservoirs(reservoirs)
+    data.loc[:moved - 1, 'latitude'] += 0.5
+    append_data(diff_snapshot(read_history(paths['paratec']), data, as_of), paths['paratec'], history_key, schema='PARATEC_historico')
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return write_data_sets(str(tmp_path / 'Data'), reservoirs, years)
+
+
+def test_snapshot(paths):
+    assert_stages(list(paths.values()))
+
+
+def test_history(paths):
+    add_paratec_version(paths, start_date.replace(year=start_date.year + years // 2))
+    assert_stages(list(paths.values()))
+
+
+@pytest.mark.parametrize('history', [False, True])
+def test_compact_types(paths, history):
+    # float32 energies (as compact_frame saves them) and string keys, the means of float32 are float32 in pandas
+    for name in ['reservas', 'aportes']:
+        data = read_data(paths[name])
+        floats = data.select_dtypes('float64').columns
+        write_data(data.astype({column: 'float32' for column in floats} | {'RegionHidrologica': 'str'}), paths[name])
+    if history:
+        add_paratec_version(paths, start_date.replace(year=start_date.year + years // 2))
+    assert_stages(list(paths.values()), rtol=1e-6)
+
+
+def test_stream(paths, tmp_path):
+    add_paratec_version(paths, start_date.replace(year=start_date.year + years // 2))
+    results = {}
+    for backend in ['pandas', 'polars']:
+        results[backend] = str(tmp_path / backend)
+        os.makedirs(os.path.join(results[backend], 'NotStandardized'))
+        join = StreamJoinData(*paths.values(), backend=backend)
+        join.save_data_not_agregate(stale=False, results_path=results[backend])
+        join.save_data_agregate(stale=False, results_path=results[backend])
+
+    for stage, name in [('not_agregate', 'EmbalsesNoAgregados.parquet'), ('agregate', 'EmbalsesAgregados.parquet')]:
+        files = {backend: os.path.join(path, 'NotStandardized', name) for backend, path in results.items()}
+        assert read_partitions(files['polars']) == read_partitions(files['pandas']) == list(range(start_date.year, start_date.year + years))
+        for year in read_partitions(files['pandas']):
+            assert_parity(read_partition(files['pandas'], year), read_partition(files['polars'], year),
+                          aggregated_rtol if stage in aggregated_stages else 0.0)
+
+
+@pytest.mark.skipif(not all(os.path.exists(cleansed_paths[name]) for name in ['oni', 'paratec', 'reservas', 'embalses']),
+                    reason='Sin los datos de Data/Cleansed del repositorio')
+def test_repository_data(tmp_path):
+    load_join_data(str(tmp_path))
+    assert_stages([str(tmp_path / f'{name}.parquet') for name in ['oni', 'paratec', 'reservas', 'aportes', 'embalses']])
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from src.Analysis.Metrics import regression_metrics, metrics_table, metric_names
+
+metrics = pytest.importorskip('sklearn.metrics')
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    y_train = np.cumsum(rng.normal(size=200))
+    y_true = y_train[-1] + np.cumsum(rng.normal(size=50))
+    predictions = {name: y_true + rng.normal(scale=scale, size=50) for name, scale in [('a', 0.5), ('b', 1.0), ('c', 2.0)]}
+    return y_train, y_true, predictions
+
+
+def expected_metrics(y_true, y_pred, y_train, sp: int) -> dict:
+    # sklearn for MAE, RMSE and R², and MASE as sktime: MAE over the MAE of the seasonal naive forecast of the train series
+    naive = np.mean(np.abs(y_train[sp:] - y_train[:-sp]))
+    return {'mae': metrics.mean_absolute_error(y_true, y_pred), 'rmse': np.sqrt(metrics.mean_squared_error(y_true, y_pred)),
+            'r2': metrics.r2_score(y_true, y_pred), 'mase': metrics.mean_absolute_error(y_true, y_pred) / naive}
+
+
+@pytest.mark.parametrize('sp', [1, 7])
+def test_metrics_match_sklearn(series, sp):
+    y_train, y_true, predictions = series
+    for y_pred in predictions.values():
+        result = regression_metrics(y_true, y_pred, y_train, sp)
+        for name, value in expected_metrics(y_true, y_pred, y_train, sp).items():
+            assert result[name] == pytest.approx(value, rel=1e-12)
+
+
+def test_stacked_models_match_one_by_one(series):
+    y_train, y_true, predictions = series
+    table = metrics_table(y_true, predictions, y_train).set_index(['model', 'metric'])['value']
+    assert len(table) == len(predictions) * len(metric_names)
+    for name, y_pred in predictions.items():
+        for metric, value in regression_metrics(y_true, y_pred, y_train).items():
+            assert table[name, metric] == pytest.approx(value, rel=1e-12)
+
+    # MASE defaults to the scale of y_true and needs more values than the seasonal lag
+    assert regression_metrics(y_true, predictions['a'])['mase'] == pytest.approx(expected_metrics(y_true, predictions['a'], y_true, 1)['mase'])
+    with pytest.raises(ValueError, match='MASE'):
+        regression_metrics(y_true, predictions['a'], y_train[:7], sp=7)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.Analysis.Outliers import iqr_bounds, outlier_mask, QuantileSketch
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'RegionHidrologica': rng.choice(['Antioquia', 'Caribe', 'Centro'], 1000),
+                       'a': rng.normal(size=1000), 'b': rng.exponential(size=1000)})
+    df.loc[::50, 'a'] = np.nan
+    df.loc[3, 'b'] = 40.0
+    return df
+
+
+def pandas_mask(df: pd.DataFrame, columns: list, by: str = None) -> pd.DataFrame:
+    # The IQR rule column by column with the quantiles of pandas, of each group when by is given
+    values = df.groupby(by)[columns] if by else df[columns]
+    q1 = values.transform('quantile', 0.25) if by else values.quantile(0.25)
+    q3 = values.transform('quantile', 0.75) if by else values.quantile(0.75)
+    iqr = q3 - q1
+    return (df[columns] < q1 - 1.5 * iqr) | (df[columns] > q3 + 1.5 * iqr)
+
+
+@pytest.mark.parametrize('by', [None, 'RegionHidrologica'])
+def test_mask_matches_pandas(df, by):
+    expected = pandas_mask(df, ['a', 'b'], by)
+    pd.testing.assert_frame_equal(outlier_mask(df, ['a', 'b'], by, per_column=True), expected)
+    pd.testing.assert_series_equal(outlier_mask(df, ['a', 'b'], by), expected.any(axis=1))
+    assert outlier_mask(df, ['b'], by).loc[3]
+
+
+@pytest.mark.parametrize('by', [None, 'RegionHidrologica'])
+def test_sketch_by_parts(df, by):
+    # While the data fits in the sketch the quartiles are exact, the compressed ones are close
+    exact = QuantileSketch(['a', 'b'], by)
+    small = QuantileSketch(['a', 'b'], by, size=50)
+    for part in np.array_split(np.arange(len(df)), 4):
+        exact.partial_fit(df.iloc[part])
+        small.partial_fit(df.iloc[part])
+    expected = iqr_bounds(df, ['a', 'b'], by)
+    pd.testing.assert_frame_equal(exact.bounds(), expected)
+    np.testing.assert_allclose(small.bounds()[['Q1', 'Q3']], expected[['Q1', 'Q3']], atol=0.05)
+    assert exact.rows == len(df)
+
+    with pytest.raises(ValueError):
+        QuantileSketch(['a']).bounds()
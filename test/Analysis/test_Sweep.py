@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from src.Analysis.Sweep import run_sweep, sweep_scores
+
+tree = pytest.importorskip('sklearn.tree')
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = X[:, 0] + rng.normal(scale=0.1, size=200)
+    return X[:150], y[:150], X[150:], y[150:]
+
+
+def test_early_stop_keeps_rows_of_the_grid(data, capsys, tracer):
+    depths = [1, 2, 3, 4, 5, 6]
+    # The train R2 of the tree improves with each depth, while the test MASE stops improving and stops the sweep
+    results = run_sweep(tree.DecisionTreeRegressor(random_state=0), *data, {'max_depth': depths}, max_workers=1,
+                        patience=1, monitor='r2_train')
+    monitored = run_sweep(tree.DecisionTreeRegressor(random_state=0), *data, {'max_depth': depths}, max_workers=1,
+                          patience=1, monitor='mase_test')
+
+    assert capsys.readouterr().out == ''
+    assert results.attrs['stop_reason'] is None and results['evaluated'].all()
+    assert list(monitored['max_depth']) == depths
+    evaluated = monitored['evaluated'].to_numpy()
+    assert 0 < evaluated.sum() < len(depths) and not evaluated[evaluated.argmin():].any()
+    assert 'mase_test' in monitored.attrs['stop_reason']
+
+    r2_scores, mase_scores = sweep_scores(monitored)
+    assert len(r2_scores['test']) == len(mase_scores['train']) == len(depths)
+    assert np.isnan(r2_scores['test'])[~evaluated].all() and not np.isnan(r2_scores['test'])[evaluated].any()
+    sweeps = [span for span in tracer.spans if span.name == 'sweep.run']
+    assert sweeps[-1].attributes['stop_reason'] == monitored.attrs['stop_reason']
+    assert sweeps[-1].attributes['evaluated'] == evaluated.sum()
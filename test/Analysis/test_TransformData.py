@@ -0,0 +1,74 @@
+import os
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from src.ResourceManager.Storage import append_data, read_partitions, read_partition, write_partition
+from src.GetData.PARATEC import read_history, diff_snapshot, history_key
+from src.Analysis.TransformData import JoinData, StreamJoinData, scaled_columns
+from src.Analysis.Scaler import IncrementalScaler, scaler_extension
+from test.synthetic import write_data_sets, paratec_reservoirs
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return write_data_sets(str(tmp_path), reservoirs=5, years=2)
+
+
+def test_unmatched_paratec_recorded_in_span(paths, capsys, tracer):
+    # A version of PARATEC with a reservoir that is not in ListadoEmbalses
+    data = pd.concat([paratec_reservoirs(5), pd.DataFrame({'reservoir': ['QWERTY XYZ'], 'latitude': [1.0], 'longitude': [-75.0]})],
+                     ignore_index=True)
+    append_data(diff_snapshot(read_history(paths['paratec']), data, datetime.date(2014, 1, 1)), paths['paratec'], history_key,
+                schema='PARATEC_historico')
+    join = JoinData(*paths.values())
+    tracer.reset()
+    join.get_stage('clean')
+
+    assert capsys.readouterr().out == ''
+    assert join.index.unmatched() == ['QWERTY XYZ']
+    assert join.report_unmatched().to_dict('records') == [{'fuente': 'PARATEC', 'embalse': 'QWERTY XYZ'}]
+    clean = [span for span in tracer.spans if span.name == 'join.clean']
+    assert clean[-1].attributes['unmatched_paratec'] == ['QWERTY XYZ']
+
+
+def test_stream_since_rewrites_previous_year(paths, tmp_path):
+    results_path = str(tmp_path / 'Results')
+    os.makedirs(os.path.join(results_path, 'NotStandardized'))
+    path = os.path.join(results_path, 'NotStandardized', 'EmbalsesAgregados.parquet')
+    join = StreamJoinData(*paths.values())
+    join.save_data_agregate(stale=False, results_path=results_path)
+    expected = {year: read_partition(path, year) for year in read_partitions(path)}
+
+    # The last year as it was saved before the new year could fill its last MediaHistoricaEnergia
+    df = expected[2013].copy()
+    df.loc[df.index[-5:], 'MediaHistoricaEnergia'] = np.nan
+    write_partition(df, path, 2013)
+    join.save_data_agregate(stale=False, results_path=results_path, since=2014)
+
+    for year, df in expected.items():
+        pd.testing.assert_frame_equal(read_partition(path, year), df)
+
+
+def test_scaler_of_other_columns_is_rejected(paths, tmp_path):
+    results_path = str(tmp_path / 'Results')
+    os.makedirs(os.path.join(results_path, 'Standardized'))
+    path = os.path.join(results_path, 'Standardized', 'EmbalsesNoAgregados.parquet')
+    scaler_path = os.path.join(results_path, 'Standardized', f'EmbalsesNoAgregados{scaler_extension}')
+    StreamJoinData(*paths.values()).save_data_not_agregate(stale=True, results_path=results_path)
+    expected = {year: read_partition(path, year) for year in read_partitions(path)}
+
+    # A scaler saved with a column that is not in the data
+    scaler = IncrementalScaler.load(scaler_path)
+    scaler.columns[0] = 'Otra'
+    scaler.data_min.index = scaler.data_max.index = scaler.columns
+    scaler.save(scaler_path)
+    with pytest.raises(ValueError, match='refit_scaler=True'):
+        StreamJoinData(*paths.values()).save_data_not_agregate(stale=True, results_path=results_path)
+    with pytest.raises(ValueError, match='refit_scaler=True'):
+        JoinData(*paths.values()).save_data_not_agregate(stale=True, results_path=results_path)
+    for year, df in expected.items():
+        pd.testing.assert_frame_equal(read_partition(path, year), df)
+
+    StreamJoinData(*paths.values()).save_data_not_agregate(stale=True, results_path=results_path, refit_scaler=True)
+    assert IncrementalScaler.load(scaler_path).columns == scaled_columns
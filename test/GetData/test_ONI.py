@@ -0,0 +1,47 @@
+import pandas as pd
+from src.ResourceManager.HttpClient import HttpClient
+from src.ResourceManager.Cache import ResponseCache
+from src.GetData import ONI
+
+
+def test_oni_is_fetched_on_use_and_parsed_once(server, client, no_cache, monkeypatch):
+    monkeypatch.setattr(ONI, 'oni_path', server.url + '/oni')
+    oni = ONI.DataOni(client=client, cache=no_cache)
+    assert server.requests == []
+
+    data = oni.get_oni_data()
+    raw = oni.data_raw
+    assert len(data) == 2 and len(server.requests) == 1
+
+    # The server answers 304, the payload is not parsed again and the cleaned data is kept
+    assert oni.refresh() is False
+    assert server.requests[1][1]['If-None-Match'] == f'"{len(server.payloads["/oni"])}"'
+    assert oni.data_raw is raw and oni.data is data
+
+
+def test_cached_oni_is_revalidated_within_the_ttl(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(ONI, 'oni_path', server.url + '/oni')
+    cache = ResponseCache(str(tmp_path), ttl=3600)
+    # A new client in each run, as in separate processes: the validators come from the cache
+    first = ONI.DataOni(client=HttpClient(retries=0), cache=cache).get_oni_data()
+    second = ONI.DataOni(client=HttpClient(retries=0), cache=cache).get_oni_data()
+    assert server.requests[1][1]['If-None-Match'] == f'"{len(server.payloads["/oni"])}"'
+    pd.testing.assert_frame_equal(first, second)
+
+    monkeypatch.setitem(server.payloads, '/oni', server.payloads['/oni'] + b'FMA 2024  27.50   1.10\n')
+    changed = ONI.DataOni(client=HttpClient(retries=0), cache=cache).get_oni_data()
+    assert len(server.requests) == 3 and len(changed) == 3
+    assert cache.get('ONI', ONI.oni_path) == server.payloads['/oni']
+
+
+def test_cached_oni_is_used_offline(server, tmp_path, monkeypatch, tracer):
+    monkeypatch.setattr(ONI, 'oni_path', server.url + '/oni')
+    cache = ResponseCache(str(tmp_path), ttl=3600)
+    expected = ONI.DataOni(client=HttpClient(retries=0), cache=cache).get_oni_data()
+    server.shutdown()
+    server.server_close()
+
+    tracer.reset()
+    pd.testing.assert_frame_equal(ONI.DataOni(client=HttpClient(retries=0), cache=cache).get_oni_data(), expected)
+    fetch = [span for span in tracer.spans if span.name == 'oni.fetch'][-1]
+    assert fetch.attributes['offline'] is True and fetch.attributes['modified'] is False
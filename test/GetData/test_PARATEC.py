@@ -0,0 +1,51 @@
+import datetime
+import numpy as np
+import pandas as pd
+from src.ResourceManager.Storage import write_data
+from src.GetData import PARATEC
+
+
+def test_paratec_is_fetched_on_use_and_parsed_once(server, client, no_cache, monkeypatch):
+    monkeypatch.setattr(PARATEC, 'url_paratect', server.url + '/paratec')
+    paratec = PARATEC.DataPARATEC(client=client, cache=no_cache)
+    assert server.requests == []
+
+    data = paratec.get_paratec_data()
+    raw = paratec.data_raw
+    assert data['reservoir'].tolist() == ['GUAVIO']
+
+    assert paratec.refresh() is False
+    assert len(server.requests) == 2
+    assert paratec.data_raw is raw and paratec.data is data
+
+
+def reservoirs(rows: dict) -> pd.DataFrame:
+    return pd.DataFrame([{'reservoir': name, 'latitude': latitude, 'longitude': -75.0} for name, latitude in rows.items()])
+
+
+def test_snapshots_are_read_back_as_of_their_dates(tmp_path):
+    snapshots = {
+        datetime.date(2025, 1, 1): reservoirs({'GUAVIO': 4.7, 'PENOL': 6.2}),
+        datetime.date(2025, 2, 1): reservoirs({'GUAVIO': 4.8, 'PENOL': 6.2, 'URRA': np.nan}),
+        datetime.date(2025, 3, 1): reservoirs({'GUAVIO': 4.8, 'URRA': np.nan}),
+        datetime.date(2025, 4, 1): reservoirs({'GUAVIO': 4.8, 'URRA': np.nan})
+    }
+    paths = []
+    for as_of, data in snapshots.items():
+        paths.append(str(tmp_path / f'PARATEC_{as_of}.parquet'))
+        write_data(data, paths[-1])
+    path = str(tmp_path / PARATEC.history_file)
+    # The files are loaded in the order of their dates, not of the list
+    PARATEC.load_snapshots(paths[::-1], path)
+
+    history = PARATEC.read_history(path)
+    # A version by reservoir and one more for the move of GUAVIO, with the old GUAVIO and the removed PENOL closed
+    assert len(history) == 4 and history['valid_to'].notna().sum() == 2
+    assert PARATEC.snapshot_as_of(history, datetime.date(2024, 12, 31)).empty
+    for as_of, data in snapshots.items():
+        for day in [as_of, as_of + datetime.timedelta(days=20)]:
+            snapshot = PARATEC.snapshot_as_of(history, day).sort_values('reservoir', ignore_index=True)
+            pd.testing.assert_frame_equal(snapshot, data.sort_values('reservoir', ignore_index=True), check_dtype=False)
+
+    # A snapshot without changes writes no versions
+    assert PARATEC.diff_snapshot(history, snapshots[datetime.date(2025, 4, 1)], datetime.date(2025, 5, 1)).empty
@@ -0,0 +1,138 @@
+import os
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from src.ResourceManager.Storage import read_data
+from src.GetData.SIMEM import DataSIMEM, read_watermarks, compact_frame, concat_frames, simem_schemas, clean_frame, cleaning_rules
+from test.synthetic import FastStubReadSIMEM, simem_data
+
+
+class FlakyReadSIMEM(FastStubReadSIMEM):
+    """
+    FastStubReadSIMEM whose first requests fail with the given error, counting the requests of all the threads.
+    """
+
+    reservoirs = 3
+    failures = 0
+    error = requests.ConnectionError
+    calls = []
+    lock = threading.Lock()
+
+    def main(self, filter: bool = False) -> pd.DataFrame:
+        with self.lock:
+            self.calls.append((self.dataset_id, self.start_date, self.end_date))
+            failed = len(self.calls) <= self.failures
+        if failed:
+            raise self.error('SIMEM no responde')
+        return super().main(filter)
+
+
+@pytest.fixture
+def reader(monkeypatch):
+    monkeypatch.setattr(FlakyReadSIMEM, 'calls', [])
+    return FlakyReadSIMEM
+
+
+def test_chunked_fetch_matches_one_request(reader, no_cache):
+    start, end = datetime.date(2013, 6, 1), datetime.date(2015, 3, 31)
+    chunked = DataSIMEM(reader=reader, cache=no_cache, max_workers=3).get_simem_data(start, end, ['B0E933', 'BA1C55'])
+    assert sorted(reader.calls) == sorted(
+        (data_id, str(chunk_start), str(chunk_end)) for data_id in ['B0E933', 'BA1C55']
+        for chunk_start, chunk_end in [(start, datetime.date(2013, 12, 31)), (datetime.date(2014, 1, 1), datetime.date(2014, 12, 31)),
+                                       (datetime.date(2015, 1, 1), end)])
+
+    whole = DataSIMEM(reader=reader, cache=no_cache, chunk_freq=None).get_simem_data(start, end, ['B0E933', 'BA1C55'])
+    for data_id in ['B0E933', 'BA1C55']:
+        pd.testing.assert_frame_equal(chunked[data_id], whole[data_id])
+        assert chunked[data_id]['Fecha'].is_monotonic_increasing
+
+
+def test_network_errors_are_retried(reader, no_cache, monkeypatch):
+    monkeypatch.setattr(reader, 'failures', 2)
+    data = DataSIMEM(reader=reader, cache=no_cache, retries=2, backoff=0.0, chunk_freq=None).get_simem_data(
+        datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), ['B0E933'])
+    assert len(reader.calls) == 3 and not data['B0E933'].empty
+
+    reader.calls.clear()
+    with pytest.raises(requests.ConnectionError):
+        DataSIMEM(reader=reader, cache=no_cache, retries=1, backoff=0.0, chunk_freq=None).get_simem_data(
+            datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), ['B0E933'])
+    assert len(reader.calls) == 2
+
+
+def test_other_errors_are_not_retried(reader, no_cache, monkeypatch):
+    monkeypatch.setattr(reader, 'failures', 1)
+    monkeypatch.setattr(reader, 'error', KeyError)
+    with pytest.raises(KeyError):
+        DataSIMEM(reader=reader, cache=no_cache, retries=3, backoff=0.0, chunk_freq=None).get_simem_data(
+            datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), ['B0E933'])
+    assert len(reader.calls) == 1
+
+
+def test_update_starts_at_the_watermark(reader, no_cache, tmp_path):
+    os.makedirs(tmp_path / 'Cleansed' / 'SIMEM')
+    simem = DataSIMEM(reader=reader, cache=no_cache)
+    simem.get_simem_data(datetime.date(2023, 1, 1), datetime.date(2023, 12, 31), ['B0E933'])
+    simem.save_simem_data(str(tmp_path))
+    assert read_watermarks(str(tmp_path)) == {'B0E933': datetime.date(2023, 12, 31)}
+
+    reader.calls.clear()
+    DataSIMEM(reader=reader, cache=no_cache).update_simem_data(str(tmp_path), datetime.date(2024, 2, 15), ['B0E933'])
+    assert reader.calls == [('B0E933', '2023-12-31', '2023-12-31'), ('B0E933', '2024-01-01', '2024-02-15')]
+    assert read_watermarks(str(tmp_path)) == {'B0E933': datetime.date(2024, 2, 15)}
+
+    # The overlap of the watermark day is replaced by its natural key, the result is the one of a full load
+    full = DataSIMEM(reader=reader, cache=no_cache)
+    full.get_simem_data(datetime.date(2023, 1, 1), datetime.date(2024, 2, 15), ['B0E933'])
+    os.makedirs(tmp_path / 'full' / 'Cleansed' / 'SIMEM')
+    full.save_simem_data(str(tmp_path / 'full'))
+    path = os.path.join('Cleansed', 'SIMEM', 'ReservasHidraulicasEnergía.parquet')
+    pd.testing.assert_frame_equal(read_data(str(tmp_path / path)).sort_values(['Fecha', 'CodigoEmbalse'], ignore_index=True),
+                                  read_data(str(tmp_path / 'full' / path)).sort_values(['Fecha', 'CodigoEmbalse'], ignore_index=True))
+
+
+def test_compact_frame_types_and_memory():
+    raw = simem_data('B0E933', datetime.date(2024, 1, 1), datetime.date(2024, 3, 31), reservoirs=5)
+    data = compact_frame(raw.assign(Extra=1), 'B0E933', exact=False)
+    assert {column: str(dtype) for column, dtype in data.dtypes.items()} == {**simem_schemas['B0E933'], 'Extra': 'int64'}
+    assert data.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum() / 2
+
+    # The exact downcast keeps float64 the columns that float32 would round
+    exact = compact_frame(raw.assign(CapacidadUtilEnergia=1000.0, VolumenTotalEnergia=raw['VolumenTotalEnergia'] + 0.1), 'B0E933', exact=True)
+    assert exact['VolumenTotalEnergia'].dtype == 'float64' and exact['CapacidadUtilEnergia'].dtype == 'float32'
+
+    # The chunks with other categories are concatenated as categoricals
+    chunks = [compact_frame(simem_data('B0E933', datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), reservoirs=n), 'B0E933') for n in [2, 4]]
+    joined = concat_frames(chunks)
+    assert joined['CodigoEmbalse'].dtype == 'category' and len(joined) == 8
+    assert list(joined['CodigoEmbalse'].astype(str)) == [code for chunk in chunks for code in chunk['CodigoEmbalse'].astype(str)]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_cleaning_rules(compact):
+    raw = {data_id: simem_data(data_id, datetime.date(2024, 1, 1), datetime.date(2024, 1, 3), reservoirs=3) for data_id in ['B0E933', 'BA1C55', 'A0CF2A']}
+    if compact:
+        raw = {data_id: compact_frame(data, data_id) for data_id, data in raw.items()}
+    copies = {data_id: data.copy() for data_id, data in raw.items()}
+    clean = {data_id: clean_frame(data, data_id) for data_id, data in raw.items()}
+
+    assert 'FechaPublicacion' not in clean['B0E933'] and len(clean['B0E933']) == 9
+    assert not clean['B0E933']['CodigoEmbalse'].astype(str).str.contains('AGREGADO').any()
+    assert (clean['BA1C55']['CodigoSerieHidrologica'].astype(str) != 'Colombia').all() and len(clean['BA1C55']) == 9
+    assert list(clean['A0CF2A'].columns) == ['CodigoEmbalse', 'NombreEmbalse'] and len(clean['A0CF2A']) == 3
+    for data_id, data in raw.items():
+        pd.testing.assert_frame_equal(data, copies[data_id])
+
+
+def test_cleaning_without_exclusions_shares_memory(monkeypatch):
+    raw = simem_data('B0E933', datetime.date(2024, 1, 1), datetime.date(2024, 1, 3), reservoirs=3)
+    raw = raw[raw['CodigoEmbalse'] != 'AGREGADO']
+    clean = clean_frame(raw, 'B0E933')
+    assert np.shares_memory(clean['VolumenUtilDiarioEnergia'].to_numpy(), raw['VolumenUtilDiarioEnergia'].to_numpy())
+
+    monkeypatch.setitem(cleaning_rules, 'B0E933', {'exclude': [('CodigoEmbalse', 'starts', 'EMB')]})
+    with pytest.raises(ValueError, match='Operador'):
+        clean_frame(raw, 'B0E933')
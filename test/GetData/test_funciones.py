@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+import pytest
+from src.GetData import funciones
+
+# Modules that a statement must not import, checked in a new interpreter
+_loaded = '''
+import sys, json
+{statement}
+print(json.dumps(sorted(name for name in {modules!r} if name in sys.modules)))
+'''
+
+
+def loaded_modules(statement: str, modules: list) -> list:
+    output = subprocess.run([sys.executable, '-c', _loaded.format(statement=statement, modules=modules)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('statement', [
+    'from src.GetData.funciones import tidy_corr_matrix, identificar_outliers, checkVIF',
+    'import src.Analysis.TransformData',
+    'import src.GetData.ONI, src.GetData.PARATEC, src.GetData.SIMEM'
+])
+def test_imports_do_not_load_heavy_dependencies(statement):
+    heavy = ['matplotlib', 'seaborn', 'sklearn', 'polars', 'pydataxm', 'src.GetData.funciones.graficos', 'src.GetData.funciones.modelos']
+    assert loaded_modules(statement, heavy) == []
+
+
+def test_functions_are_resolved_on_use():
+    assert funciones.tidy_corr_matrix is sys.modules['src.GetData.funciones.estadistica'].tidy_corr_matrix
+    assert 'eval_model' in dir(funciones)
+    with pytest.raises(AttributeError):
+        funciones.otra_funcion
@@ -0,0 +1,85 @@
+import os
+import json
+import pytest
+from src.ResourceManager import Cache
+from src.ResourceManager.Cache import ResponseCache
+
+
+def test_hits_do_not_rewrite_the_index(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    cache.set(b'payload', 'ONI')
+    saves = []
+    monkeypatch.setattr(cache, '_save_index', lambda: saves.append(1))
+
+    for _ in range(Cache.index_flush_hits - 1):
+        assert cache.get('ONI') == b'payload'
+    assert saves == []
+    cache.get('ONI')
+    assert saves == [1]
+
+
+def test_close_saves_the_access_times(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set(b'payload', 'ONI')
+    cache.get('ONI')
+    accessed = cache._index[cache.key('ONI')]['accessed']
+    cache.close()
+
+    with open(os.path.join(tmp_path, 'index.json')) as file:
+        assert json.load(file)[cache.key('ONI')]['accessed'] == accessed
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_evicts_the_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.set(b'aaaa', 'A')
+    cache.set(b'bbbb', 'B')
+    cache.get('A')
+    cache.set(b'cccc', 'C')
+
+    assert cache.get('B') is None
+    assert cache.get('A') == b'aaaa' and cache.get('C') == b'cccc'
+    assert cache.report()['bytes'] == 8
+    assert (cache.stats['evictions'], cache.stats['expirations']) == (1, 0)
+
+
+def test_shared_payload_is_counted_and_removed_once(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.set(b'same', 'A')
+    cache.set(b'same', 'B')
+    assert cache.report()['bytes'] == 4
+
+    # A payload bigger than the cache evicts every entry, itself included
+    cache.set(b'other-payload', 'C')
+    report = cache.report()
+    assert (report['entries'], report['bytes'], report['evictions']) == (0, 0, 3)
+    assert os.listdir(os.path.join(tmp_path, 'objects')) == []
+
+
+def test_expirations_are_not_evictions(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.set(b'old', 'A')
+    now = Cache.time.time()
+    monkeypatch.setattr(Cache.time, 'time', lambda: now + 120)
+    cache.set(b'new', 'B')
+
+    assert (cache.stats['evictions'], cache.stats['expirations']) == (0, 1)
+    assert cache.report()['bytes'] == 3
+
+
+def test_index_is_read_back(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set(b'payload', 'ONI')
+    cache.set(b'payload', 'PARATEC')
+
+    reopened = ResponseCache(str(tmp_path))
+    assert reopened.get('PARATEC') == b'payload'
+    assert reopened.report()['bytes'] == len(b'payload')
+
+
+def test_entries_are_not_sorted_under_the_limit(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_bytes=10)
+    cache.set(b'aaaa', 'A')
+    monkeypatch.setattr(Cache, 'sorted', lambda *args, **kwargs: pytest.fail('Se ordenó el índice bajo el límite'), raising=False)
+    cache.set(b'bbbb', 'B')
+    assert cache.report()['entries'] == 2
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.ResourceManager.FeatureStore import FeatureStore
+
+
+@pytest.fixture
+def data():
+    # Unsorted rows of three reservoirs over five days, with a text entity and a float feature
+    dates = pd.date_range('2024-01-01', periods=5)
+    data = pd.DataFrame({'Fecha': np.repeat(dates, 3), 'CodigoEmbalse': ['EMB3', 'EMB1', 'EMB2'] * 5,
+                         'Volumen': np.arange(15, dtype='float64')})
+    return data.sample(frac=1, random_state=0)
+
+
+def test_point_in_time_reads(tmp_path, data):
+    store = FeatureStore(str(tmp_path))
+    store.write('embalses', data, entity='CodigoEmbalse')
+    assert store.tables() == ['embalses'] and store.meta('embalses')['rows'] == 15
+
+    expected = data.sort_values(['Fecha', 'CodigoEmbalse'], ignore_index=True)
+    until = expected[expected['Fecha'] <= '2024-01-03']
+    frame = store.read_frame('embalses', end='2024-01-03')
+    pd.testing.assert_frame_equal(frame.astype({'CodigoEmbalse': 'str'}), until, check_dtype=False)
+
+    # The columns are read-only views of the files, without copies
+    views = store.read('embalses', start='2024-01-02', end='2024-01-02', columns=['Volumen'])
+    assert isinstance(views['Volumen'], np.memmap)
+    assert not views['Volumen'].flags.writeable
+    assert views['Volumen'].tolist() == expected.loc[expected['Fecha'] == '2024-01-02', 'Volumen'].tolist()
+
+
+def test_split_and_errors(tmp_path, data):
+    store = FeatureStore(str(tmp_path))
+    store.write('embalses', data, entity='CodigoEmbalse')
+    train, validation, test = store.split('embalses', ['2024-01-03', '2024-01-05'], columns=['Fecha'])
+    assert [len(part['Fecha']) for part in [train, validation, test]] == [6, 6, 3]
+    assert train['Fecha'].max() < validation['Fecha'].min() and validation['Fecha'].max() < test['Fecha'].min()
+
+    # A new version replaces the table
+    store.write('embalses', data.head(3), entity='CodigoEmbalse')
+    assert store.meta('embalses')['rows'] == 3
+    with pytest.raises(ValueError, match='no existe'):
+        store.meta('regiones')
+    with pytest.raises(ValueError, match='no existe'):
+        store.read('embalses', columns=['Otra'])
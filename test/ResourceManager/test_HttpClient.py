@@ -0,0 +1,25 @@
+
+def test_conditional_request_sends_etag(server, client):
+    first = client.get(server.url + '/oni')
+    second = client.get(server.url + '/oni')
+
+    assert 'If-None-Match' not in server.requests[0][1]
+    assert server.requests[1][1]['If-None-Match'] == f'"{len(server.payloads["/oni"])}"'
+    assert (first.status_code, first.modified) == (200, True)
+    assert (second.status_code, second.modified) == (304, False)
+    assert second.content == first.content == server.payloads['/oni']
+
+
+def test_conditional_request_sends_last_modified(server, client):
+    client.get(server.url + '/last-modified')
+    second = client.get(server.url + '/last-modified')
+
+    assert server.requests[1][1]['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+    assert not second.modified
+    assert second.content == server.payloads['/last-modified']
+
+
+def test_get_many_keeps_the_order(server, client):
+    responses = client.get_many([server.url + path for path in ['/paratec', '/oni', '/last-modified']])
+
+    assert [response.content for response in responses] == [server.payloads['/paratec'], server.payloads['/oni'], server.payloads['/last-modified']]
@@ -0,0 +1,58 @@
+import os
+import json
+import logging
+import datetime
+import pytest
+from src.ResourceManager.Cache import ResponseCache
+from src.ResourceManager.Pipeline import DataPipeline, handle_timer, handle_request
+from test.synthetic import StubHttpClient, FastStubReadSIMEM
+
+
+class SmallReadSIMEM(FastStubReadSIMEM):
+    reservoirs = 3
+
+
+@pytest.fixture
+def pipeline(tmp_path, tracer):
+    # The backfill starts this year, so a run reads only some months of SIMEM
+    data_path = str(tmp_path / 'Data')
+    os.makedirs(os.path.join(data_path, 'Cleansed', 'SIMEM'))
+    start = datetime.date(datetime.date.today().year, 1, 1)
+    with open(os.path.join(data_path, 'Cleansed', 'SIMEM', 'watermarks.json'), 'w') as file:
+        json.dump({data_id: str(start) for data_id in ['B0E933', 'BA1C55', 'A0CF2A']}, file)
+    return DataPipeline(data_path, simem_reader=SmallReadSIMEM, client=StubHttpClient(reservoirs=3),
+                        cache=ResponseCache(str(tmp_path / 'Cache'), ttl=0))
+
+
+def test_timer_runs_and_then_only_updates(pipeline, caplog):
+    with caplog.at_level(logging.WARNING, logger='src.ResourceManager.Pipeline'):
+        report = handle_timer(past_due=True, pipeline=pipeline)
+    assert 'retrasada' in caplog.text
+    assert report['status'] == 'ok' and list(report['stages']) == ['oni', 'paratec', 'simem', 'transform']
+    assert all(stage['changed'] for stage in report['stages'].values())
+    assert os.path.isfile(report['trace'])
+
+    # The warm worker saves neither ONI nor PARATEC again and rewrites the results from the year of the new data
+    report = handle_timer(pipeline=pipeline)
+    assert report['status'] == 'ok' and report['runs'] == 2
+    assert not report['stages']['oni']['changed'] and not report['stages']['paratec']['changed']
+    assert report['stages']['transform']['since'] == datetime.date.today().year
+
+
+def test_http_trigger_status_codes(pipeline, monkeypatch, caplog):
+    assert handle_request('oni,excel', pipeline=pipeline)[0] == 400
+
+    status_code, body = handle_request(' oni , paratec', pipeline=pipeline)
+    assert status_code == 200 and list(json.loads(body)['stages']) == ['oni', 'paratec']
+
+    with pipeline._lock:
+        status_code, body = handle_request('transform', pipeline=pipeline)
+    assert status_code == 409 and json.loads(body)['status'] == 'running'
+
+    def fail(*args, **kwargs):
+        raise OSError('disco lleno')
+    monkeypatch.setattr(pipeline, '_run_oni', fail)
+    with caplog.at_level(logging.ERROR, logger='src.ResourceManager.Pipeline'):
+        status_code, body = handle_request('oni', pipeline=pipeline)
+    assert status_code == 500 and json.loads(body)['error'] == 'OSError: disco lleno'
+    assert 'disco lleno' in caplog.text
@@ -0,0 +1,48 @@
+import json
+import os
+import pytest
+from src.ResourceManager import Profiler
+from src.ResourceManager.Profiler import Tracer, enable_tracing, read_history, find_regressions
+
+
+def test_tracing_is_off_by_default(monkeypatch):
+    monkeypatch.delenv('TRACE_ENABLED', raising=False)
+    monkeypatch.setattr(Profiler, '_tracer', None)
+    monkeypatch.setattr(Profiler, 'current_rss', lambda: pytest.fail('Un intervalo desactivado leyó la memoria'))
+    with Profiler.span('test.disabled') as span:
+        span.add(rows_out=1)
+    assert not Profiler.get_tracer().enabled and not Profiler.get_tracer().spans
+
+    monkeypatch.setenv('TRACE_ENABLED', '0')
+    assert not enable_tracing().enabled
+    monkeypatch.delenv('TRACE_ENABLED')
+    assert enable_tracing().enabled
+
+
+def test_trace_output(tmp_path):
+    tracer = Tracer(enabled=True)
+    with tracer.span('test.run', source='x'):
+        with tracer.span('test.read') as read:
+            read.add(rows_read=10, bytes_read=100)
+        with pytest.raises(ValueError), tracer.span('test.read'):
+            raise ValueError('sin datos')
+
+    summary = tracer.summary().set_index('name')
+    assert list(summary.index) == ['test.run', 'test.read']
+    assert summary.loc['test.read', 'calls'] == 2 and summary.loc['test.read', 'errors'] == 1
+    assert summary.loc['test.read', 'rows_read'] == 10 and summary.loc['test.run', 'rows_read'] == 0
+
+    path = tracer.save(str(tmp_path), run='first')
+    with open(path, encoding='utf-8') as file:
+        trace = json.load(file)
+    events = {event['name']: event for event in trace['traceEvents']}
+    assert len(trace['traceEvents']) == 3 and events['test.run']['args']['source'] == 'x'
+    reads = [span for span in trace['spans'] if span['name'] == 'test.read']
+    run = [span for span in trace['spans'] if span['name'] == 'test.run'][0]
+    assert all(span['parent'] == run['id'] for span in reads)
+    assert [span['error'] for span in reads] == [None, 'ValueError: sin datos']
+
+    tracer.save(str(tmp_path), run='second')
+    history = read_history(str(tmp_path))
+    assert list(history['run'].unique()) == ['first', 'second'] and os.path.isfile(path)
+    assert set(find_regressions(history)['name']) == {'test.run', 'test.read'}
@@ -0,0 +1,73 @@
+import os
+import pandas as pd
+import pytest
+from src.ResourceManager.Storage import write_data, append_data, read_data, read_partitions, read_partition
+from src.GetData.SIMEM import compact_frame, simem_schemas
+
+
+def reservas(dates, codes, volume: float = 1.0) -> pd.DataFrame:
+    # Reservoir data as ReadSIMEM returns it: dates as text and energies as float64 that fit in float32
+    fecha = [date for date in dates for _ in codes]
+    return pd.DataFrame({'FechaPublicacion': fecha, 'Fecha': fecha, 'CodigoEmbalse': list(codes) * len(dates),
+                         'RegionHidrologica': ['ANTIOQUIA'] * len(fecha), 'VolumenUtilDiarioEnergia': volume,
+                         'CapacidadUtilEnergia': 2.0, 'VolumenTotalEnergia': 3.0, 'VertimientosEnergia': 0.5})
+
+
+@pytest.mark.parametrize('partition_on', [None, 'Fecha'])
+def test_compact_schema_round_trip(tmp_path, partition_on):
+    path = str(tmp_path / 'ReservasHidraulicasEnergía.parquet')
+    data = compact_frame(reservas(['2024-12-31', '2025-01-01'], ['EMB1', 'EMB2']), 'B0E933')
+    write_data(data, path, partition_on=partition_on, schema='ReservasHidraulicasEnergía')
+
+    expected = simem_schemas['B0E933']
+    read = read_data(path)
+    assert {column: str(dtype) for column, dtype in read.dtypes.items()} == expected
+
+    # The new categories of an append are kept as categoricals
+    new = compact_frame(reservas(['2025-01-01', '2025-01-02'], ['EMB2', 'EMB3'], volume=4.0), 'B0E933')
+    append_data(new, path, ['Fecha', 'CodigoEmbalse'], partition_on=partition_on, schema='ReservasHidraulicasEnergía')
+    read = read_data(path)
+    assert {column: str(dtype) for column, dtype in read.dtypes.items()} == expected
+    assert len(read) == 7 and set(read['CodigoEmbalse']) == {'EMB1', 'EMB2', 'EMB3'}
+    updated = read[(read['Fecha'] == '2025-01-01') & (read['CodigoEmbalse'] == 'EMB2')]
+    assert updated['VolumenUtilDiarioEnergia'].tolist() == [4.0]
+
+
+def test_inexact_energies_are_not_rounded(tmp_path):
+    path = str(tmp_path / 'ReservasHidraulicasEnergía.parquet')
+    data = reservas(['2025-01-01'], ['EMB1'], volume=2 ** 24 + 1.0)
+    write_data(compact_frame(data, 'B0E933', exact=True), path, schema='ReservasHidraulicasEnergía')
+    read = read_data(path)
+    assert read['VolumenUtilDiarioEnergia'].dtype == 'float64'
+    assert read['VolumenUtilDiarioEnergia'].tolist() == [2 ** 24 + 1.0]
+
+
+def test_partitioned_write_and_filter_pushdown(tmp_path):
+    data = reservas(['2013-12-31', '2014-01-01', '2015-06-30'], ['EMB1', 'EMB2']).assign(Fecha=lambda df: pd.to_datetime(df['Fecha']))
+    folder, single = str(tmp_path / 'folder.parquet'), str(tmp_path / 'single.parquet')
+    write_data(data, folder, partition_on='Fecha')
+    write_data(data, single)
+
+    assert sorted(os.listdir(folder)) == ['2013.parquet', '2014.parquet', '2015.parquet']
+    assert read_partitions(folder) == read_partitions(single) == [2013, 2014, 2015]
+    for path in [folder, single]:
+        year = read_partition(path, 2014, columns=['Fecha', 'CodigoEmbalse'])
+        assert list(year.columns) == ['Fecha', 'CodigoEmbalse']
+        assert year['Fecha'].dt.year.unique().tolist() == [2014] and len(year) == 2
+    assert read_partition(folder, 2020, columns=['Fecha']).empty
+
+
+def test_partitioned_append_rewrites_only_the_new_years(tmp_path):
+    path = str(tmp_path / 'ReservasHidraulicasEnergía.parquet')
+    data = reservas(['2013-06-01', '2014-06-01'], ['EMB1']).assign(Fecha=lambda df: pd.to_datetime(df['Fecha']))
+    write_data(data, path, partition_on='Fecha')
+    untouched = os.path.join(path, '2013.parquet')
+    os.utime(untouched, ns=(0, 0))
+
+    new = reservas(['2014-06-01', '2015-01-01'], ['EMB1'], volume=5.0).assign(Fecha=lambda df: pd.to_datetime(df['Fecha']))
+    append_data(new, path, ['Fecha', 'CodigoEmbalse'], partition_on='Fecha')
+
+    assert os.stat(untouched).st_mtime_ns == 0
+    read = read_data(path).sort_values('Fecha')
+    assert read['Fecha'].dt.year.tolist() == [2013, 2014, 2015]
+    assert read['VolumenUtilDiarioEnergia'].tolist() == [1.0, 5.0, 5.0]
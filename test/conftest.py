@@ -0,0 +1,82 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.ResourceManager.HttpClient import HttpClient
+from src.ResourceManager.Cache import ResponseCache
+from src.ResourceManager.Profiler import get_tracer
+
+# Payloads served by the stand-in server, with the formats of the ONI text and the PARATEC JSON
+payloads = {
+    '/oni': b'SEAS  YR   TOTAL   ANOM\nDJF 2024  28.20   1.80\nJFM 2024  27.94   1.51\n',
+    '/paratec': json.dumps({'data': [
+        {'reservoir': 'GUAVIO', 'isReservoirAggregate': 'No', 'latitude': 4.7, 'longitude': -73.5},
+        {'reservoir': 'AGREGADO', 'isReservoirAggregate': 'Si', 'latitude': None, 'longitude': None}
+    ]}).encode(),
+    '/last-modified': b'payload with Last-Modified only'
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves the payloads with an ETag (Last-Modified for /last-modified) and answers 304 to the conditional requests
+    whose validator matches, recording the headers of each request.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        content = payloads[self.path]
+        etag, last_modified = f'"{len(content)}"', 'Mon, 01 Jan 2024 00:00:00 GMT'
+        if self.path == '/last-modified':
+            unchanged, validator = self.headers.get('If-Modified-Since') == last_modified, ('Last-Modified', last_modified)
+        else:
+            unchanged, validator = self.headers.get('If-None-Match') == etag, ('ETag', etag)
+        if unchanged:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header(*validator)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.requests = []
+    server.payloads = payloads
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    client = HttpClient(retries=0)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def no_cache(tmp_path):
+    # A TTL of 0 disables the response cache, so every refresh reaches the client
+    return ResponseCache(str(tmp_path), ttl=0)
+
+
+@pytest.fixture
+def tracer():
+    # The tracing is off by default, so the tests of the spans turn on the shared tracer and restore it afterwards
+    tracer = get_tracer()
+    enabled, tracer.enabled = tracer.enabled, True
+    tracer.reset()
+    yield tracer
+    tracer.enabled = enabled
+    tracer.reset()
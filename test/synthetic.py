@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Dict
+from src.ResourceManager.Storage import read_data, write_data
+from src.ResourceManager.HttpClient import HttpResponse
+from src.GetData.SIMEM import compact_frame, clean_frame
+from src.GetData.PARATEC import read_history, diff_snapshot, history_file
+
+# Deterministic synthetic data of the sources of the pipeline, with the schemas of SIMEM (B0E933, BA1C55 and
+# A0CF2A as ReadSIMEM returns them), ONI and PARATEC, at a scale of reservoirs x years. Shared by the tests and the
+# benchmarks, which import it as test.synthetic
+
+# Hydrological regions of the SIMEM reservoir data
+regions = ['Antioquia', 'Caldas', 'Caribe', 'Centro', 'Oriente', 'Valle']
+
+# First date of the synthetic history (the minimum date of SIMEM)
+start_date = datetime.date(2013, 1, 1)
+
+# Cleansed data sets of the repository
+cleansed_paths = {
+    'oni': 'Data/Cleansed/ONI/ONI_historico.xlsx',
+    'paratec': 'Data/Cleansed/PARATEC/PARATEC_2025-05-17.xlsx',
+    'reservas': 'Data/Cleansed/SIMEM/ReservasHidraulicasEnergía.xlsx',
+    'aportes': 'Data/Cleansed/SIMEM/AportesHidricos.xlsx',
+    'embalses': 'Data/Cleansed/SIMEM/ListadoEmbalses.xlsx'
+}
+
+
+def reservoir_codes(reservoirs: int) -> pd.DataFrame:
+    """
+    Returns the CodigoEmbalse, NombreEmbalse and RegionHidrologica of each synthetic reservoir.
+    """
+    return pd.DataFrame({
+        'CodigoEmbalse': [f'EMB{i:03d}' for i in range(reservoirs)],
+        'NombreEmbalse': [f'EMBALSE {i:03d}' for i in range(reservoirs)],
+        'RegionHidrologica': [regions[i % len(regions)] for i in range(reservoirs)]
+    })
+
+
+def simem_data(data_id: str, start: datetime.date, end: datetime.date, reservoirs: int = 25, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a SIMEM data set between two dates as ReadSIMEM returns it: dates as text, energies as float64 and the
+    aggregated rows that the cleaning removes (AGREGADO in the reservoirs and Colombia in the water contributions).
+    The values only depend on the seed and the dates, so the chunks of a range give the same data as the range.
+
+    Args:
+        data_id (str): ID of the data set ('B0E933', 'BA1C55' or 'A0CF2A').
+        start (datetime.date): First date.
+        end (datetime.date): Last date.
+        reservoirs (int, optional): Number of reservoirs (and of hydrological series). Defaults to 25.
+        seed (int, optional): Seed of the values. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: Data of the data set.
+    """
+    dates = pd.date_range(start, end, freq='D')
+    codes = reservoir_codes(reservoirs)
+    fecha = np.repeat(dates.strftime('%Y-%m-%d').to_numpy(), reservoirs)
+
+    if data_id == 'A0CF2A':
+        return pd.DataFrame({'Fecha': fecha, 'CodigoEmbalse': np.tile(codes['CodigoEmbalse'], len(dates)),
+                             'NombreEmbalse': np.tile(codes['NombreEmbalse'], len(dates)), 'FechaEjecucion': fecha})
+
+    # One generator by day and reservoir, seeded with the day
+    days = (dates - pd.Timestamp(start_date)).days.to_numpy()
+    values = np.concatenate([np.random.default_rng([seed, int(day)]).random((reservoirs, 4)) for day in days]) if len(days) else np.empty((0, 4))
+    if data_id == 'B0E933':
+        data = pd.DataFrame({'FechaPublicacion': fecha, 'Fecha': fecha, 'CodigoEmbalse': np.tile(codes['CodigoEmbalse'], len(dates)),
+                             'RegionHidrologica': np.tile(codes['RegionHidrologica'], len(dates)),
+                             'VolumenUtilDiarioEnergia': np.round(values[:, 0] * 1e9), 'CapacidadUtilEnergia': np.round(1e9 + values[:, 1] * 1e9),
+                             'VolumenTotalEnergia': np.round(values[:, 2] * 2e9), 'VertimientosEnergia': np.round(np.maximum(values[:, 3] - 0.8, 0) * 1e8)})
+        code = 'CodigoEmbalse'
+    elif data_id == 'BA1C55':
+        data = pd.DataFrame({'FechaPublicacion': fecha, 'Fecha': fecha,
+                             'RegionHidrologica': np.tile(codes['RegionHidrologica'], len(dates)),
+                             'CodigoSerieHidrologica': np.tile(codes['CodigoEmbalse'].str.replace('EMB', 'SER'), len(dates)),
+                             'AportesHidricosEnergia': np.round(values[:, 0] * 1e7),
+                             'PromedioAcumuladoEnergia': np.where(values[:, 3] < 0.05, np.nan, np.round(values[:, 1] * 1e7)),
+                             'MediaHistoricaEnergia': np.where(values[:, 3] > 0.95, np.nan, np.round(values[:, 2] * 1e7))})
+        code = 'CodigoSerieHidrologica'
+    else:
+        raise ValueError(f"Conjunto de datos desconocido: {data_id}")
+
+    # National totals of each date, published by SIMEM with the rest of the rows
+    energies = data.columns[4:]
+    total = data.groupby(['FechaPublicacion', 'Fecha'], as_index=False)[list(energies)].sum(min_count=1)
+    total = total.assign(**{code: 'AGREGADO' if data_id == 'B0E933' else 'Colombia', 'RegionHidrologica': 'Colombia'})
+    return pd.concat([data, total[data.columns]], ignore_index=True).sort_values('Fecha', kind='stable', ignore_index=True)
+
+
+def oni_history(years: int = 5) -> pd.DataFrame:
+    """
+    Returns the monthly ONI data (columns Date, SST and ANOM, as DataOni cleans it) of the years of the history.
+    """
+    dates = pd.date_range(start_date, periods=12 * years, freq='MS')
+    rng = np.random.default_rng(0)
+    anom = np.round(np.sin(np.arange(len(dates)) / 9) + rng.normal(0, 0.2, len(dates)), 2)
+    return pd.DataFrame({'Date': dates, 'SST': np.round(26.5 + anom, 2), 'ANOM': anom})
+
+
+def oni_text(years: int = 5) -> bytes:
+    """
+    Returns the ONI data in the format of oni.ascii.txt of NOAA.
+    """
+    seasons = ['DJF', 'JFM', 'FMA', 'MAM', 'AMJ', 'MJJ', 'JJA', 'JAS', 'ASO', 'SON', 'OND', 'NDJ']
+    data = oni_history(years)
+    lines = ['SEAS YR TOTAL ANOM'] + [f'{seasons[date.month - 1]} {date.year} {sst:.2f} {anom:.2f}'
+                                      for date, sst, anom in zip(data['Date'], data['SST'], data['ANOM'])]
+    return '\n'.join(lines).encode()
+
+
+def paratec_reservoirs(reservoirs: int = 25) -> pd.DataFrame:
+    """
+    Returns the PARATEC reservoirs (columns reservoir, latitude and longitude, as DataPARATEC cleans it), named as
+    the NombreEmbalse of A0CF2A.
+    """
+    codes = reservoir_codes(reservoirs)
+    return pd.DataFrame({'reservoir': codes['NombreEmbalse'], 'latitude': np.round(2 + np.arange(reservoirs) * 0.1, 4),
+                         'longitude': np.round(-77 + np.arange(reservoirs) * 0.1, 4)})
+
+
+def paratec_payload(reservoirs: int = 25) -> bytes:
+    """
+    Returns the PARATEC reservoirs in the JSON format of the ReservoirInfo API, with an aggregate without coordinates.
+    """
+    data = [{'reservoir': row.reservoir, 'isReservoirAggregate': 'No', 'latitude': row.latitude, 'longitude': row.longitude}
+            for row in paratec_reservoirs(reservoirs).itertuples()]
+    data.append({'reservoir': 'AGREGADO', 'isReservoirAggregate': 'Si', 'latitude': None, 'longitude': None})
+    return json.dumps({'data': data}).encode()
+
+
+def synthetic_reservas(reservoirs: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Creates daily reservoir data joined with ONI (the enrich stage of JoinData) for a number of reservoirs and years.
+    """
+    from src.Analysis.TransformData import reservas_aggregations
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2000-01-01', periods=365 * years, freq='D')
+    df = pd.DataFrame({
+        'Fecha': np.repeat(dates.to_numpy(), reservoirs),
+        'RegionHidrologica': pd.Categorical(np.tile(np.arange(reservoirs) % len(regions), len(dates))).rename_categories(regions)
+    })
+    for column in reservas_aggregations:
+        df[column] = rng.random(len(df)) * 1e8
+    return df
+
+
+def synthetic_aportes(df_reservas: pd.DataFrame, series_by_region: int = 5, seed: int = 0) -> pd.DataFrame:
+    """
+    Creates water contributions data (AportesHidricos) for the dates and regions of the reservoir data,
+    used when the cleansed file is not available.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime(df_reservas['Fecha']).drop_duplicates().sort_values()
+    regions = df_reservas['RegionHidrologica'].drop_duplicates().astype(str)
+    series = [(region, f'{region[:3].upper()}{i}') for region in regions for i in range(series_by_region)]
+    index = pd.MultiIndex.from_product([dates, range(len(series))], names=['Fecha', 'serie'])
+    df = index.to_frame(index=False)
+    df['RegionHidrologica'] = [series[i][0] for i in df['serie']]
+    df['CodigoSerieHidrologica'] = [series[i][1] for i in df['serie']]
+    df['AportesHidricosEnergia'] = rng.random(len(df)) * 1e7
+    df['PromedioAcumuladoEnergia'] = np.where(rng.random(len(df)) < 0.05, np.nan, rng.random(len(df)) * 1e7)
+    df['MediaHistoricaEnergia'] = np.where(rng.random(len(df)) < 0.05, np.nan, rng.random(len(df)) * 1e7)
+    return df.drop(columns=['serie'])
+
+
+def write_data_sets(path: str, reservoirs: int = 25, years: int = 5, seed: int = 0) -> Dict[str, str]:
+    """
+    Writes the cleansed synthetic data sets in the layout of the Data folder (ONI, the history of PARATEC and the
+    SIMEM data sets cleaned and partitioned by year, as the pipeline saves them).
+
+    Args:
+        path (str): Data folder.
+        reservoirs (int, optional): Number of reservoirs. Defaults to 25.
+        years (int, optional): Number of years from 2013. Defaults to 5.
+        seed (int, optional): Seed of the values. Defaults to 0.
+
+    Returns:
+        Dict[str, str]: Paths of the data sets by argument of JoinData (oni, paratec, reservas, aportes, embalses).
+    """
+    end = datetime.date(start_date.year + years - 1, 12, 31)
+    paths = {
+        'oni': os.path.join(path, 'Cleansed', 'ONI', 'ONI_historico.parquet'),
+        'paratec': os.path.join(path, 'Cleansed', 'PARATEC', history_file),
+        'reservas': os.path.join(path, 'Cleansed', 'SIMEM', 'ReservasHidraulicasEnergía.parquet'),
+        'aportes': os.path.join(path, 'Cleansed', 'SIMEM', 'AportesHidricos.parquet'),
+        'embalses': os.path.join(path, 'Cleansed', 'SIMEM', 'ListadoEmbalses.parquet')
+    }
+    for folder in ['ONI', 'PARATEC', 'SIMEM']:
+        os.makedirs(os.path.join(path, 'Cleansed', folder), exist_ok=True)
+
+    write_data(oni_history(years), paths['oni'], schema='ONI_historico')
+    write_data(diff_snapshot(read_history(paths['paratec']), paratec_reservoirs(reservoirs), start_date), paths['paratec'], schema='PARATEC_historico')
+    for data_id, name, first, partition_on in [('B0E933', 'reservas', start_date, 'Fecha'), ('BA1C55', 'aportes', start_date, 'Fecha'),
+                                              ('A0CF2A', 'embalses', end, None)]:
+        data = clean_frame(compact_frame(simem_data(data_id, first, end, reservoirs, seed), data_id), data_id)
+        write_data(data, paths[name], partition_on=partition_on, schema=os.path.splitext(os.path.basename(paths[name]))[0])
+    return paths
+
+
+def load_join_data(tmp: str):
+    """
+    Creates a JoinData object with the cleansed data of the repository (Parquet copies in a temporary folder),
+    using synthetic water contributions when AportesHidricos is not available.
+    """
+    from src.Analysis.TransformData import JoinData
+
+    paths = {}
+    for name, path in cleansed_paths.items():
+        parquet_path = os.path.join(tmp, f'{name}.parquet')
+        parquet_version = os.path.splitext(path)[0] + '.parquet'
+        if os.path.exists(parquet_version):
+            data = read_data(parquet_version)
+        elif os.path.exists(path):
+            data = read_data(path)
+        else:
+            data = synthetic_aportes(read_data(paths['reservas']))
+        write_data(data, parquet_path)
+        paths[name] = parquet_path
+    return JoinData(paths['oni'], paths['paratec'], paths['reservas'], paths['aportes'], paths['embalses'])
+
+
+class StubReadSIMEM:
+    """
+    Local stand-in of pydatasimem.ReadSIMEM that returns the synthetic data of simem_data, waiting a fixed latency
+    per request plus a time proportional to the number of days requested.
+    """
+
+    latency = 0.2
+    seconds_per_day = 0.0005
+    reservoirs = 25
+
+    def __init__(self, dataset_id: str, start_date: str, end_date: str) -> None:
+        self.dataset_id = dataset_id
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def main(self, filter: bool = False) -> pd.DataFrame:
+        start, end = pd.Timestamp(self.start_date).date(), pd.Timestamp(self.end_date).date()
+        time.sleep(self.latency + self.seconds_per_day * ((end - start).days + 1))
+        return simem_data(self.dataset_id, start, end, self.reservoirs)
+
+
+class FastStubReadSIMEM(StubReadSIMEM):
+    """
+    StubReadSIMEM without latency, so the benchmarks measure the work of the pipeline.
+    """
+
+    latency = 0.0
+    seconds_per_day = 0.0
+
+
+class StubHttpClient:
+    """
+    Local stand-in of HttpClient that answers the ONI and PARATEC requests with the synthetic payloads in the
+    format of each source, counting the requests.
+    """
+
+    def __init__(self, reservoirs: int = 25, years: int = 77) -> None:
+        self.requests = 0
+        self.oni = oni_text(years)
+        self.paratec = paratec_payload(reservoirs)
+
+    def get(self, url: str, verify: bool = True, validators: dict = None, content: bytes = None) -> HttpResponse:
+        # The payloads never change, the validators of a conditional request are ignored
+        self.requests += 1
+        content = self.oni if 'noaa' in url else self.paratec
+        return HttpResponse(url, content, 200, True)